@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Dades precalculades per als anuaris (anuari-{team}-2025-26.html)
+- Llegeix tots els partits d'una categoria (index.json del repositori de
+  partits, o els cnt_stats_*.json del directori) en paral·lel amb un pool
+  de processos: cada procés redueix un partit a un resum petit
+- Després s'ajunten per ordre de data: totals de l'equip i de cada
+  jugador, parcials per quart (equip i jugadors) i rècords de la temporada
+- Resultat: anuari-{team}-{season}.json, que la pàgina llegeix d'una sola
+  petició en lloc de baixar-se tots els partits
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+SEASON = '2025-26'
+QUARTERS = ('q1', 'q2', 'q3', 'q4')
+TEAMS = ('cadet', 'juvenil')
+
+# Accions cronològiques que es compten per quart i jugador
+QUARTER_ACTIONS = {
+    'goal': 'gols',
+    'exclusion': 'exclusions',
+    'penalty-missed': 'penaltyMissed',
+    'save': 'parades',
+}
+
+
+def dataset_file(team, season=SEASON):
+    return f"anuari-{team}-{season}.json"
+
+
+def match_files(source):
+    """Fitxers de partits: els de index.json si n'hi ha, si no tots els cnt_stats_*.json"""
+    index_path = os.path.join(source, 'index.json')
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return [os.path.join(source, name) for name in json.load(f).get('files', [])]
+    return sorted(str(path) for path in Path(source).glob('cnt_stats_*.json'))
+
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def add_counts(total, stats):
+    """Suma recursiva de comptadors ({'gols': 2, 'goalTypes': {'normal': 1}})"""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            add_counts(total.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def has_activity(stats):
+    return any(has_activity(v) if isinstance(v, dict) else bool(v)
+               for v in stats.values() if isinstance(v, (dict, int, float)))
+
+
+def player_key(name, number):
+    return (name or f"JUGADOR {number}").strip().upper()
+
+
+def summarize_match(path):
+    """Un partit reduït al que cal per l'anuari (s'executa als processos del pool)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        return {'file': os.path.basename(path), 'error': str(e)}
+
+    # Dos formats: l'export antic (scoreCNT, data...) i el de finalitzar partit (metadata)
+    metadata = data.get('metadata') or {}
+    final_score = metadata.get('finalScore') or {}
+    if data.get('scoreCNT') is None and not final_score:
+        return {'file': os.path.basename(path), 'error': 'sense marcador'}
+
+    summary = {
+        'file': os.path.basename(path),
+        'data': data.get('data') or metadata.get('date', ''),
+        'rivalTeam': data.get('rivalTeam') or metadata.get('rivalTeam', ''),
+        'matchLocation': data.get('matchLocation') or metadata.get('location', ''),
+        'scoreCNT': as_int(data['scoreCNT'] if data.get('scoreCNT') is not None else final_score.get('cnt')),
+        'scoreRival': as_int(data['scoreRival'] if data.get('scoreRival') is not None else final_score.get('rival')),
+        'periodScores': data.get('periodScores') or {},
+    }
+
+    players = {}
+    top = None
+    for player in data.get('jugadors') or []:
+        stats = player.get('estadistiques') or {}
+        if not has_activity(stats):
+            continue
+        key = player_key(player.get('nom'), player.get('numero'))
+        players[key] = {'nom': player.get('nom'), 'numero': player.get('numero'), 'stats': stats, 'quarters': {}}
+        goals = as_int(stats.get('gols'))
+        if goals > 0 and (top is None or goals > top['g']):
+            top = {'name': player.get('nom'), 'num': player.get('numero'), 'g': goals}
+    summary['topScorer'] = top
+    summary['exclusionsCNT'] = sum(as_int(p['stats'].get('exclusions')) for p in players.values())
+
+    for action in data.get('chronologicalActions') or []:
+        field = QUARTER_ACTIONS.get(action.get('type'))
+        if not field or action.get('team') != 'cnt':
+            continue
+        key = player_key(action.get('playerName'), action.get('playerNum'))
+        if key in players:
+            quarter = players[key]['quarters'].setdefault(action.get('quarter') or '?', {})
+            quarter[field] = quarter.get(field, 0) + 1
+
+    return {
+        'summary': summary,
+        'players': players,
+        'quarters': {q: summary['periodScores'].get(q) or {} for q in QUARTERS},
+    }
+
+
+class SeasonAggregate:
+
+    def __init__(self):
+        self.matches = []
+        self.players = {}
+        self.team = {'partits': 0, 'guanyats': 0, 'empatats': 0, 'perduts': 0, 'gols_favor': 0, 'gols_contra': 0}
+        self.quarters = {q: {'cnt': 0, 'rival': 0} for q in QUARTERS}
+        self.records = {}
+        self.streak = {'count': 0, 'start': None}  # ratxa de victòries en curs
+        self.errors = []
+
+    def add(self, reduced):
+        """Afegeix un partit reduït (cal cridar-ho per ordre de data, pels rècords)"""
+        if 'error' in reduced:
+            self.errors.append(f"{reduced['file']}: {reduced['error']}")
+            return
+        match = reduced['summary']
+        self.matches.append(match)
+        cnt, rival = match['scoreCNT'], match['scoreRival']
+
+        self.team['partits'] += 1
+        self.team['guanyats' if cnt > rival else 'perduts' if cnt < rival else 'empatats'] += 1
+        self.team['gols_favor'] += cnt
+        self.team['gols_contra'] += rival
+        for q in QUARTERS:
+            self.quarters[q]['cnt'] += as_int(reduced['quarters'][q].get('cnt'))
+            self.quarters[q]['rival'] += as_int(reduced['quarters'][q].get('rival'))
+
+        for key, player in reduced['players'].items():
+            total = self.players.setdefault(key, {'nom': player['nom'], 'numero': player['numero'],
+                                                  'partits': 0, 'stats': {}, 'quarters': {}})
+            total['partits'] += 1
+            add_counts(total['stats'], player['stats'])
+            add_counts(total['quarters'], player['quarters'])
+
+        self.update_records(match, reduced['players'])
+
+    def update_records(self, match, players):
+        """Mateixos rècords que calculava la pàgina (renderRecords)"""
+        records = self.records
+        diff = match['scoreCNT'] - match['scoreRival']
+        if diff > 0:
+            if 'bestWin' not in records or diff > records['bestWin']['diff']:
+                records['bestWin'] = dict(match, diff=diff)
+            streak = self.streak
+            if streak['count'] == 0:
+                streak['start'] = match['data']
+            streak['count'] += 1
+            if streak['count'] > records.get('bestStreak', 0):
+                records['bestStreak'] = streak['count']
+                records['bestStreakRange'] = {'start': streak['start'], 'end': match['data']}
+        else:
+            self.streak = {'count': 0, 'start': None}
+            if diff < 0 and ('worstLoss' not in records or -diff > records['worstLoss']['margin']):
+                records['worstLoss'] = dict(match, margin=-diff)
+
+        total = match['scoreCNT'] + match['scoreRival']
+        if 'mostGoals' not in records or total > records['mostGoals']['total']:
+            records['mostGoals'] = dict(match, total=total)
+
+        if 'mostExclusions' not in records or match['exclusionsCNT'] > records['mostExclusions']['ex']:
+            records['mostExclusions'] = dict(match, ex=match['exclusionsCNT'])
+
+        for player in players.values():
+            goals = as_int(player['stats'].get('gols'))
+            if goals > 0 and ('bestIndividual' not in records or goals > records['bestIndividual']['g']):
+                records['bestIndividual'] = {'name': player['nom'], 'g': goals,
+                                             'rival': match['rivalTeam'], 'date': match['data']}
+
+    def to_dict(self, team, season):
+        players = sorted(self.players.values(), key=lambda p: (-as_int(p['stats'].get('gols')), -p['partits']))
+        return {
+            'metadata': {
+                'team_key': team,
+                'season': season,
+                'matches': len(self.matches),
+                'generated_at': datetime.now().isoformat(),
+            },
+            'team': self.team,
+            'quarters': self.quarters,
+            'players': players,
+            'matches': self.matches,
+            'records': self.records,
+        }
+
+
+def build_dataset(team, source, season=SEASON, workers=None):
+    files = match_files(source)
+    print(f"\n📚 Anuari {team.upper()} {season}: {len(files)} partits a {source}")
+
+    if workers == 0:
+        reduced = list(map(summarize_match, files))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            reduced = list(pool.map(summarize_match, files, chunksize=8))
+
+    aggregate = SeasonAggregate()
+    for match in sorted(reduced, key=lambda r: r['summary']['data'] if 'summary' in r else ''):
+        aggregate.add(match)
+
+    output = aggregate.to_dict(team, season)
+    with open(dataset_file(team, season), 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=1)
+
+    for error in aggregate.errors:
+        print(f"   ⚠️ {error}")
+    print(f"💾 Guardat: {dataset_file(team, season)} ({len(aggregate.matches)} partits, "
+          f"{len(aggregate.players)} jugadors)")
+    return output
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Dades precalculades per als anuaris")
+    arg_parser.add_argument('team', choices=TEAMS, help="Categoria")
+    arg_parser.add_argument('source', help="Directori amb els partits (checkout del repositori de la categoria)")
+    arg_parser.add_argument('--season', default=SEASON, help=f"Temporada (per defecte {SEASON})")
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="Processos del pool (per defecte, un per CPU; 0 = sense pool)")
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    build_dataset(args.team, args.source, args.season, args.workers)
@@ -2,6 +2,9 @@
 // Network-first amb fallback a cache. Només recursos GET del mateix origen.
 const CACHE_NAME = 'cntv2-app-v1';
 
+// Precache amb hash de contingut (precache-manifest.json)
+importScripts('../../precache-sync.js');
+
 const PRECACHE = [
   './',
   './index.html'
@@ -12,6 +15,7 @@ self.addEventListener('install', event => {
   event.waitUntil(
     caches.open(CACHE_NAME)
       .then(cache => cache.addAll(PRECACHE))
+      .then(() => syncPrecache(CACHE_NAME))
       .catch(err => console.warn('[SW app] Precache incomplet:', err))
   );
   self.skipWaiting();
@@ -33,6 +37,7 @@ self.addEventListener('activate', event => {
 
 self.addEventListener('fetch', event => {
   const url = new URL(event.request.url);
+  maybeSyncPrecache(event, CACHE_NAME);
 
   // No interceptar: peticions no-GET (Firebase escriu amb POST) ni altres orígens
   // (Firestore/RTDB, CDNs, gstatic, federació...). Fetch directe.
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Benchmark d'escala del parser amb tornejos sintètics
+- Per cada mida (nombre d'equips) aixeca synthetic_tournament.py en un
+  procés a part (la memòria del servidor no compta) i hi passa les etapes:
+  parse_ranking, parse_calendar, get_all_rivals_form i
+  notify_changes.check_team_changes (amb tota la fase: abans i després de
+  l'última jornada, amb partits ajornats)
+- Cada etapa es fa dues vegades amb un parser nou: una per mesurar el temps
+  i una altra amb tracemalloc per mesurar el pic de memòria (tracemalloc
+  alenteix l'execució i no es barreja amb el temps)
+- Amb --memory-bounded les etapes es fan en el mode de memòria acotada del
+  parser (els soups s'alliberen en acabar cada parseig)
+- Escriu bench/tournament.json (resultats) i bench/tournament.svg (temps i
+  memòria segons la mida, sense dependències)
+- Les notificacions no s'envien: les credencials d'OneSignal es treuen de
+  l'entorn abans de començar
+"""
+
+import argparse
+import contextlib
+import html
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.request import urlopen
+
+import notify_changes
+import ultra_robust_parser
+from entity_index import EntityResolver
+from synthetic_tournament import SyntheticTournament
+
+STAGES = ('parse_ranking', 'parse_calendar', 'get_all_rivals_form', 'check_team_changes')
+DEFAULT_SIZES = (10, 25, 50, 100)
+DEFAULT_OUTPUT = 'bench/tournament'
+SERVER_START_TIMEOUT = 30
+COLORS = ('#c0392b', '#2980b9', '#27ae60', '#8e44ad')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def stand_in_server(teams, rounds, seed):
+    """Servidor sintètic en un altre procés; retorna la URL base quan ja respon"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'synthetic_tournament.py')
+    command = [sys.executable, script, '--teams', str(teams), '--seed', str(seed), '--port', str(port)]
+    if rounds:
+        command += ['--rounds', str(rounds)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            try:
+                with urlopen(f"{base}/health", timeout=1):
+                    break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"El servidor sintètic ({teams} equips) no arrenca")
+                time.sleep(0.1)
+        yield base
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure(function, trace):
+    """(resultat, segons, pic de memòria en bytes o None) d'una etapa; la sortida del parser es descarta"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = function()
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace else None
+            if trace:
+                tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def change_files(directory, teams, rounds, seed):
+    """Dades de tota la fase abans i després de l'última jornada jugada (per a check_team_changes)"""
+    current = SyntheticTournament(teams, rounds, seed=seed, postponed=0.1)
+    previous = SyntheticTournament(teams, rounds, played=max(0, current.played - 1), seed=seed)
+    paths = []
+    for name, tournament in (('old', previous), ('new', current)):
+        path = os.path.join(directory, f"{name}_actawp_bench.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(tournament.actawp_data(), f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def run_stages(base, files, trace):
+    """{etapa: (segons, pic)} d'una passada amb un parser nou (l'índex d'entitats no es desa)"""
+    ultra_robust_parser.ACTAWP_BASE = base
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        parser = ultra_robust_parser.ActawpParserV58()
+    parser.entities = EntityResolver()
+
+    timings = {}
+    ranking, *timings['parse_ranking'] = measure(
+        lambda: parser.parse_ranking(f"{base}/ca/tournament/1/ranking/1"), trace)
+    parser.calendar_dates, *timings['parse_calendar'] = measure(
+        lambda: parser.parse_calendar(f"{base}/ca/tournament/1/calendar/1/all"), trace)
+    rivals, *timings['get_all_rivals_form'] = measure(
+        lambda: parser.get_all_rivals_form(ranking, 'es'), trace)
+    _, *timings['check_team_changes'] = measure(
+        lambda: notify_changes.check_team_changes('BENCH', *files), trace)
+
+    if len(ranking) < 2 or not rivals:
+        raise RuntimeError(f"Passada incompleta: {len(ranking)} equips a la classificació, {len(rivals)} rivals")
+    return timings
+
+
+def bench_size(teams, rounds, seed, memory_bounded=False):
+    with tempfile.TemporaryDirectory() as directory, stand_in_server(teams, rounds, seed) as base:
+        files = change_files(directory, teams, rounds, seed)
+        timed = run_stages(base, files, trace=False)
+        traced = run_stages(base, files, trace=True)
+    tournament = SyntheticTournament(teams, rounds, seed=seed)
+    return {
+        'teams': teams,
+        'memory_bounded': memory_bounded,
+        'rounds': tournament.rounds,
+        'matches': len(tournament.matches),
+        'stages': {stage: {'seconds': round(timed[stage][0], 4), 'peak_bytes': traced[stage][1]}
+                   for stage in STAGES},
+    }
+
+
+# ─────────── Gràfic ───────────
+
+def svg_chart(results, metric, title, unit, scale, x, y, width, height):
+    """Un gràfic de línies (una per etapa) dins d'un SVG"""
+    sizes = [r['teams'] for r in results]
+    top = max([r['stages'][s][metric] / scale for r in results for s in STAGES] + [1e-9]) * 1.1
+    left, right = min(sizes), max(sizes)
+    span = (right - left) or 1
+
+    def px(size, value):
+        return (x + (size - left) / span * width, y + height - value / top * height)
+
+    parts = [f'<text x="{x}" y="{y - 12}" font-weight="bold">{html.escape(title)}</text>',
+             f'<line x1="{x}" y1="{y + height}" x2="{x + width}" y2="{y + height}" stroke="#999"/>',
+             f'<line x1="{x}" y1="{y}" x2="{x}" y2="{y + height}" stroke="#999"/>',
+             f'<text x="{x - 6}" y="{y + 4}" text-anchor="end">{top:.3g} {unit}</text>',
+             f'<text x="{x - 6}" y="{y + height}" text-anchor="end">0</text>']
+    for size in sizes:
+        parts.append(f'<text x="{px(size, 0)[0]:.1f}" y="{y + height + 16}" text-anchor="middle">{size}</text>')
+    for stage, color in zip(STAGES, COLORS):
+        points = ' '.join('%.1f,%.1f' % px(r['teams'], r['stages'][stage][metric] / scale) for r in results)
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2"/>')
+        parts.extend(f'<circle cx="{cx}" cy="{cy}" r="3" fill="{color}"/>'
+                     for cx, cy in (p.split(',') for p in points.split()))
+    return parts
+
+
+def write_svg(results, path):
+    width, height = 420, 260
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="1040" height="400" font-family="sans-serif" font-size="12">',
+             '<rect width="100%" height="100%" fill="white"/>']
+    parts += svg_chart(results, 'seconds', "Temps per etapa", 's', 1, 80, 50, width, height)
+    parts += svg_chart(results, 'peak_bytes', "Pic de memòria (tracemalloc)", 'MB', 1024 * 1024, 600, 50, width, height)
+    parts.append(f'<text x="520" y="{50 + height + 40}" text-anchor="middle">Equips</text>')
+    for i, (stage, color) in enumerate(zip(STAGES, COLORS)):
+        parts.append(f'<rect x="{80 + i * 230}" y="372" width="12" height="12" fill="{color}"/>'
+                     f'<text x="{98 + i * 230}" y="382">{stage}</text>')
+    parts.append('</svg>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+
+def print_table(results):
+    print(f"\n{'Equips':>7} {'Partits':>8}  " + '  '.join(f"{stage:>24}" for stage in STAGES))
+    for r in results:
+        cells = [f"{r['stages'][s]['seconds']:8.3f}s {r['stages'][s]['peak_bytes'] / 1024 / 1024:8.1f}MB" for s in STAGES]
+        print(f"{r['teams']:>7} {r['matches']:>8}  " + '  '.join(f"{cell:>24}" for cell in cells))
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Temps i memòria del parser segons la mida del torneig")
+    arg_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help=f"Nombres d'equips separats per comes (per defecte {','.join(map(str, DEFAULT_SIZES))})")
+    arg_parser.add_argument('--rounds', type=int, help="Jornades de cada torneig (per defecte, anada i tornada)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--memory-bounded', action='store_true',
+                            help="Parser en mode de memòria acotada (--memory-bounded)")
+    arg_parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                            help=f"Prefix dels fitxers de sortida (per defecte {DEFAULT_OUTPUT}.json/.svg)")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for variable in ('ONESIGNAL_APP_ID', 'ONESIGNAL_API_KEY'):
+        os.environ.pop(variable, None)
+    ultra_robust_parser.MEMORY_BOUNDED = args.memory_bounded
+
+    results = []
+    for teams in sorted(int(size) for size in args.sizes.split(',')):
+        print(f"⏱️ {teams} equips...", flush=True)
+        results.append(bench_size(teams, args.rounds, args.seed, args.memory_bounded))
+        stages = results[-1]['stages']
+        print('   ' + ', '.join(f"{s}: {stages[s]['seconds']:.2f}s / {stages[s]['peak_bytes'] / 1024 / 1024:.1f}MB"
+                                 for s in STAGES), flush=True)
+
+    print_table(results)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(f"{args.output}.json", 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': args.seed, 'results': results},
+                  f, ensure_ascii=False, indent=1)
+    write_svg(results, f"{args.output}.svg")
+    print(f"\n📈 {args.output}.json, {args.output}.svg")
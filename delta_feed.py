@@ -0,0 +1,176 @@
+"""
+Feed de canvis (JSON Patch) entre versions de actawp_{team}_data.json
+- Cada execució que canvia les dades publica una versió nova:
+  feeds/{team}/snapshot-{N}.json (sencer) i feeds/{team}/patch-{N}.json
+  (operacions RFC 6902 per passar de N-1 a N)
+- feeds/{team}/manifest.json diu la versió actual i els patches que hi ha;
+  un client amb la versió M només es baixa els patches M+1..N, i si M és
+  massa antiga (compactada) torna a baixar el snapshot
+- Compactació: es guarden com a molt MAX_PATCHES patches, i mai més bytes
+  de patches que el snapshot sencer (llavors surt més a compte baixar-lo)
+- Les marques de temps de cada execució (VOLATILE_FIELDS) no entren als
+  snapshots: dues execucions amb les mateixes dades no fan versió nova, i
+  el last_update que el workflow afegeix després no els desquadra
+"""
+
+import json
+import os
+from datetime import datetime
+
+FEEDS_DIR = 'feeds'
+MAX_PATCHES = 30
+# Camps que canvien a cada execució i no aporten res al client ("pare/fill" per als de dins)
+VOLATILE_FIELDS = ('last_update', 'metadata/downloaded_at', 'metadata/ingested_at',
+                   'metadata/ranking_validated_at')
+
+
+def feed_dir(team):
+    return f"{FEEDS_DIR}/{team}"
+
+
+def _pointer(path, key):
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def without_volatile(data):
+    """Còpia de `data` sense VOLATILE_FIELDS (només es copien els dicts que es toquen)"""
+    data = dict(data)
+    for field in VOLATILE_FIELDS:
+        parent, _, key = field.rpartition('/')
+        target = data
+        if parent:
+            if not isinstance(data.get(parent), dict):
+                continue
+            target = data[parent] = dict(data[parent])
+        target.pop(key, None)
+    return data
+
+
+def json_diff(old, new, path=''):
+    """Operacions JSON Patch (add/remove/replace) per passar de `old` a `new`
+
+    Els dicts es comparen clau a clau i les llistes de la mateixa mida element
+    a element; si la mida canvia, la llista es substitueix sencera.
+    """
+    if type(old) is not type(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+
+    if isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': _pointer(path, key)})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({'op': 'add', 'path': _pointer(path, key), 'value': value})
+            elif old[key] != value:
+                ops.extend(json_diff(old[key], value, _pointer(path, key)))
+        return ops
+
+    if isinstance(new, list):
+        if len(old) != len(new):
+            return [{'op': 'replace', 'path': path, 'value': new}]
+        ops = []
+        for index, (a, b) in enumerate(zip(old, new)):
+            if a != b:
+                ops.extend(json_diff(a, b, _pointer(path, index)))
+        return ops
+
+    return [] if old == new else [{'op': 'replace', 'path': path, 'value': new}]
+
+
+def apply_patch(document, ops):
+    """Aplica operacions add/remove/replace (les que genera json_diff)"""
+    for op in ops:
+        if op['path'] == '':
+            document = op['value']
+            continue
+        parts = [p.replace('~1', '/').replace('~0', '~') for p in op['path'].split('/')[1:]]
+        target = document
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        last = int(parts[-1]) if isinstance(target, list) else parts[-1]
+        if op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = op['value']
+    return document
+
+
+class DeltaFeed:
+
+    def __init__(self, team):
+        self.team = team
+        self.dir = feed_dir(team)
+        self.manifest_path = f"{self.dir}/manifest.json"
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {self.manifest_path}: {e} (es torna a començar)")
+        return {'version': 0, 'snapshot': None, 'patches': []}
+
+    def _path(self, name):
+        return f"{self.dir}/{name}"
+
+    def _read(self, name):
+        with open(self._path(name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, name, data):
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with open(self._path(name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return len(content.encode('utf-8'))
+
+    def _remove(self, name):
+        if name and os.path.exists(self._path(name)):
+            os.remove(self._path(name))
+
+    def publish(self, data):
+        """Publica `data` com a versió nova si ha canviat. Retorna la versió (o None si no hi ha canvis)"""
+        os.makedirs(self.dir, exist_ok=True)
+        data = without_volatile(data)
+
+        previous = None
+        if self.manifest['snapshot'] and os.path.exists(self._path(self.manifest['snapshot'])):
+            previous = self._read(self.manifest['snapshot'])
+        if previous == data:
+            return None
+
+        version = self.manifest['version'] + 1
+        snapshot = f"snapshot-{version}.json"
+        snapshot_size = self._write(snapshot, data)
+        self._remove(self.manifest['snapshot'])
+
+        if previous is None:
+            # Sense versió anterior no hi ha patch possible: els clients han de baixar el snapshot
+            for patch in self.manifest['patches']:
+                self._remove(patch['file'])
+            self.manifest['patches'] = []
+        else:
+            ops = json_diff(previous, data)
+            patch = f"patch-{version}.json"
+            size = self._write(patch, ops)
+            self.manifest['patches'].append({'from': version - 1, 'to': version, 'file': patch,
+                                             'ops': len(ops), 'size': size})
+
+        self.manifest.update(version=version, snapshot=snapshot, snapshot_size=snapshot_size,
+                             updated_at=datetime.now().isoformat())
+        self.compact()
+        self.manifest['oldest'] = self.manifest['patches'][0]['from'] if self.manifest['patches'] else version
+
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        return version
+
+    def compact(self):
+        """Elimina els patches més antics si n'hi ha massa o pesen més que el snapshot"""
+        patches = self.manifest['patches']
+        while patches and (len(patches) > MAX_PATCHES
+                           or sum(p['size'] for p in patches) > self.manifest['snapshot_size']):
+            self._remove(patches.pop(0)['file'])
@@ -0,0 +1,180 @@
+"""
+Índex d'entitats: noms d'equips i jugadors → identificador estable
+- Cada nom original es resol una sola vegada; després és una consulta a
+  un dict (aliases). L'índex es desa a actawp_entities.json i les
+  execucions següents ja tenen els noms coneguts resolts
+- Un nom nou es normalitza (sense "Ver", accents, puntuació ni prefixos
+  de club; per jugadors, l'ordre de les paraules no compta) i, si la clau
+  no existeix, es busca un equip/jugador semblant només entre els que
+  comparteixen trigrames (blocking): no es compara amb tots
+- Semblant = coeficient de Dice dels trigrames ≥ MIN_SIMILARITY i les
+  mateixes marques curtes ("B", "2", "II"): "SANT ANDREU" i "SANT ANDREU B"
+  són equips diferents
+- Els IDs d'equip són la clau de canonical_team del primer nom vist (els
+  mateixos que ja fan servir standings, ratings i h2h); els de jugador són
+  el slug del nom dins de l'equip (els documents de Firestore)
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from records import canonical_team
+
+ENTITIES_FILE = 'actawp_entities.json'
+NGRAM = 3
+MIN_SIMILARITY = 0.8
+
+
+def strip_ver(name):
+    """Treu el "Ver"/"Veure" que l'ACTAWP posa davant dels enllaços"""
+    return re.sub(r'^(Veure|Ver)', '', (name or '').strip(), flags=re.IGNORECASE).strip()
+
+
+def fold(text):
+    """Majúscules, sense accents ni puntuació i amb espais simples"""
+    text = unicodedata.normalize('NFD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^A-Z0-9]+', ' ', text.upper()).strip()
+
+
+def slug(text):
+    """Com el slug() de app-nova/shared/store.js ("C.N. Montjuïc" → "c_n_montjuic")"""
+    text = unicodedata.normalize('NFD', (text or '').lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', '_', text).strip('_')
+
+
+def team_key(name):
+    return fold(canonical_team(strip_ver(name)))
+
+
+def player_key(name):
+    return ' '.join(sorted(fold(strip_ver(name)).split()))
+
+
+def ngrams(key):
+    padded = f" {key} "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+
+def markers(key):
+    """Paraules curtes o números que distingeixen equips filials ("B", "2", "II")"""
+    return {token for token in key.split() if len(token) <= 2 or token.isdigit()}
+
+
+class EntityIndex:
+
+    def __init__(self, make_key, make_id):
+        self.make_key = make_key
+        self.make_id = make_id
+        self.aliases = {}  # "àmbit|nom original" → id
+        self.keys = {}     # "àmbit|clau normalitzada" → id
+        self.names = {}    # id → primer nom vist
+        self.blocks = defaultdict(set)  # "àmbit|trigrama" → claus
+        self.sizes = {}    # clau → nombre de trigrames
+        self.lock = threading.Lock()  # els fils de parse del pipeline resolen noms alhora
+
+    def _block(self, scope, key):
+        grams = ngrams(key)
+        self.sizes[key] = len(grams)
+        for gram in grams:
+            self.blocks[f"{scope}|{gram}"].add(key)
+
+    def _similar(self, scope, key):
+        """Clau existent més semblant dins de l'àmbit (o None)"""
+        grams = ngrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self.blocks.get(f"{scope}|{gram}", ()):
+                shared[candidate] += 1
+
+        best, best_score = None, MIN_SIMILARITY
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + self.sizes[candidate])
+            if score >= best_score and markers(candidate) == markers(key):
+                best, best_score = candidate, score
+        return best
+
+    def resolve(self, name, scope=''):
+        """ID estable de `name` (dins de `scope`: l'equip, pels jugadors)"""
+        alias = f"{scope}|{name}"
+        cached = self.aliases.get(alias)
+        if cached is not None:
+            return cached
+
+        key = self.make_key(name)
+        if not key:
+            return ''
+        with self.lock:
+            entity = self.keys.get(f"{scope}|{key}")
+            if entity is None:
+                similar = self._similar(scope, key)
+                if similar is not None:
+                    entity = self.keys[f"{scope}|{similar}"]
+                else:
+                    entity = self._new_id(name, scope)
+                    self.names[entity] = name
+                self.keys[f"{scope}|{key}"] = entity
+                self._block(scope, key)
+            self.aliases[alias] = entity
+        return entity
+
+    def _new_id(self, name, scope):
+        base = self.make_id(name)
+        entity = f"{scope}/{base}" if scope else base
+        suffix = 2
+        while entity in self.names:
+            entity = f"{scope}/{base}_{suffix}" if scope else f"{base}_{suffix}"
+            suffix += 1
+        return entity
+
+    # --- Persistència ---
+
+    def to_dict(self):
+        return {'aliases': self.aliases, 'keys': self.keys, 'names': self.names}
+
+    def load_state(self, state):
+        self.aliases = state.get('aliases', {})
+        self.keys = state.get('keys', {})
+        self.names = state.get('names', {})
+        for scoped_key in self.keys:
+            scope, _, key = scoped_key.partition('|')
+            self._block(scope, key)
+
+
+class EntityResolver:
+    """Equips (sense àmbit) i jugadors (per equip), desats junts"""
+
+    def __init__(self):
+        self.teams = EntityIndex(team_key, lambda name: canonical_team(strip_ver(name)))
+        self.players = EntityIndex(player_key, lambda name: slug(strip_ver(name)))
+
+    def team_id(self, name):
+        return self.teams.resolve(name or '')
+
+    def player_id(self, team, name):
+        """ID del jugador dins de l'equip (sense el prefix de l'equip)"""
+        return self.players.resolve(name or '', team).split('/', 1)[-1]
+
+    @classmethod
+    def load(cls, path=ENTITIES_FILE):
+        resolver = cls()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                resolver.teams.load_state(state.get('teams', {}))
+                resolver.players.load_state(state.get('players', {}))
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {path}: {e} (es torna a començar)")
+                resolver = cls()
+        return resolver
+
+    def save(self, path=ENTITIES_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'teams': self.teams.to_dict(), 'players': self.players.to_dict()},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
@@ -0,0 +1,136 @@
+"""
+Pipeline productor/consumidor per al parser ACTAWP
+- Fils "fetch": agafen treballs del ScrapeScheduler per ordre de prioritat i
+  només fan xarxa (pestanyes, classificació, calendari)
+- Cua limitada entre etapes: si el parseig va endarrerit, els fetchers esperen
+  (backpressure) i no s'acumula HTML a memòria
+- Fils "parse": parsegen amb BeautifulSoup. Amb --process-parse les pàgines
+  grans (classificació, calendari) van a un pool de processos
+- Al final es mostren mètriques per etapa (treballs, treballs/s, ocupació)
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+_STOP = object()
+
+
+class StageMetrics:
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0      # segons treballant (sumat per tots els fils)
+        self.blocked = 0.0   # segons esperant la cua (plena pels fetchers, buida pels parsers)
+        self._lock = threading.Lock()
+
+    def add(self, busy, blocked=0.0):
+        with self._lock:
+            self.items += 1
+            self.busy += busy
+            self.blocked += blocked
+
+    def as_dict(self, elapsed):
+        return {
+            'items': self.items,
+            'items_per_s': round(self.items / elapsed, 2) if elapsed else 0,
+            'busy_s': round(self.busy, 2),
+            'blocked_s': round(self.blocked, 2),
+            'utilization': round(self.busy / (elapsed * self.workers), 2) if elapsed else 0,
+        }
+
+
+class FetchParsePipeline:
+
+    def __init__(self, fetch_workers=4, parse_workers=2, queue_size=8, process_parse=False):
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.queue_size = queue_size
+        self.process_parse = process_parse
+        self.metrics = {}
+
+    def run(self, scheduler):
+        raw_queue = queue.Queue(self.queue_size)
+        fetch_stats = StageMetrics('fetch', self.fetch_workers)
+        parse_stats = StageMetrics('parse', self.parse_workers)
+        max_depth = [0]
+        pool = ProcessPoolExecutor(self.parse_workers) if self.process_parse else None
+        start = time.monotonic()
+
+        def fetch_loop():
+            while True:
+                job = scheduler.take()
+                if job is None:
+                    return
+                t0 = time.monotonic()
+                try:
+                    raw = job.fetch()
+                except Exception as e:
+                    scheduler.fail(job, e)
+                    continue
+                t1 = time.monotonic()
+                raw_queue.put((job, raw))  # bloqueja si la cua és plena
+                fetch_stats.add(t1 - t0, time.monotonic() - t1)
+                max_depth[0] = max(max_depth[0], raw_queue.qsize())
+
+        def parse_loop():
+            while True:
+                t0 = time.monotonic()
+                item = raw_queue.get()
+                if item is _STOP:
+                    return
+                job, raw = item
+                t1 = time.monotonic()
+                try:
+                    if not job.parse:
+                        value = raw
+                    elif pool and job.heavy:
+                        value = pool.submit(job.parse, raw).result()
+                    else:
+                        value = job.parse(raw)
+                except Exception as e:
+                    scheduler.fail(job, e)
+                    continue
+                finally:
+                    parse_stats.add(time.monotonic() - t1, t1 - t0)
+                del item, raw  # l'HTML ja no cal: no esperar a la pàgina següent per alliberar-lo
+                scheduler.complete(job, value)
+
+        fetchers = [threading.Thread(target=fetch_loop, name=f'fetch-{i}') for i in range(self.fetch_workers)]
+        parsers = [threading.Thread(target=parse_loop, name=f'parse-{i}') for i in range(self.parse_workers)]
+        for thread in fetchers + parsers:
+            thread.start()
+
+        # Els fetchers acaben quan no queda res pendent, i per això esperen que
+        # els parsers hagin acabat (un parse pot afegir treballs nous)
+        for thread in fetchers:
+            thread.join()
+        for _ in parsers:
+            raw_queue.put(_STOP)
+        for thread in parsers:
+            thread.join()
+        if pool:
+            pool.shutdown()
+
+        elapsed = time.monotonic() - start
+        self.metrics = {
+            'elapsed_s': round(elapsed, 2),
+            'fetch': fetch_stats.as_dict(elapsed),
+            'parse': parse_stats.as_dict(elapsed),
+            'queue_max_depth': max_depth[0],
+            'queue_size': self.queue_size,
+        }
+        self.report()
+        return self.metrics
+
+    def report(self):
+        m = self.metrics
+        print(f"\n📈 Pipeline: {m['elapsed_s']} s")
+        for stage in ('fetch', 'parse'):
+            s = m[stage]
+            print(f"   {stage}: {s['items']} treballs, {s['items_per_s']}/s, "
+                  f"ocupació {s['utilization']:.0%}, {s['blocked_s']} s esperant la cua")
+        print(f"   cua: màxim {m['queue_max_depth']}/{m['queue_size']}")
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Sincronització de les dades del parser a Firestore (app-nova/DATA-MODEL.md)
+- Converteix actawp_{team}_data.json en documents del model: teams/{teamId},
+  teams/{teamId}/players/{playerId} i matches/{matchId}
+- Compara cada document amb l'últim estat sincronitzat
+  (actawp_{team}_firestore.json: ruta → hash) i només escriu els que han
+  canviat; una execució normal són uns pocs documents
+- Les escriptures van en batches de com a molt 500 operacions (el límit de
+  Firestore) i els batches es fan commit en paral·lel. L'estat només
+  s'actualitza amb els batches que s'han confirmat
+- Els documents s'escriuen amb merge: els camps que hi posa l'app d'entrada
+  (actions, lineups, playerStats, accentColor...) no es toquen
+- Un partit pendent que desapareix (ajornat) només s'esborra si el document
+  és només nostre: font 'fcn', sense `estat` (l'app d'entrada el posa en
+  crear el partit, amb el mateix id) i sense subcol·leccions. L'esborrat va
+  amb precondició de l'hora d'actualització llegida; si no, es deixa estar
+- Amb --emulator (o FIRESTORE_EMULATOR_HOST) es connecta a l'emulador local:
+  firebase emulators:start --only firestore
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from anuari_dataset import SEASON
+from entity_index import EntityResolver, slug
+from head_to_head import OWN_TEAM
+from records import Match, Result, PlayerLine, as_records, canonical_team
+
+PROJECT_ID = 'cnt-wp-stats-bb7dc'
+TEAMS = ('juvenil', 'cadet')
+MAX_BATCH_OPS = 500
+BATCH_WORKERS = 4
+HASH_LENGTH = 16
+
+
+def data_file(team):
+    return f"actawp_{team}_data.json"
+
+
+def state_file(team):
+    return f"actawp_{team}_firestore.json"
+
+
+def match_timestamp(date):
+    """dd/mm/aaaa → ms (com el camp `data` de l'app nova), o None"""
+    try:
+        return int(datetime.strptime(date or '', '%d/%m/%Y').timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def document_hash(document):
+    return hashlib.sha256(json.dumps(document, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+# ─────────── Parser → model de l'app nova ───────────
+
+def match_document(team, record, finished):
+    """(ruta, document) d'un partit, o None si no és nostre o no té data"""
+    home = OWN_TEAM in canonical_team(record.team1)
+    if not home and OWN_TEAM not in canonical_team(record.team2):
+        return None
+    timestamp = match_timestamp(record.date)
+    if timestamp is None:
+        return None
+
+    rival = record.team2 if home else record.team1
+    ymd = datetime.strptime(record.date, '%d/%m/%Y').strftime('%Y-%m-%d')
+    document = {
+        'teamId': team,
+        'temporada': SEASON,
+        'data': timestamp,
+        'competicio': 'lliga',
+        'rival': rival,
+        'rivalSlug': slug(rival),
+        'location': 'home' if home else 'away',
+        'font': 'fcn',
+        'sourceId': record.match_id,
+        'jornada': record.jornada,
+    }
+    if finished:
+        goals = record.goals()
+        if goals is None:
+            return None
+        document.update(estat='finished',
+                        scoreCNT=goals[0] if home else goals[1],
+                        scoreRival=goals[1] if home else goals[0])
+    return f"matches/{team}_{ymd}_{slug(rival)}", document
+
+
+def team_documents(team, data, entities=None):
+    """{ruta: document} del model per a les dades del parser d'un equip"""
+    entities = entities or EntityResolver.load()
+    metadata = data.get('metadata') or {}
+    documents = {
+        f"teams/{team}": {
+            'categoria': team,
+            'temporada': SEASON,
+            'entrenador': metadata.get('coach'),
+            'font': 'fcn',
+            'sourceId': metadata.get('team_id'),
+            'classificacio': data.get('ranking') or [],
+            'estadistiques': data.get('team_stats') or {},
+        },
+    }
+
+    # Estadístiques de temporada de la federació: el parser no té playerStats per partit
+    for player in as_records(data.get('players') or [], PlayerLine):
+        if not player.Nombre:
+            continue
+        stats = player.to_dict()
+        stats.pop('Nombre')
+        documents[f"teams/{team}/players/{entities.player_id(team, player.Nombre)}"] = {
+            'nom': player.Nombre, 'actiu': True, 'estadistiquesFcn': stats,
+        }
+
+    for section, cls, finished in (('upcoming_matches', Match, False), ('last_results', Result, True)):
+        for record in as_records(data.get(section) or [], cls):
+            mapped = match_document(team, record, finished)
+            if mapped:
+                documents[mapped[0]] = mapped[1]
+    return documents
+
+
+# ─────────── Sincronització ───────────
+
+def client(project=PROJECT_ID, emulator=None):
+    if emulator:
+        os.environ['FIRESTORE_EMULATOR_HOST'] = emulator
+    from google.cloud import firestore
+    return firestore.Client(project=project)
+
+
+class FirestoreSync:
+
+    def __init__(self, team, db=None):
+        self.team = team
+        self.db = db
+        self.state = {}  # ruta → hash de l'últim document escrit
+        if os.path.exists(state_file(team)):
+            try:
+                with open(state_file(team), 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {state_file(team)}: {e} (es torna a sincronitzar tot)")
+
+    def plan(self, documents):
+        """Operacions pendents: [(ruta, document o None per esborrar, hash)]"""
+        ops = []
+        for path, document in sorted(documents.items()):
+            digest = document_hash(document)
+            if document.get('estat') == 'finished':
+                digest = f"finished:{digest}"  # els partits jugats no s'esborren mai
+            if self.state.get(path) != digest:
+                ops.append((path, document, digest))
+        # Només s'esborren partits pendents que ja no hi són (ajornats); els jugats es mantenen
+        for path in sorted(self.state):
+            if path not in documents and path.startswith('matches/') and not self.state[path].startswith('finished:'):
+                ops.append((path, None, None))
+        return ops
+
+    def _deletable(self, path):
+        """Hora d'actualització del document si el podem esborrar, o None si és de l'app d'entrada o no hi és"""
+        ref = self.db.document(path)
+        snapshot = ref.get()
+        if not snapshot.exists:
+            return None
+        document = snapshot.to_dict()
+        if document.get('font') != 'fcn' or document.get('estat') or next(iter(ref.collections()), None):
+            print(f"   ↷ {path}: el fa servir l'app d'entrada, no s'esborra")
+            return None
+        return snapshot.update_time
+
+    def _commit(self, batch_ops):
+        batch = self.db.batch()
+        writes = 0
+        for path, document, update_time in batch_ops:
+            ref = self.db.document(path)
+            if document is None:
+                if update_time is None:
+                    continue  # només es deixa de seguir
+                batch.delete(ref, option=self.db.write_option(last_update_time=update_time))
+            else:
+                batch.set(ref, dict(document, lastUpdate=int(datetime.now().timestamp() * 1000)), merge=True)
+            writes += 1
+        if writes:
+            batch.commit()
+        return batch_ops
+
+    def sync(self, documents, dry_run=False):
+        """Escriu els documents canviats. Retorna (operacions fetes, fallides)"""
+        ops = self.plan(documents)
+        print(f"🔥 Firestore {self.team}: {len(documents)} documents, {len(ops)} canvis")
+        if dry_run or not ops:
+            for path, document, _ in ops[:20]:
+                print(f"   {'✖' if document is None else '✎'} {path}")
+            return len(ops), 0
+
+        # Esborrats: només els documents que encara són només nostres (sense l'hora, es deixa de seguir)
+        ops = [(path, None, self._deletable(path)) if document is None else (path, document, digest)
+               for path, document, digest in ops]
+        batches = [ops[i:i + MAX_BATCH_OPS] for i in range(0, len(ops), MAX_BATCH_OPS)]
+        done, failed = 0, 0
+        with ThreadPoolExecutor(min(BATCH_WORKERS, len(batches))) as pool:
+            futures = [pool.submit(self._commit, batch_ops) for batch_ops in batches]
+            for future in futures:
+                try:
+                    committed = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ Batch fallit: {e}")
+                    failed += 1
+                    continue
+                for path, document, digest in committed:
+                    if document is None:
+                        self.state.pop(path, None)
+                    else:
+                        self.state[path] = digest
+                done += len(committed)
+
+        self.save()
+        print(f"   ✅ {done} escriptures en {len(batches) - failed}/{len(batches)} batches")
+        return done, failed
+
+    def save(self):
+        with open(state_file(self.team), 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Sincronitza les dades del parser a Firestore")
+    arg_parser.add_argument('--team', choices=TEAMS, help="Només aquest equip (per defecte, tots)")
+    arg_parser.add_argument('--project', default=os.environ.get('GOOGLE_CLOUD_PROJECT', PROJECT_ID),
+                            help=f"Projecte de Firebase (per defecte {PROJECT_ID})")
+    arg_parser.add_argument('--emulator', metavar='HOST:PORT',
+                            help="Emulador de Firestore (p. ex. localhost:8080)")
+    arg_parser.add_argument('--full', action='store_true',
+                            help="Ignora l'estat sincronitzat i torna a escriure tots els documents")
+    arg_parser.add_argument('--dry-run', action='store_true', help="Només mostra què s'escriuria")
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    db = None if args.dry_run else client(args.project, args.emulator)
+    entities = EntityResolver.load()
+    for team in ([args.team] if args.team else TEAMS):
+        if not os.path.exists(data_file(team)):
+            print(f"⚠️ {data_file(team)}: no existeix")
+            continue
+        with open(data_file(team), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        sync = FirestoreSync(team, db)
+        if args.full:
+            sync.state = {}
+        sync.sync(team_documents(team, data, entities), dry_run=args.dry_run)
+    if not args.dry_run:
+        entities.save()
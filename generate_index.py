@@ -1,39 +1,188 @@
-Perfecte! Anem a implementar l'Opció 1 pas a pas.
-📋 PAS 1: Crear l'script Python
-Crea un nou fitxer al teu repositori anomenat generate_index.py:
-python#!/usr/bin/env python3
-"""
-Script per generar un índex de tots els partits
-Executa automàticament amb GitHub Actions
-"""
-import json
-import os
-from pathlib import Path
-from datetime import datetime
-
-def generate_matches_index():
-    # Buscar tots els fitxers de partits (cnt_stats_*.json)
-    match_files = sorted([
-        f.name for f in Path('.').glob('cnt_stats_*.json')
-    ], reverse=True)  # Més recents primer
-    
-    # Crear l'índex
-    index = {
-        "last_updated": datetime.utcnow().isoformat() + "Z",
-        "total_matches": len(match_files),
-        "files": match_files
-    }
-    
-    # Guardar l'índex
-    with open('matches_index.json', 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
-    
-    print(f"✅ Índex generat: {len(match_files)} partits")
-    for f in match_files:
-        print(f"   - {f}")
-    
-    return len(match_files)
-
-if __name__ == "__main__":
-    count = generate_matches_index()
-    print(f"\n✅ matches_index.json creat amb {count} partits")
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Script per generar un índex de tots els partits
+Executa automàticament amb GitHub Actions
+- Per cada cnt_stats_*.json guarda data, rival, marcador i competició, així
+  la web té la llista de partits amb una sola petició
+- Incremental: es reaprofita l'entrada de l'índex anterior si el fitxer no
+  ha canviat (mateix mtime i mida, o mateix hash si només ha canviat l'mtime,
+  p.ex. després d'un checkout) i només es llegeixen els fitxers nous o canviats.
+  mtime, mida i hash van a matches_index_cache.json, no a l'índex publicat
+- Lectura en streaming amb ijson (requirements.txt): es para de llegir quan
+  ja es tenen les metadades, sense carregar les accions del partit
+- Tots els fitxers surten a l'índex: si el marcador no és numèric o el
+  fitxer no es pot llegir, l'entrada va amb el marcador a null
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from datetime import datetime
+
+INDEX_FILE = 'matches_index.json'
+CACHE_FILE = 'matches_index_cache.json'
+
+# Camps que es busquen a cada format de fitxer (prefix ijson → camp de l'índex)
+METADATA_FIELDS = {
+    'metadata.date': 'date',
+    'metadata.rivalTeam': 'rival',
+    'metadata.competition': 'competition',
+    'metadata.season': 'season',
+    'metadata.location': 'location',
+    'metadata.finalScore.cnt': 'score_cnt',
+    'metadata.finalScore.rival': 'score_rival',
+}
+# Format antic (exportData de l'app d'entrada)
+LEGACY_FIELDS = {
+    'data': 'date',
+    'rivalTeam': 'rival',
+    'temporada': 'season',
+    'matchLocation': 'location',
+    'scoreCNT': 'score_cnt',
+    'scoreRival': 'score_rival',
+}
+
+warned_no_ijson = False
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_fields_streaming(path):
+    """Llegeix només les metadades (para quan les té totes o s'acaba el bloc metadata)"""
+    import ijson
+
+    found = {}
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'metadata' and event == 'end_map':
+                break
+            field = METADATA_FIELDS.get(prefix) or LEGACY_FIELDS.get(prefix)
+            if field and event in ('string', 'number', 'integer', 'double'):
+                found[field] = value
+                if len(found) == len(LEGACY_FIELDS) and not prefix.startswith('metadata'):
+                    break
+    return found
+
+
+def read_fields(path):
+    """Metadades del partit; sense ijson es carrega el fitxer sencer"""
+    global warned_no_ijson
+    try:
+        return read_fields_streaming(path)
+    except ImportError:
+        if not warned_no_ijson:
+            print("⚠️ ijson no està instal·lat (pip install -r requirements.txt): es carrega cada fitxer sencer")
+            warned_no_ijson = True
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    found = {}
+    for fields in (METADATA_FIELDS, LEGACY_FIELDS):
+        for prefix, field in fields.items():
+            value = data
+            for part in prefix.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            if value is not None:
+                found[field] = value
+    return found
+
+
+def goals(value):
+    """Gols com a enter, o None si no és un número (0 si no hi és)"""
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def match_entry(path):
+    """Entrada de l'índex per un fitxer de partit (marcador a null si no es pot llegir)"""
+    try:
+        fields = read_fields(path)
+        score_cnt, score_rival = goals(fields.get('score_cnt')), goals(fields.get('score_rival'))
+    except Exception as e:
+        print(f"⚠️ {path.name}: {e}")
+        fields, score_cnt, score_rival = {}, None, None
+    scored = score_cnt is not None and score_rival is not None
+    return {
+        'file': path.name,
+        'date': str(fields.get('date', ''))[:10],
+        'rival': fields.get('rival', ''),
+        'score': f"{score_cnt}-{score_rival}" if scored else None,
+        'result': (('W' if score_cnt > score_rival else 'L' if score_cnt < score_rival else 'D')
+                   if scored else None),
+        'competition': fields.get('competition', ''),
+        'season': fields.get('season', ''),
+        'location': fields.get('location', ''),
+    }
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ No s'ha pogut llegir {path}: {e} (es regenera sencer)")
+        return default
+
+
+def generate_matches_index():
+    previous = {m['file']: m for m in load_json(INDEX_FILE, {}).get('matches', [])}
+    cache = load_json(CACHE_FILE, {})  # fitxer → {mtime, size, hash}
+    matches = []
+    seen = {}
+    read = 0
+
+    for path in Path('.').glob('cnt_stats_*.json'):
+        stat = path.stat()
+        entry, known = previous.get(path.name), cache.get(path.name, {})
+        if entry and known.get('mtime') == stat.st_mtime and known.get('size') == stat.st_size:
+            matches.append(entry)
+            seen[path.name] = known
+            continue
+
+        digest = file_hash(path)
+        seen[path.name] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': digest}
+        if entry and known.get('hash') == digest:
+            # Mateix contingut (checkout, còpia): només cal actualitzar l'mtime
+            matches.append(entry)
+            continue
+
+        matches.append(match_entry(path))
+        read += 1
+
+    # Més recents primer
+    matches.sort(key=lambda m: (m['date'], m['file']), reverse=True)
+
+    # Crear l'índex
+    index = {
+        "last_updated": datetime.utcnow().isoformat() + "Z",
+        "total_matches": len(matches),
+        "files": [m['file'] for m in matches],
+        "matches": matches
+    }
+
+    # Guardar l'índex
+    with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(seen, f, indent=1, ensure_ascii=False, sort_keys=True)
+
+    removed = len(set(previous) - set(index['files']))
+    print(f"✅ Índex generat: {len(matches)} partits ({read} llegits, {len(matches) - read} reaprofitats, {removed} eliminats)")
+    for m in matches:
+        print(f"   - {m['date']} vs {m['rival']} {m['score'] or '?'} ({m['file']})")
+
+    return len(matches)
+
+if __name__ == "__main__":
+    count = generate_matches_index()
+    print(f"\n✅ matches_index.json creat amb {count} partits")
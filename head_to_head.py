@@ -0,0 +1,161 @@
+"""
+Índex d'enfrontaments directes (head-to-head)
+- Es construeix amb tot el que veu el parser: resultats del calendari de
+  la fase, els nostres últims resultats i els dels rivals
+- Clau: parella d'equips canònica ("A|B" ordenada, amb records.canonical_team);
+  cada partit es guarda una vegada per match_id (un marcador corregit
+  substitueix l'anterior). Un partit que arriba amb l'ID de l'URL i amb el
+  de reserva (equips + data) es guarda una sola vegada (records.GameIds)
+- L'estat sencer es desa a actawp_{team}_h2h.json; per cada rival nostre
+  s'escriu un fitxer petit h2h/{team}/{rival}.json amb V/E/D, gols i
+  partits, perquè la previa d'un partit només n'hagi de llegir un
+- Els fitxers només es reescriuen si el contingut canvia
+"""
+
+import json
+import os
+
+from entity_index import slug
+from records import GameIds, canonical_team
+
+OWN_TEAM = 'TERRASSA'
+SHARDS_DIR = 'h2h'
+
+
+def h2h_file(team):
+    return f"actawp_{team}_h2h.json"
+
+
+def opponent_slug(name):
+    """Nom de fitxer del rival: "C.N. Montjuïc C" → "montjuic-c" (accents plegats com a entity_index.slug)"""
+    return slug(canonical_team(name)).replace('_', '-')
+
+
+def shard_path(team, opponent):
+    return f"{SHARDS_DIR}/{team}/{opponent_slug(opponent)}.json"
+
+
+def pair_key(key1, key2):
+    return '|'.join(sorted((key1, key2)))
+
+
+class HeadToHeadIndex:
+
+    def __init__(self, normalize=None):
+        self.normalize = normalize or canonical_team
+        self.pairs = {}  # "A|B" → {'names': {A: nom, B: nom}, 'matches': {match_id: {...}}}
+        self.games = GameIds()
+
+    def index_games(self):
+        self.games = GameIds()
+        for pair in self.pairs.values():
+            for match_id, match in pair['matches'].items():
+                self.games.remember(match_id, match['team1'], match['team2'], match['date'] or None)
+
+    def add_result(self, result):
+        """Afegeix (o corregeix) un Result. Retorna True si ha canviat l'índex"""
+        goals = result.goals()
+        if not goals:
+            return False
+        key1, key2 = self.normalize(result.team1), self.normalize(result.team2)
+        if not key1 or not key2 or key1 == key2:
+            return False
+
+        pair = self.pairs.setdefault(pair_key(key1, key2), {'names': {}, 'matches': {}})
+        pair['names'].setdefault(key1, result.team1)
+        pair['names'].setdefault(key2, result.team2)
+        match = {
+            'team1': key1,
+            'team2': key2,
+            'goals1': goals[0],
+            'goals2': goals[1],
+            'date': result.date or '',
+            'url': result.url or '',
+        }
+        match_id = self.games.claim(result.match_id, key1, key2, result.date, pair['matches'])
+        previous = pair['matches'].get(match_id)
+        if previous and match_id != result.match_id:
+            match['url'] = previous['url']  # ha arribat amb l'ID de reserva: l'enllaç bo és el de l'URL
+        if previous == match or (previous and not match['date'] and previous['date']):
+            # Mateix partit, o la mateixa dada sense data (rivals sense calendari)
+            return False
+        pair['matches'][match_id] = match
+        self.games.remember(match_id, key1, key2, result.date)
+        return True
+
+    def add_results(self, results):
+        return sum(1 for result in results if self.add_result(result))
+
+    def summary(self, team, opponent):
+        """Balanç de `team` contra `opponent`: V/E/D, gols i partits (més recents primer)"""
+        key, other = self.normalize(team), self.normalize(opponent)
+        pair = self.pairs.get(pair_key(key, other), {'names': {}, 'matches': {}})
+        summary = {
+            'team': pair['names'].get(key, team),
+            'opponent': pair['names'].get(other, opponent),
+            'played': 0, 'wins': 0, 'draws': 0, 'losses': 0,
+            'goals_for': 0, 'goals_against': 0,
+            'matches': [],
+        }
+        for match in pair['matches'].values():
+            ours, theirs = ((match['goals1'], match['goals2']) if match['team1'] == key
+                            else (match['goals2'], match['goals1']))
+            summary['played'] += 1
+            summary['wins' if ours > theirs else 'draws' if ours == theirs else 'losses'] += 1
+            summary['goals_for'] += ours
+            summary['goals_against'] += theirs
+            summary['matches'].append({
+                'date': match['date'],
+                'team1': pair['names'].get(match['team1'], match['team1']),
+                'team2': pair['names'].get(match['team2'], match['team2']),
+                'score': f"{match['goals1']}-{match['goals2']}",
+                'url': match['url'],
+            })
+        summary['matches'].sort(key=lambda m: '/'.join(reversed(m['date'].split('/'))), reverse=True)
+        return summary
+
+    def own_opponents(self):
+        """(nostre nom, nom del rival) per cada parella on juguem nosaltres"""
+        for pair in self.pairs.values():
+            ours = [k for k in pair['names'] if OWN_TEAM in k]
+            others = [k for k in pair['names'] if OWN_TEAM not in k]
+            if ours and others:
+                yield pair['names'][ours[0]], pair['names'][others[0]]
+
+    def write_shards(self, team):
+        """Escriu h2h/{team}/{rival}.json per cada rival; retorna quants fitxers han canviat"""
+        os.makedirs(f"{SHARDS_DIR}/{team}", exist_ok=True)
+        written = 0
+        for own, opponent in self.own_opponents():
+            path = shard_path(team, opponent)
+            content = json.dumps(self.summary(own, opponent), ensure_ascii=False, indent=1)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    if f.read() == content:
+                        continue
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            written += 1
+        return written
+
+    # --- Persistència ---
+
+    def to_dict(self):
+        return {'pairs': self.pairs}
+
+    @classmethod
+    def load(cls, path, normalize=None):
+        index = cls(normalize)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index.pairs = json.load(f).get('pairs', {})
+                index.index_games()
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {path}: {e} (es recalcula)")
+                index = cls(normalize)
+        return index
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
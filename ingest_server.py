@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Servei d'entrada de resultats (webhook HTTP amb asyncio)
+- POST /result amb el mateix payload que els repository_dispatch
+  new_match_cadet / new_match_juvenil:
+  {"team": "cadet", "rival": "...", "date": "dd/mm/aaaa", "our_score": 9,
+   "rival_score": 7, "location": "home" | "away", "jornada": "5"}
+- Valida el payload i actualitza només l'equip afectat: afegeix el resultat
+  a actawp_{team}_data.json (i el treu dels pròxims partits), i l'aplica de
+  manera incremental a la classificació, el rating i els enfrontaments
+  directes. Després publica el feed de canvis, el pre-renderitzat dels
+  anuaris i el manifest de precache
+- Si el partit era als pròxims partits es fa servir el seu URL: el
+  match_id és el mateix que tindrà el resultat quan el parser el baixi i no
+  es compta dues vegades
+- Els equips es resolen amb l'índex d'entitats del parser
+  (actawp_entities.json) i el nostre nom és el de la classificació
+- Respon de seguida i el notificador (notify_changes) s'executa després;
+  un payload repetit no torna a notificar
+- Amb INGEST_TOKEN definit cal la capçalera Authorization: Bearer {token}
+- Amb --publish es fa commit i push dels fitxers canviats
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from delta_feed import DeltaFeed
+from entity_index import EntityResolver
+from head_to_head import HeadToHeadIndex, OWN_TEAM, h2h_file
+from ratings import EloRatings, ratings_file
+from records import Match, Result, as_records, canonical_team, encode
+from standings import StandingsEngine, standings_file
+
+TEAMS = ('juvenil', 'cadet')
+DEFAULT_PORT = 8787
+MAX_BODY = 64 * 1024
+MAX_SCORE = 99
+OWN_NAME = 'CN Terrassa'
+
+# Fitxers que canvien amb un resultat (per --publish)
+PUBLISHED = ('actawp_*.json', 'h2h', 'feeds', 'anuari-*.html', '*precache-manifest.json')
+
+STATUS_TEXT = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized',
+               404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class PayloadError(ValueError):
+    pass
+
+
+def data_file(team):
+    return f"actawp_{team}_data.json"
+
+
+def parse_date(value):
+    """dd/mm/aaaa o aaaa-mm-dd → dd/mm/aaaa (el format del parser)"""
+    for fmt in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%d/%m/%Y')
+        except (TypeError, ValueError):
+            continue
+    raise PayloadError(f"data no vàlida: {value!r}")
+
+
+def parse_score(payload, field):
+    try:
+        score = int(payload.get(field))
+    except (TypeError, ValueError):
+        raise PayloadError(f"{field} ha de ser un enter")
+    if not 0 <= score <= MAX_SCORE:
+        raise PayloadError(f"{field} fora de rang: {score}")
+    return score
+
+
+def validate(payload):
+    """Payload validat i normalitzat (llança PayloadError si no és vàlid)"""
+    if not isinstance(payload, dict):
+        raise PayloadError("el payload ha de ser un objecte JSON")
+    team = str(payload.get('team', '')).lower()
+    if team not in TEAMS:
+        raise PayloadError(f"equip desconegut: {payload.get('team')!r}")
+    rival = str(payload.get('rival') or '').strip()
+    if not rival or OWN_TEAM in canonical_team(rival):
+        raise PayloadError("falta el rival")
+    location = payload.get('location', 'home')
+    if location not in ('home', 'away'):
+        raise PayloadError(f"location ha de ser home o away: {location!r}")
+    return {
+        'team': team,
+        'rival': rival,
+        'date': parse_date(payload.get('date') or datetime.now().strftime('%d/%m/%Y')),
+        'our_score': parse_score(payload, 'our_score'),
+        'rival_score': parse_score(payload, 'rival_score'),
+        'location': location,
+        'jornada': str(payload['jornada']) if payload.get('jornada') else None,
+    }
+
+
+# ─────────── Actualització incremental ───────────
+
+def find_match(records, rival, date, team_id, any_date=False):
+    """Partit contra `rival` en aquesta data (amb any_date, el primer contra ell si no n'hi ha cap)"""
+    key = team_id(rival)
+    candidates = [m for m in records if key in (team_id(m.team1), team_id(m.team2))]
+    for match in candidates:
+        if match.date == date:
+            return match
+    return candidates[0] if candidates and any_date else None
+
+
+def own_name(data):
+    """El nostre nom tal com surt a l'ACTAWP (fila de la classificació o d'un partit)
+
+    metadata.team_name ("CN Terrassa Cadet") no és cap fila de la classificació:
+    els motors el comptarien com un altre equip.
+    """
+    names = [row.get('equip') for row in data.get('ranking') or []]
+    for match in (data.get('last_results') or []) + (data.get('upcoming_matches') or []):
+        names += [match.get('team1'), match.get('team2')]
+    return next((name for name in names if name and OWN_TEAM in canonical_team(name)), OWN_NAME)
+
+
+def build_result(data, entry, team_id):
+    """Result del payload; si el partit ja hi era (pròxim o jugat) en reaprofita els equips i l'URL
+
+    Els equips es comparen amb `team_id` (IDs de l'índex d'entitats, com al parser).
+    """
+    played = find_match(as_records(data.get('last_results') or [], Result), entry['rival'], entry['date'],
+                        team_id)
+    fixture = None if played else find_match(as_records(data.get('upcoming_matches') or [], Match),
+                                             entry['rival'], entry['date'], team_id, any_date=True)
+    known = played or fixture
+    own = own_name(data)
+    if known:
+        home = OWN_TEAM in canonical_team(known.team1)
+        team1, team2 = known.team1, known.team2
+    else:
+        home = entry['location'] == 'home'
+        team1, team2 = (own, entry['rival']) if home else (entry['rival'], own)
+    goals1, goals2 = ((entry['our_score'], entry['rival_score']) if home
+                      else (entry['rival_score'], entry['our_score']))
+    result = Result(
+        team1=team1, team2=team2,
+        team1_logo=known.team1_logo if known else None,
+        team2_logo=known.team2_logo if known else None,
+        score=f"{goals1} - {goals2}",
+        date=entry['date'],
+        jornada=entry['jornada'] or (known.jornada if known else None),
+        url=known.url if known else None,
+    )
+    return result, fixture
+
+
+def ingest(entry):
+    """Aplica un resultat validat. Retorna (resum, dades anteriors o None si no ha canviat res)"""
+    team = entry['team']
+    with open(data_file(team), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    previous = copy.deepcopy(data)
+
+    entities = EntityResolver.load()
+    result, fixture = build_result(data, entry, entities.team_id)
+    results = as_records(data.get('last_results') or [], Result)
+    existing = next((r for r in results if r.match_id == result.match_id), None)
+    if existing is not None and existing.goals() == result.goals():
+        return {'match_id': result.match_id, 'status': 'unchanged'}, None
+
+    data['last_results'] = [result] + [r for r in results if r.match_id != result.match_id]
+    if fixture:
+        data['upcoming_matches'] = [m for m in as_records(data.get('upcoming_matches') or [], Match)
+                                    if m.match_id != fixture.match_id]
+
+    # Classificació: només si ja es calcula amb el motor (té tota la fase aplicada)
+    engine = StandingsEngine.load(standings_file(team), entities.team_id)
+    if engine.applied:
+        engine.add_result(result.match_id, result.team1, result.team2, *result.goals(), date=result.date)
+        data['ranking'] = engine.table(data.get('ranking') or [])
+        data.setdefault('metadata', {})['ranking_source'] = 'computed'
+        engine.save(standings_file(team))
+
+    ratings = EloRatings.load(ratings_file(team), entities.team_id)
+    ratings.add_result(result.match_id, result.team1, result.team2, *result.goals(), date=result.date)
+    for name, form in (data.get('rivals_form') or {}).items():
+        form['rating'] = ratings.rating(name)
+    ratings.save(ratings_file(team))
+
+    index = HeadToHeadIndex.load(h2h_file(team), entities.team_id)
+    index.add_result(result)
+    index.save(h2h_file(team))
+    index.write_shards(team)
+
+    data.setdefault('metadata', {})['ingested_at'] = datetime.now().isoformat()
+    with open(data_file(team), 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=encode)
+    entities.save()
+
+    version = DeltaFeed(team).publish(json.loads(json.dumps(data, default=encode)))
+    regenerate()
+    return {'match_id': result.match_id, 'status': 'updated', 'score': result.score,
+            'feed_version': version}, previous
+
+
+def regenerate():
+    """Artefactes derivats que depenen de les dades (només es reescriu el que canvia)"""
+    import precache_manifest
+    import prerender
+    cache = {}
+    for page, fragments in prerender.PAGES.items():
+        prerender.prerender_page(page, fragments, cache)
+    for scope, patterns in precache_manifest.SCOPES.items():
+        precache_manifest.write_manifest(scope, patterns)
+
+
+def notify(team, previous):
+    """Notificador habitual, comparant amb les dades d'abans del resultat"""
+    from notify_changes import check_team_changes
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump(previous, f, ensure_ascii=False)
+    try:
+        check_team_changes(team.upper(), f.name, data_file(team))
+    finally:
+        os.remove(f.name)
+
+
+# ─────────── Servidor HTTP ───────────
+
+class IngestServer:
+
+    def __init__(self, token=None, publish=False):
+        self.token = token
+        self.publish = publish
+        self.lock = asyncio.Lock()  # un resultat cada vegada: els fitxers són compartits
+        self.background = set()
+
+    async def handle(self, reader, writer):
+        try:
+            status, body = await self.respond(reader)
+        except Exception as e:
+            print(f"❌ Error processant la petició: {e}")
+            status, body = 500, {'error': str(e)}
+        content = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode('ascii') + content)
+        await writer.drain()
+        writer.close()
+
+    async def respond(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) < 2:
+            return 400, {'error': 'petició no vàlida'}
+        method, path = request_line[0], request_line[1].split('?')[0]
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path != '/result':
+            return 404, {'error': 'ruta desconeguda'}
+        if method != 'POST':
+            return 405, {'error': 'cal POST'}
+        if self.token and headers.get('authorization') != f"Bearer {self.token}":
+            return 401, {'error': 'token no vàlid'}
+
+        length = int(headers.get('content-length') or 0)
+        if length > MAX_BODY:
+            return 413, {'error': 'payload massa gran'}
+        try:
+            entry = validate(json.loads(await reader.readexactly(length)))
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            return 400, {'error': str(e)}
+
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            summary, previous = await loop.run_in_executor(None, ingest, entry)
+        print(f"📥 {entry['team']}: {entry['our_score']}-{entry['rival_score']} {entry['rival']} → {summary['status']}")
+        if previous is not None:
+            task = asyncio.create_task(self.after_ingest(entry['team'], previous))
+            self.background.add(task)
+            task.add_done_callback(self.background.discard)
+        return (202 if previous is not None else 200), summary
+
+    async def after_ingest(self, team, previous):
+        """Notificació i (opcionalment) publicació, fora del temps de resposta"""
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            await loop.run_in_executor(None, notify, team, previous)
+            if self.publish:
+                await self.git_publish(team)
+
+    async def git_publish(self, team):
+        commands = (
+            ('git', 'add', *PUBLISHED),
+            ('git', 'commit', '-m', f"📥 Resultat {team} - {datetime.now():%Y-%m-%d %H:%M:%S}"),
+            ('git', 'push'),
+        )
+        for command in commands:
+            process = await asyncio.create_subprocess_exec(*command)
+            if await process.wait() != 0:
+                print(f"⚠️ {' '.join(command[:2])} ha fallat")
+                return False
+        return True
+
+
+async def serve(host, port, token=None, publish=False):
+    server = IngestServer(token, publish)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"🛰️ Servei d'entrada de resultats a http://{host}:{port}/result")
+    async with listener:
+        await listener.serve_forever()
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Webhook d'entrada de resultats")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="Adreça (per defecte 127.0.0.1)")
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (per defecte {DEFAULT_PORT})")
+    arg_parser.add_argument('--publish', action='store_true', help="Commit i push després de cada resultat")
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(serve(args.host, args.port, os.environ.get('INGEST_TOKEN'), args.publish))
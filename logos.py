@@ -0,0 +1,187 @@
+"""
+Logos dels equips servits des del mateix repositori
+- Cada URL de logo de la federació es baixa UNA vegada: logos/index.json
+  recorda URL → hash i les execucions següents no tornen a baixar res
+- Els fitxers es guarden pel hash del contingut (logos/{hash}.webp), així
+  el mateix escut amb URLs diferents només hi és una vegada i el nom canvia
+  si l'escut canvia (es pot cachejar per sempre)
+- Amb Pillow es re-codifica a una miniatura WebP petita; sense Pillow es
+  guarda l'original amb la seva extensió
+- Opcionalment (--logo-sprite) es genera logos/sprite.webp amb totes les
+  miniatures i logos/sprite.json amb la posició de cada una
+- localize() substitueix les URLs remotes del JSON per les rutes locals.
+  Els src relatius de la federació (/media/...) es resolen contra la web
+  de l'ACTAWP (base_url)
+"""
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+LOGOS_DIR = 'logos'
+INDEX_FILE = f"{LOGOS_DIR}/index.json"
+THUMB_SIZE = 64
+WEBP_QUALITY = 80
+HASH_LENGTH = 12
+DOWNLOAD_WORKERS = 4
+REQUEST_TIMEOUT = 15
+
+# (secció, camps amb logo) dins de actawp_{team}_data.json
+LOGO_FIELDS = (
+    ('upcoming_matches', ('team1_logo', 'team2_logo')),
+    ('last_results', ('team1_logo', 'team2_logo')),
+    ('ranking', ('logo',)),
+)
+
+
+def is_remote(url):
+    """Logo de la federació: URL absoluta o relativa a la seva web (no una ruta de logos/ ni data:)"""
+    return bool(url) and not url.startswith((f"{LOGOS_DIR}/", 'data:'))
+
+
+class LogoStore:
+
+    def __init__(self, session_factory=None, base_url=None):
+        self.session_factory = session_factory
+        self.base_url = base_url  # pàgina contra la qual es resolen els src relatius
+        self.index = {}  # URL remota → {'hash': ..., 'file': ...} o {'error': ...}
+        self.failed = []
+        if os.path.exists(INDEX_FILE):
+            try:
+                with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {INDEX_FILE}: {e} (es tornen a baixar)")
+        self.by_hash = {entry['hash']: entry['file'] for entry in self.index.values() if 'file' in entry}
+
+    def absolute(self, url):
+        return urljoin(self.base_url, url) if self.base_url else url
+
+    def _session(self):
+        if self.session_factory:
+            return self.session_factory()
+        import requests
+        return requests.Session()
+
+    def _encode(self, content):
+        """Miniatura WebP (o l'original si no hi ha Pillow o no és una imatge)"""
+        try:
+            from PIL import Image
+        except ImportError:
+            return None, content
+        try:
+            image = Image.open(io.BytesIO(content))
+            image = image.convert('RGBA')
+            image.thumbnail((THUMB_SIZE, THUMB_SIZE))
+            out = io.BytesIO()
+            image.save(out, 'WEBP', quality=WEBP_QUALITY, method=6)
+            return '.webp', out.getvalue()
+        except Exception:
+            return None, content
+
+    def _download(self, url):
+        try:
+            response = self._session().get(url, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                return url, None, f"HTTP {response.status_code}"
+            return url, response.content, None
+        except Exception as e:
+            return url, None, str(e)
+
+    def _store(self, url, content):
+        # El hash és del logo original: el mateix escut amb URLs diferents es desa una vegada
+        digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+        if digest in self.by_hash and os.path.exists(self.by_hash[digest]):
+            return {'hash': digest, 'file': self.by_hash[digest]}
+
+        extension, data = self._encode(content)
+        if extension is None:
+            extension = os.path.splitext(url.split('?')[0])[1].lower() or '.png'
+        path = f"{LOGOS_DIR}/{digest}{extension}"
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.by_hash[digest] = path
+        return {'hash': digest, 'file': path}
+
+    def fetch(self, urls):
+        """Baixa els logos que encara no tenim. Retorna quants n'ha baixat"""
+        remote = {self.absolute(u) for u in urls if is_remote(u)}
+        missing = sorted(u for u in remote if 'file' not in self.index.get(u, {}))
+        if not missing:
+            return 0
+
+        os.makedirs(LOGOS_DIR, exist_ok=True)
+        downloaded = 0
+        with ThreadPoolExecutor(DOWNLOAD_WORKERS) as pool:
+            for url, content, error in pool.map(self._download, missing):
+                if content is None:
+                    self.index[url] = {'error': error}
+                    self.failed.append(url)
+                    continue
+                self.index[url] = self._store(url, content)
+                downloaded += 1
+        return downloaded
+
+    def local(self, url):
+        """Ruta local d'un logo (o la mateixa URL si no s'ha pogut baixar)"""
+        entry = self.index.get(self.absolute(url)) or {}
+        return entry.get('file', url)
+
+    def localize(self, data):
+        """Substitueix els logos remots del JSON per les rutes locals (in-place)"""
+        rows = []
+        for section, fields in LOGO_FIELDS:
+            rows.extend((row, fields) for row in data.get(section, []))
+        rivals = data.get('rivals_form', {})
+        result_fields = ('team1_logo', 'team2_logo')
+
+        # Dues passades pels rivals: amb --memory-bounded són a disc (RivalSpool) i no es tenen tots alhora
+        urls = [row.get(field) for row, fields in rows for field in fields]
+        urls += [row.get(field) for form in rivals.values() for row in form.get('last_results') or []
+                 for field in result_fields]
+        downloaded = self.fetch(urls)
+        for row, fields in rows:
+            self.localize_row(row, fields)
+        for name, form in rivals.items():
+            for row in form.get('last_results') or []:
+                self.localize_row(row, result_fields)
+            rivals[name] = form
+        return downloaded
+
+    def localize_row(self, row, fields):
+        for field in fields:
+            if is_remote(row.get(field)):
+                row[field] = self.local(row[field])
+
+    def build_sprite(self):
+        """logos/sprite.webp + logos/sprite.json ({fitxer: [x, y]}) amb totes les miniatures"""
+        try:
+            from PIL import Image
+        except ImportError:
+            print("⚠️ Sprite de logos: cal Pillow (pip install pillow)")
+            return None
+
+        files = sorted({e['file'] for e in self.index.values() if e.get('file', '').endswith('.webp')})
+        if not files:
+            return None
+        columns = max(1, int(len(files) ** 0.5 + 0.999))
+        rows = (len(files) + columns - 1) // columns
+        sprite = Image.new('RGBA', (columns * THUMB_SIZE, rows * THUMB_SIZE))
+        positions = {}
+        for i, path in enumerate(files):
+            x, y = (i % columns) * THUMB_SIZE, (i // columns) * THUMB_SIZE
+            with Image.open(path) as image:
+                sprite.paste(image, (x, y))
+            positions[path] = [x, y]
+        sprite.save(f"{LOGOS_DIR}/sprite.webp", 'WEBP', quality=WEBP_QUALITY)
+        with open(f"{LOGOS_DIR}/sprite.json", 'w', encoding='utf-8') as f:
+            json.dump({'size': THUMB_SIZE, 'positions': positions}, f, ensure_ascii=False, indent=1)
+        return positions
+
+    def save(self):
+        os.makedirs(LOGOS_DIR, exist_ok=True)
+        with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=1, sort_keys=True)
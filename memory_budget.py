@@ -0,0 +1,148 @@
+"""
+Mode de memòria acotada del parser (--memory-bounded) i perfil per etapes (--trace-memory)
+- RivalSpool: la forma de cada rival es desa en un fitxer temporal (una
+  línia JSON) quan acaba el seu treball; a memòria només hi ha l'offset.
+  finish_json, els logos i l'escriptura del JSON la llegeixen rival a rival
+- write_json: escriu el JSON de l'equip secció a secció i els rivals del
+  spool un a un. La sortida és idèntica a json.dump(..., indent=2)
+- StageProfiler: amb tracemalloc, una instantània al final de cada etapa
+  (descàrrega, muntatge, escriptura, feed) amb la memòria actual, el pic i
+  els punts del codi que més han reservat durant l'etapa
+"""
+
+import json
+import os
+import tempfile
+import threading
+import tracemalloc
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+from records import RivalForm, encode
+
+JSON_INDENT = 2
+
+
+class RivalSpool(MutableMapping):
+    """dict equip → RivalForm guardat a disc (a memòria només hi ha l'ordre i els offsets)
+
+    Tornar a assignar un equip afegeix la versió nova al final del fitxer i
+    manté la seva posició, com un dict.
+    """
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile('w+b')
+        self.offsets = {}
+        self.lock = threading.Lock()  # els on_done del scheduler poden venir de diversos fils
+
+    def __setitem__(self, name, form):
+        line = json.dumps(form, ensure_ascii=False, default=encode).encode('utf-8') + b'\n'
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            self.offsets[name] = self.file.tell()
+            self.file.write(line)
+
+    def __getitem__(self, name):
+        with self.lock:
+            self.file.seek(self.offsets[name])
+            line = self.file.readline()
+        return RivalForm.from_dict(json.loads(line))
+
+    def __delitem__(self, name):
+        del self.offsets[name]
+
+    def __iter__(self):
+        return iter(list(self.offsets))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def close(self):
+        self.file.close()
+        self.offsets = {}
+
+
+def dumps_indented(value, prefix):
+    """json.dumps amb indentació, per incrustar-lo a `prefix` de profunditat"""
+    return json.dumps(value, ensure_ascii=False, indent=JSON_INDENT, default=encode).replace('\n', '\n' + prefix)
+
+
+def write_json(path, data):
+    """Com json.dump(data, indent=2), però els RivalSpool s'escriuen entrada a entrada"""
+    pad = ' ' * JSON_INDENT
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for i, (key, value) in enumerate(data.items()):
+            f.write(f"{',' if i else ''}\n{pad}{json.dumps(key, ensure_ascii=False)}: ")
+            if not isinstance(value, RivalSpool):
+                f.write(dumps_indented(value, pad))
+                continue
+            f.write('{')
+            for j, (name, form) in enumerate(value.items()):
+                f.write(f"{',' if j else ''}\n{pad * 2}{json.dumps(name, ensure_ascii=False)}: "
+                        f"{dumps_indented(form, pad * 2)}")
+            f.write(f"\n{pad}}}" if value else '}')
+        f.write('\n}' if data else '}')
+
+
+class StageProfiler:
+    """Memòria per etapes amb tracemalloc (top=0: desactivat, sense cap cost)"""
+
+    def __init__(self, top=0):
+        self.top = top
+        self.stages = []
+        self.snapshot = None
+        if top:
+            tracemalloc.start()
+            self.snapshot = self.take()
+
+    @staticmethod
+    def take():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    @contextmanager
+    def stage(self, name):
+        if not self.top:
+            yield
+            return
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = self.take()
+            sites = [stat for stat in snapshot.compare_to(self.snapshot, 'lineno') if stat.size_diff > 0][:self.top]
+            self.snapshot = snapshot
+            self.stages.append({'stage': name, 'current': current, 'peak': peak})
+            print(f"\n🧠 Memòria [{name}]: {mb(current)} ara, pic {mb(peak)}")
+            for stat in sites:
+                frame = stat.traceback[0]
+                print(f"   +{mb(stat.size_diff)} ({stat.count_diff:+} blocs) {site(frame.filename)}:{frame.lineno}")
+
+    def report(self):
+        if not self.top:
+            return
+        tracemalloc.stop()
+        print("\n🧠 Pic de memòria per etapa (tracemalloc):")
+        for entry in self.stages:
+            print(f"   {entry['peak'] / 1024 / 1024:8.1f} MB  {entry['stage']}")
+        try:
+            import resource
+        except ImportError:  # Windows
+            return
+        # ru_maxrss és en KB a Linux
+        print(f"   RSS màxim del procés: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+
+def site(filename):
+    """Fitxer curt: relatiu al directori actual o, si és de fora (bs4, json...), paquet/fitxer"""
+    path = os.path.relpath(filename)
+    return path if not path.startswith('..') else os.path.join(*filename.split(os.sep)[-2:])
+
+
+def mb(size):
+    return f"{size / 1024 / 1024:.1f} MB"
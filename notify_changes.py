@@ -2,6 +2,8 @@ import json
 import requests
 import os
 
+from records import Match, Result, as_records
+
 def send_notification(title, message, url="https://joseprico.github.io/"):
     """Envia notificació via OneSignal"""
     app_id = os.environ.get('ONESIGNAL_APP_ID', '')
@@ -74,20 +76,23 @@ def check_team_changes(team_name, old_file, new_file):
         
         # 1. COMPROVAR NOUS RESULTATS
         print("\n📊 Comprovant nous resultats...")
-        old_results = old_data.get('last_results', [])
-        new_results = new_data.get('last_results', [])
+        old_results = as_records(old_data.get('last_results', []), Result)
+        new_results = as_records(new_data.get('last_results', []), Result)
         
         print(f"   Resultats antics: {len(old_results)}")
         print(f"   Resultats nous: {len(new_results)}")
         
-        if len(new_results) > len(old_results):
+        # Nous = partits que no hi eren abans (per match_id, no per nombre de files)
+        old_ids = {r.match_id for r in old_results}
+        added_results = [r for r in new_results if r.match_id not in old_ids]
+        
+        if added_results:
             # Hi ha nous resultats!
-            num_new = len(new_results) - len(old_results)
+            num_new = len(added_results)
             print(f"   🎉 {num_new} nou(s) resultat(s) detectat(s)!")
             
             # Processar cada nou resultat
-            for i in range(num_new):
-                latest = new_results[i]
+            for latest in added_results:
                 team1 = latest.get('team1', '?')
                 team2 = latest.get('team2', '?')
                 score = latest.get('score', '?-?')
@@ -95,8 +100,8 @@ def check_team_changes(team_name, old_file, new_file):
                 
                 # Determinar si és CN Terrassa i resultat
                 is_cnt = 'TERRASSA' in team1.upper()
-                our_score = latest.get('score_team1', 0) if is_cnt else latest.get('score_team2', 0)
-                their_score = latest.get('score_team2', 0) if is_cnt else latest.get('score_team1', 0)
+                our_score = latest.score_team1 if is_cnt else latest.score_team2
+                their_score = latest.score_team2 if is_cnt else latest.score_team1
                 
                 if our_score > their_score:
                     emoji = "🎉"
@@ -119,8 +124,8 @@ def check_team_changes(team_name, old_file, new_file):
         
         # 2. COMPROVAR CANVIS DE DATA/HORA
         print("\n📅 Comprovant canvis de calendari...")
-        old_upcoming = {m['match_id']: m for m in old_data.get('upcoming_matches', [])}
-        new_upcoming = {m['match_id']: m for m in new_data.get('upcoming_matches', [])}
+        old_upcoming = {m.match_id: m for m in as_records(old_data.get('upcoming_matches', []), Match)}
+        new_upcoming = {m.match_id: m for m in as_records(new_data.get('upcoming_matches', []), Match)}
         
         changes_detected = 0
         for match_id, new_match in new_upcoming.items():
@@ -0,0 +1,55 @@
+// Precache amb hash de contingut (per als service workers del repo)
+// precache_manifest.py escriu precache-manifest.json al costat de cada
+// service-worker.js amb { assets: { ruta: hash } }. Aquí es compara amb
+// l'últim manifest aplicat (guardat a la mateixa cache) i només es tornen
+// a baixar els fitxers amb hash diferent; els que ja no hi són s'esborren.
+const PRECACHE_MANIFEST = 'precache-manifest.json';
+const PRECACHE_CHECK_INTERVAL = 10 * 60 * 1000;  // com a molt, una comprovació cada 10 min
+let lastPrecacheCheck = 0;
+
+async function syncPrecache(cacheName) {
+  lastPrecacheCheck = Date.now();
+  const manifestUrl = new URL(PRECACHE_MANIFEST, self.location).href;
+  const response = await fetch(manifestUrl, { cache: 'no-store' });
+  if (!response.ok) return 0;
+  const manifest = await response.json();
+
+  const cache = await caches.open(cacheName);
+  const applied = await cache.match(manifestUrl);
+  const previous = applied ? ((await applied.json()).assets || {}) : {};
+  const stored = { ...previous };
+
+  const changed = Object.keys(manifest.assets).filter(path => previous[path] !== manifest.assets[path]);
+  await Promise.all(changed.map(async path => {
+    try {
+      const url = new URL(path, self.location).href;
+      const asset = await fetch(url, { cache: 'no-cache' });
+      if (asset.ok) {
+        await cache.put(url, asset);
+        stored[path] = manifest.assets[path];
+      }
+    } catch (err) {
+      console.warn('[SW] Precache: no s\'ha pogut baixar', path, err);
+    }
+  }));
+
+  for (const path of Object.keys(previous)) {
+    if (!(path in manifest.assets)) {
+      await cache.delete(new URL(path, self.location).href);
+      delete stored[path];
+    }
+  }
+
+  await cache.put(manifestUrl, new Response(
+    JSON.stringify({ version: manifest.version, assets: stored }),
+    { headers: { 'Content-Type': 'application/json' } }
+  ));
+  if (changed.length) console.log(`[SW] Precache ${manifest.version}: ${changed.length} fitxers actualitzats`);
+  return changed.length;
+}
+
+// Per cridar des del fetch de navegació: revalida sense bloquejar la resposta
+function maybeSyncPrecache(event, cacheName) {
+  if (event.request.mode !== 'navigate' || Date.now() - lastPrecacheCheck < PRECACHE_CHECK_INTERVAL) return;
+  event.waitUntil(syncPrecache(cacheName).catch(err => console.warn('[SW] Precache:', err)));
+}
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Manifest de precache per als service workers
+- S'executa després d'exportar les dades: calcula el hash (sha256) dels
+  fitxers del shell de cada service worker (llista explícita a SCOPES)
+- Escriu precache-manifest.json al costat de cada service-worker.js; el
+  worker (precache-sync.js) el compara amb l'últim que va aplicar i només
+  torna a baixar els fitxers amb hash diferent
+- El manifest només es reescriu si algun hash ha canviat
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+SERVICE_WORKER = 'service-worker.js'
+MANIFEST_FILE = 'precache-manifest.json'
+HASH_LENGTH = 12
+
+# Shell que serveix cada service worker (rutes relatives a l'abast, amb
+# comodins). Llista explícita: la resta de pàgines de l'arrel (versions
+# antigues, admin, proves) no les serveix cap worker i no s'han de baixar.
+# historic-2025-26 és una còpia congelada i no en forma part.
+SCOPES = {
+    '.': ('index.html', 'manifest.json', 'apple-touch-icon.png', 'cnt-ios-*.png'),
+    'app-nova/app': ('index.html', 'manifest.json', '../../apple-touch-icon.png', '../../cnt-ios-*.png'),
+    'app-nova/entrada': ('index.html', 'manifest.json', 'cnt-entrada-*.png'),
+}
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def scope_assets(scope, patterns):
+    """{ruta relativa al worker: hash} dels fitxers de la llista de l'abast"""
+    assets = {}
+    for pattern in patterns:
+        paths = sorted(glob.glob(os.path.join(scope, pattern)))
+        if not paths:
+            print(f"⚠️ {scope}: cap fitxer per a {pattern}")
+        for path in paths:
+            relative = os.path.relpath(path, scope).replace(os.sep, '/')
+            assets[relative if relative.startswith('..') else f"./{relative}"] = file_hash(path)
+    return assets
+
+
+def write_manifest(scope, patterns):
+    """Escriu el manifest d'un abast. Retorna (assets, canviats) o None si no hi ha worker"""
+    if not os.path.exists(os.path.join(scope, SERVICE_WORKER)):
+        print(f"⚠️ {scope}: no hi ha {SERVICE_WORKER}")
+        return None
+
+    path = os.path.join(scope, MANIFEST_FILE)
+    assets = scope_assets(scope, patterns)
+    previous = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('assets', {})
+        except Exception as e:
+            print(f"⚠️ No s'ha pogut llegir {path}: {e}")
+
+    changed = sorted(p for p in assets if previous.get(p) != assets[p])
+    removed = sorted(p for p in previous if p not in assets)
+    if changed or removed or not os.path.exists(path):
+        version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'assets': assets}, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    print(f"📦 {path}: {len(assets)} fitxers, {len(changed)} canviats, {len(removed)} eliminats")
+    for asset in changed[:10]:
+        print(f"   - {asset}")
+    return assets, changed
+
+
+if __name__ == "__main__":
+    for scope, patterns in SCOPES.items():
+        write_manifest(scope, patterns)
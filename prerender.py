@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Pre-renderitzat estàtic de les taules dels anuaris
+- S'executa després d'exportar les dades: escriu dins de cada pàgina
+  (entre <!-- prerender:{nom} --> i <!-- /prerender -->) l'HTML de la
+  classificació, el calendari i la plantilla, amb el mateix marcatge que
+  generen els renderers del navegador
+- La pàgina es veu sencera al primer pintat, i si les dades no es poden
+  carregar el contingut pre-renderitzat es queda (no hi ha cap .loading)
+- Les dades es llegeixen d'on les llegeix la pàgina (REPO_BASE + ACTAWP_FILE
+  i ANUARI_FILE del seu <script>): el que es pre-renderitza és el mateix que
+  després ho substitueix. Cal executar-ho després d'anuari_dataset.py
+- Cada fragment porta el hash de les dades que ha fet servir: només es
+  tornen a generar els que tenen l'entrada canviada, i la pàgina només es
+  reescriu si algun fragment ha canviat
+- Les pàgines de campionat (bracket, grups) es llegeixen de Firebase en
+  directe i no es pre-renderitzen
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+
+import requests
+
+HASH_LENGTH = 12
+FETCH_TIMEOUT = 30
+MARKER = re.compile(r'<!-- prerender:(?P<name>[\w-]+)(?: hash=(?P<hash>\w*))? -->(?P<body>.*?)<!-- /prerender -->',
+                    re.S)
+PAGE_CONFIG = re.compile(r"const (REPO_BASE|ACTAWP_FILE|ANUARI_FILE) = '([^']*)'")
+
+
+def page_sources(page, source):
+    """{'actawp': URL, 'anuari': fitxer} tal com els demana el loadAll() de la pàgina"""
+    config = dict(PAGE_CONFIG.findall(source))
+    sources = {}
+    if 'REPO_BASE' in config and 'ACTAWP_FILE' in config:
+        sources['actawp'] = config['REPO_BASE'] + config['ACTAWP_FILE']
+    if 'ANUARI_FILE' in config:
+        sources['anuari'] = os.path.join(os.path.dirname(page), config['ANUARI_FILE'])
+    return sources
+
+
+def load_json(location):
+    try:
+        if location.startswith(('http://', 'https://')):
+            response = requests.get(location, timeout=FETCH_TIMEOUT)
+            response.raise_for_status()
+            return response.json()
+        if not os.path.exists(location):
+            return None
+        with open(location, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ No s'ha pogut llegir {location}: {e}")
+        return None
+
+
+def input_hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+# ─────────── Helpers (els mateixos que fa servir la pàgina) ───────────
+
+def esc(value):
+    return html.escape('—' if value is None else str(value))
+
+
+def start_case(text):
+    # Com el startCase de la pàgina: \b\w en ASCII
+    return re.sub(r'\b\w', lambda m: m.group().upper(), str(text or '').lower(), flags=re.ASCII)
+
+
+def safe_num(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if number.is_integer() else number
+
+
+def fmt_date_short(iso):
+    if not iso:
+        return '—'
+    match = re.match(r'(\d{4})-(\d{2})-(\d{2})', iso)
+    if not match:
+        return iso.split('T')[0] or iso
+    year, month, day = match.groups()
+    return f"{day}.{month}.{year[2:]}"
+
+
+def result_code(cnt, rival):
+    return 'W' if cnt > rival else 'L' if cnt < rival else 'D'
+
+
+def table(css_class, headers, rows):
+    head = ''.join(f"<th>{esc(h)}</th>" for h in headers)
+    body = ''.join(f"<tr{attrs}>" + ''.join(f"<td>{esc(v)}</td>" for v in cells) + "</tr>"
+                   for attrs, cells in rows)
+    return f'<table class="{css_class}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def roster_players(actawp):
+    players = [{
+        'name': p.get('Nombre'), 'pj': safe_num(p.get('PJ')), 'gt': safe_num(p.get('GT')),
+        'gp': safe_num(p.get('GP')), 'ex': safe_num(p.get('EX')), 'pf': safe_num(p.get('PF')),
+    } for p in actawp.get('players') or []]
+    players = [p for p in players if p['pj'] > 0 or p['gt'] > 0]
+    return sorted(players, key=lambda p: (-p['gt'], -p['pj']))
+
+
+# ─────────── Fragments ───────────
+
+def render_standings(actawp, wrap=False):
+    ranking = actawp.get('ranking') or []
+    if not ranking:
+        return '<div class="loading">Encara no hi ha classificació disponible.</div>'
+    rows = [(' class="us"' if 'TERRASSA' in (r.get('equip') or '').upper() else '',
+             [r.get('posicio'), start_case(r.get('equip')), r.get('partits'), r.get('guanyats'),
+              r.get('empatats'), r.get('perduts'), r.get('gols_favor'), r.get('gols_contra'),
+              r.get('diferencia'), r.get('punts')])
+            for r in ranking]
+    output = table('standings', ('#', 'Equip', 'PJ', 'G', 'E', 'P', 'GF', 'GC', '+/−', 'Pts'), rows)
+    return f'<div class="standings-wrap">{output}</div>' if wrap else output
+
+
+def render_roster(actawp, wrap=False):
+    players = roster_players(actawp)
+    if not players:
+        return ''
+    rows = [('', [i + 1, start_case(p['name']), p['pj'], p['gt'], p['gp'], p['ex'], p['pf']])
+            for i, p in enumerate(players)]
+    output = table('roster', ('#', 'Jugador', 'PJ', 'GT', 'Penals', 'EX', 'PF'), rows)
+    return f'<div class="roster-wrap">{output}</div>' if wrap else output
+
+
+def top_scorer_text(top):
+    return f"{start_case(top['name'])} · {top['g']} gol{'' if top['g'] == 1 else 's'}"
+
+
+def render_calendar(anuari):
+    """<li> del calendari de l'anuari cadet (renderCalendar)"""
+    matches = anuari.get('matches') or []
+    if not matches:
+        return '<li class="loading">Encara no hi ha partits enregistrats.</li>'
+    items = []
+    for m in matches:
+        home = m.get('matchLocation') == 'home'
+        cnt, rival = safe_num(m.get('scoreCNT')), safe_num(m.get('scoreRival'))
+        result = result_code(cnt, rival)
+        badge = {'W': 'Victòria', 'L': 'Derrota', 'D': 'Empat'}[result]
+        top = m.get('topScorer')
+        items.append(
+            '<li>'
+            f'<div class="date">{esc(fmt_date_short(m.get("data")))}</div>'
+            f'<div class="loc{" home" if home else ""}">{"Local" if home else "Visit."}</div>'
+            f'<div class="rival">{esc(start_case(m.get("rivalTeam") or "—"))}</div>'
+            f'<div class="score {result}">{cnt}–{rival}</div>'
+            f'<div class="badge {result}">{badge}</div>'
+            + (f'<div class="topscorer">★ {esc(top_scorer_text(top))}</div>' if top else '')
+            + '</li>')
+    return ''.join(items)
+
+
+def render_matches(anuari):
+    """Targetes de partit de l'anuari juvenil, el més recent primer (renderMatches)"""
+    matches = anuari.get('matches') or []
+    if not matches:
+        return '<div class="loading">Encara no hi ha partits enregistrats.</div>'
+    cards = []
+    for m in reversed(matches):
+        home = m.get('matchLocation') == 'home'
+        cnt, rival = safe_num(m.get('scoreCNT')), safe_num(m.get('scoreRival'))
+        result = result_code(cnt, rival)
+        periods = m.get('periodScores') or {}
+        quarters = ' · '.join(f"{periods[q].get('cnt', 0)}–{periods[q].get('rival', 0)}"
+                              for q in ('q1', 'q2', 'q3', 'q4') if periods.get(q))
+        top = m.get('topScorer')
+        cards.append(
+            f'<div class="match {result}">'
+            f'<div class="head"><span>{esc(fmt_date_short(m.get("data")))}</span>'
+            f'<span class="home-tag{"" if home else " away"}">{"Local" if home else "Visitant"}</span></div>'
+            f'<div class="rival">{esc(start_case(m.get("rivalTeam") or "—"))}</div>'
+            f'<div class="scoreline"><div class="score {result}">{cnt}–{rival}</div></div>'
+            + (f'<div class="quarters">{esc(quarters)}</div>' if quarters else '')
+            + (f'<div class="top"><span class="star">★</span>{esc(top_scorer_text(top))}</div>' if top else '')
+            + '</div>')
+    return ''.join(cards)
+
+
+# Pàgina → {fragment: (font de page_sources, secció que es fa servir, renderer)}
+PAGES = {
+    'anuari-cadet-2025-26.html': {
+        'standings': ('actawp', 'ranking', render_standings),
+        'calendar': ('anuari', 'matches', render_calendar),
+        'roster': ('actawp', 'players', render_roster),
+    },
+    'anuari-juvenil-2025-26.html': {
+        'standings': ('actawp', 'ranking', lambda d: render_standings(d, wrap=True)),
+        'matches': ('anuari', 'matches', render_matches),
+        'roster': ('actawp', 'players', lambda d: render_roster(d, wrap=True)),
+    },
+}
+
+
+def prerender_page(page, fragments, cache):
+    """Actualitza els fragments d'una pàgina. Retorna els noms dels que han canviat"""
+    if not os.path.exists(page):
+        print(f"⚠️ {page}: no existeix")
+        return []
+    with open(page, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    sources = page_sources(page, source)
+    changed = []
+
+    def replace(match):
+        name = match.group('name')
+        if name not in fragments or fragments[name][0] not in sources:
+            return match.group(0)
+        kind, section, renderer = fragments[name]
+        location = sources[kind]
+        if location not in cache:
+            cache[location] = load_json(location)
+        data = cache[location]
+        if data is None:
+            return match.group(0)  # sense dades: es manté el que hi hagi
+        digest = input_hash([name, data.get(section)])
+        if digest == match.group('hash'):
+            return match.group(0)
+        changed.append(name)
+        return f"<!-- prerender:{name} hash={digest} -->{renderer(data)}<!-- /prerender -->"
+
+    output = MARKER.sub(replace, source)
+    if changed:
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(f"🧱 {page}: {len(changed)} fragments regenerats" + (f" ({', '.join(changed)})" if changed else ""))
+    return changed
+
+
+if __name__ == "__main__":
+    cache = {}
+    for page, fragments in PAGES.items():
+        prerender_page(page, fragments, cache)
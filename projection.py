@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Projecció de final de fase (Monte Carlo)
+- Punt de partida: la classificació actual (`ranking`) de actawp_{team}_data.json
+- Partits que queden: tots els pendents de la fase (`phase_fixtures`, del
+  calendari) o, si no n'hi ha, els nostres `upcoming_matches`
+- Els equips dels partits i de la classificació es relacionen amb els IDs
+  de l'índex d'entitats (actawp_entities.json), com al parser
+- Gols de cada partit amb Poisson: (atac de l'un + defensa de l'altre) / 2,
+  amb les mitjanes `avg_gf` / `avg_gc` de la forma dels rivals o, si no en
+  tenim, les de la classificació
+- Les simulacions van vectoritzades amb NumPy (una matriu simulacions ×
+  partits) i repartides en blocs per un pool de processos
+- Desempat: punts > diferència de gols > gols a favor > sorteig (els
+  enfrontaments directes no es simulen)
+- Resultat: actawp_{team}_projection.json amb la probabilitat de cada equip
+  d'acabar a cada posició
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from entity_index import EntityResolver
+from records import Match, canonical_team
+from standings import POINTS_WIN, POINTS_DRAW, POINTS_LOSS
+
+DEFAULT_SIMULATIONS = 100_000
+CHUNK_SIZE = 20_000       # simulacions per bloc (cada bloc és una tasca del pool)
+PRIOR_MATCHES = 2         # pes de la mitjana de la lliga en les mitjanes de cada equip
+MIN_GOAL_RATE = 0.5
+
+TEAMS = ('juvenil', 'cadet')
+
+
+def data_file(team):
+    return f"actawp_{team}_data.json"
+
+
+def projection_file(team):
+    return f"actawp_{team}_projection.json"
+
+
+def as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def simulate_chunk(n, seed, home, away, lam_home, lam_away, points, goal_diff, goals_for):
+    """Simula `n` finals de fase i compta quantes vegades cada equip acaba a cada posició
+
+    Retorna una matriu equips × posicions amb els recomptes.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    n_matches = len(home)
+
+    goals_home = rng.poisson(lam_home, size=(n, n_matches)).astype(np.int32)
+    goals_away = rng.poisson(lam_away, size=(n, n_matches)).astype(np.int32)
+    points_home = np.where(goals_home > goals_away, POINTS_WIN,
+                           np.where(goals_home == goals_away, POINTS_DRAW, POINTS_LOSS)).astype(np.int32)
+    points_away = np.where(goals_away > goals_home, POINTS_WIN,
+                           np.where(goals_home == goals_away, POINTS_DRAW, POINTS_LOSS)).astype(np.int32)
+
+    # Matrius d'incidència partit → equip: acumular per equip és un producte de matrius
+    home_of = np.zeros((n_matches, n_teams), dtype=np.int32)
+    away_of = np.zeros((n_matches, n_teams), dtype=np.int32)
+    home_of[np.arange(n_matches), home] = 1
+    away_of[np.arange(n_matches), away] = 1
+
+    final_points = points + points_home @ home_of + points_away @ away_of
+    final_diff = goal_diff + (goals_home - goals_away) @ home_of + (goals_away - goals_home) @ away_of
+    final_for = goals_for + goals_home @ home_of + goals_away @ away_of
+    draw = rng.random((n, n_teams))
+
+    # lexsort: l'última clau és la principal
+    order = np.lexsort((draw, -final_for, -final_diff, -final_points), axis=-1)
+    positions = np.argsort(order, axis=-1)
+    counts = np.bincount((np.arange(n_teams) * n_teams + positions).ravel(), minlength=n_teams * n_teams)
+    return counts.reshape(n_teams, n_teams)
+
+
+def _run_chunk(args):
+    return simulate_chunk(*args)
+
+
+class SeasonProjection:
+
+    def __init__(self, data, normalize=None):
+        self.normalize = normalize or canonical_team
+        self.ranking = data.get('ranking', [])
+        self.rivals_form = data.get('rivals_form', {})
+        self.teams = [row.get('equip', '') for row in self.ranking]
+        self.index = {self.normalize(name): i for i, name in enumerate(self.teams)}
+
+        self.points = np.array([as_number(row.get('punts')) for row in self.ranking], dtype=np.int32)
+        self.goals_for = np.array([as_number(row.get('gols_favor')) for row in self.ranking], dtype=np.int32)
+        self.goals_against = np.array([as_number(row.get('gols_contra')) for row in self.ranking], dtype=np.int32)
+        self.played = np.array([as_number(row.get('partits')) for row in self.ranking])
+
+        self.fixtures = self.remaining_fixtures(data)
+        self.attack, self.defence = self.goal_rates()
+
+    def remaining_fixtures(self, data):
+        """Partits pendents entre equips de la classificació: [(índex local, índex visitant), ...]"""
+        fixtures = data.get('phase_fixtures') or data.get('upcoming_matches', [])
+        pairs = []
+        seen = set()
+        for match in (Match.from_dict(m) for m in fixtures):
+            home = self.index.get(self.normalize(match.team1))
+            away = self.index.get(self.normalize(match.team2))
+            if home is None or away is None or home == away or match.match_id in seen:
+                continue
+            seen.add(match.match_id)
+            pairs.append((home, away))
+        return pairs
+
+    def goal_rates(self):
+        """Gols a favor i en contra per partit de cada equip (forma dels rivals o classificació)"""
+        total_played = self.played.sum()
+        league_rate = self.goals_for.sum() / total_played if total_played else 1.0
+
+        attack = np.empty(len(self.teams))
+        defence = np.empty(len(self.teams))
+        for i, name in enumerate(self.teams):
+            stats = (self.rivals_form.get(name) or {}).get('stats') or {}
+            if stats.get('matches_played'):
+                n = stats['matches_played']
+                gf, gc = stats.get('avg_gf', 0) * n, stats.get('avg_gc', 0) * n
+            else:
+                n, gf, gc = self.played[i], self.goals_for[i], self.goals_against[i]
+            attack[i] = (gf + league_rate * PRIOR_MATCHES) / (n + PRIOR_MATCHES)
+            defence[i] = (gc + league_rate * PRIOR_MATCHES) / (n + PRIOR_MATCHES)
+        return np.maximum(attack, MIN_GOAL_RATE), np.maximum(defence, MIN_GOAL_RATE)
+
+    def run(self, simulations=DEFAULT_SIMULATIONS, workers=None, seed=None):
+        """Probabilitats equip × posició (matriu NumPy)"""
+        home = np.array([h for h, _ in self.fixtures], dtype=np.intp)
+        away = np.array([a for _, a in self.fixtures], dtype=np.intp)
+        lam_home = (self.attack[home] + self.defence[away]) / 2
+        lam_away = (self.attack[away] + self.defence[home]) / 2
+        goal_diff = self.goals_for - self.goals_against
+
+        sizes = [CHUNK_SIZE] * (simulations // CHUNK_SIZE)
+        if simulations % CHUNK_SIZE:
+            sizes.append(simulations % CHUNK_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(n, s, home, away, lam_home, lam_away, self.points, goal_diff, self.goals_for)
+                 for n, s in zip(sizes, seeds)]
+
+        if workers == 0 or len(tasks) == 1:
+            counts = sum(map(_run_chunk, tasks))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                counts = sum(pool.map(_run_chunk, tasks))
+        return counts / simulations
+
+    def to_dict(self, probabilities, simulations, elapsed):
+        positions = np.arange(1, len(self.teams) + 1)
+        teams = []
+        for i, name in enumerate(self.teams):
+            row = probabilities[i]
+            teams.append({
+                'equip': name,
+                'team_id': self.ranking[i].get('team_id', ''),
+                'punts': int(self.points[i]),
+                'remaining_matches': sum(1 for h, a in self.fixtures if i in (h, a)),
+                'expected_position': round(float(row @ positions), 2),
+                'positions': [round(float(p), 4) for p in row],
+            })
+        return {
+            'metadata': {
+                'simulations': simulations,
+                'remaining_matches': len(self.fixtures),
+                'elapsed_s': round(elapsed, 2),
+                'generated_at': datetime.now().isoformat(),
+            },
+            'teams': teams,
+        }
+
+
+def project_team(team, simulations=DEFAULT_SIMULATIONS, workers=None, seed=None):
+    """Llegeix actawp_{team}_data.json i escriu actawp_{team}_projection.json"""
+    if not os.path.exists(data_file(team)):
+        print(f"⚠️ {data_file(team)} no existeix")
+        return None
+
+    with open(data_file(team), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    projection = SeasonProjection(data, EntityResolver.load().team_id)
+    if not projection.teams:
+        print(f"⚠️ {team}: sense classificació, no es pot projectar")
+        return None
+
+    start = time.monotonic()
+    probabilities = projection.run(simulations, workers, seed)
+    output = projection.to_dict(probabilities, simulations, time.monotonic() - start)
+    output['metadata']['team_key'] = team
+
+    with open(projection_file(team), 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+    print(f"\n🎲 {team.upper()}: {simulations} simulacions, {len(projection.fixtures)} partits pendents "
+          f"({output['metadata']['elapsed_s']} s)")
+    for row in sorted(output['teams'], key=lambda r: r['expected_position']):
+        print(f"   {row['expected_position']:>5}  {row['equip']:<30} 1r: {row['positions'][0]:.1%}")
+    print(f"💾 Guardat: {projection_file(team)}")
+    return output
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Projecció de final de fase (Monte Carlo)")
+    arg_parser.add_argument('--team', choices=TEAMS, help="Només aquest equip (per defecte, tots)")
+    arg_parser.add_argument('--simulations', type=int, default=DEFAULT_SIMULATIONS,
+                            help=f"Nombre de simulacions (per defecte {DEFAULT_SIMULATIONS})")
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="Processos del pool (per defecte, un per CPU; 0 = sense pool)")
+    arg_parser.add_argument('--seed', type=int, default=None, help="Llavor per resultats reproduïbles")
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for team in ([args.team] if args.team else TEAMS):
+        project_team(team, args.simulations, args.workers, args.seed)
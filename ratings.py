@@ -0,0 +1,172 @@
+"""
+Rating de força dels equips (tipus Elo)
+- Cada equip té un rating persistent (actawp_{team}_ratings.json) que
+  s'actualitza partit a partit: una execució diària només aplica els
+  partits nous, no torna a recórrer l'historial
+- Els partits aplicats es recorden per match_id amb el canvi que van
+  produir; si un marcador es corregeix, es desfà i es torna a aplicar
+- Un mateix partit pot arribar amb l'ID de l'URL (/match/123) o, si l'enllaç
+  no en té, amb l'ID de reserva (equips + data): es compta una sola vegada
+  (records.GameIds)
+- El canvi es multiplica segons la diferència de gols (un 15-5 pesa més
+  que un 8-7)
+- Els equips es comparen amb records.canonical_team, no per subcadenes
+"""
+
+import json
+import os
+from datetime import datetime
+
+from records import GameIds, canonical_team, is_fallback_id
+
+INITIAL_RATING = 1500
+K_FACTOR = 24
+SCALE = 400
+
+
+def ratings_file(team):
+    return f"actawp_{team}_ratings.json"
+
+
+def margin_multiplier(margin):
+    """Pes de la diferència de gols (escala de l'Elo de futbol)"""
+    if margin <= 1:
+        return 1.0
+    if margin == 2:
+        return 1.5
+    return (11 + margin) / 8
+
+
+def result_date(result):
+    """Clau d'ordenació per data dd/mm/aaaa (sense data, al final i en l'ordre d'arribada)"""
+    try:
+        return datetime.strptime(result.get('date', ''), '%d/%m/%Y')
+    except ValueError:
+        return datetime.max
+
+
+class EloRatings:
+
+    def __init__(self, normalize=None):
+        self.normalize = normalize or canonical_team
+        self.ratings = {}  # clau normalitzada → rating
+        self.names = {}    # clau normalitzada → nom tal com surt a la web
+        self.applied = {}  # match_id → [clau1, clau2, gols1, gols2, canvi per l'equip 1, data]
+        self.games = GameIds()  # (equip1, equip2, data) → match_id amb què s'ha aplicat
+
+    def index_games(self):
+        self.games = GameIds()
+        for match_id, applied in self.applied.items():
+            self.games.remember(match_id, applied[0], applied[1], applied[5] if len(applied) > 5 else None)
+
+    def resolve(self, match_id):
+        """match_id amb què s'ha aplicat el partit (un ID de reserva pot correspondre a un ID d'URL)"""
+        if match_id in self.applied or not is_fallback_id(match_id):
+            return match_id
+        team1, team2, date = (str(match_id).split('|') + ['', ''])[:3]
+        return self.games.find(self.normalize(team1), self.normalize(team2), date) or match_id
+
+    def rating(self, name):
+        return round(self.ratings.get(self.normalize(name), INITIAL_RATING), 1)
+
+    def match_delta(self, match_id, name):
+        """Canvi de rating que va produir un partit per a l'equip `name` (0 si no s'ha aplicat)"""
+        applied = self.applied.get(self.resolve(match_id))
+        if not applied:
+            return 0.0
+        key = self.normalize(name)
+        if key == applied[0]:
+            return applied[4]
+        if key == applied[1]:
+            return -applied[4]
+        return 0.0
+
+    # --- Actualització ---
+
+    def add_result(self, match_id, team1, team2, goals1, goals2, date=None):
+        """Aplica un resultat. Retorna True si és nou o corregit"""
+        key1, key2 = self.normalize(team1), self.normalize(team2)
+        match_id = self.games.claim(match_id, key1, key2, date, self.applied)
+        previous = self.applied.get(match_id)
+        if previous and previous[:4] == [key1, key2, goals1, goals2]:
+            if date:
+                self.applied[match_id] = previous[:5] + [date]
+                self.games.remember(match_id, key1, key2, date)
+            return False
+        if previous:
+            # Marcador corregit: desfer el canvi anterior
+            self.ratings[previous[0]] -= previous[4]
+            self.ratings[previous[1]] += previous[4]
+
+        self.names.setdefault(key1, team1)
+        self.names.setdefault(key2, team2)
+        rating1 = self.ratings.setdefault(key1, INITIAL_RATING)
+        rating2 = self.ratings.setdefault(key2, INITIAL_RATING)
+
+        expected = 1 / (1 + 10 ** ((rating2 - rating1) / SCALE))
+        actual = 1.0 if goals1 > goals2 else 0.5 if goals1 == goals2 else 0.0
+        delta = round(K_FACTOR * margin_multiplier(abs(goals1 - goals2)) * (actual - expected), 2)
+
+        self.ratings[key1] += delta
+        self.ratings[key2] -= delta
+        self.applied[match_id] = [key1, key2, goals1, goals2, delta, date]
+        self.games.remember(match_id, key1, key2, date)
+        return True
+
+    def add_results(self, results):
+        """Aplica una llista de Result per ordre de data; els repetits es fan una vegada
+
+        Repetits: mateix match_id, o mateixos equips i data quan un dels dos
+        IDs és de reserva (es queda el de l'URL).
+        """
+        unique = {}
+        for result in results:
+            if result.goals():
+                unique[result.match_id] = result
+        games = {}
+        for match_id, result in list(unique.items()):
+            game = GameIds.key(self.normalize(result.team1), self.normalize(result.team2), result.date)
+            if game is None:
+                continue
+            other = games.get(game)
+            if other is None:
+                games[game] = match_id
+            elif is_fallback_id(match_id):
+                del unique[match_id]
+            elif is_fallback_id(other):
+                del unique[other]
+                games[game] = match_id
+        changed = 0
+        for result in sorted(unique.values(), key=result_date):
+            if self.add_result(result.match_id, result.team1, result.team2, *result.goals(), date=result.date):
+                changed += 1
+        return changed
+
+    def form_delta(self, name, results):
+        """Canvi de rating acumulat en aquests partits (p.ex. els últims 5 d'un rival)"""
+        return round(sum(self.match_delta(r.match_id, name) for r in results), 1)
+
+    # --- Persistència ---
+
+    def to_dict(self):
+        return {'ratings': self.ratings, 'names': self.names, 'applied': self.applied}
+
+    @classmethod
+    def load(cls, path, normalize=None):
+        engine = cls(normalize)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                engine.ratings = state.get('ratings', {})
+                engine.names = state.get('names', {})
+                engine.applied = state.get('applied', {})
+                engine.index_games()
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {path}: {e} (es recalcula)")
+                engine = cls(normalize)
+        return engine
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
@@ -0,0 +1,273 @@
+"""
+Model de dades compartit pel parser, el notificador i els exportadors
+- Classes amb __slots__ (sense __dict__ per objecte): Match, Result,
+  PlayerLine, RankingRow i RivalForm
+- Accés compatible amb els dicts d'abans (r['score'], r.get('date')), així
+  el codi i els JSON antics continuen funcionant
+- Un camp a None vol dir "no hi és" i no s'escriu al JSON
+- Codecs: to_dict / from_dict, i `encode` per json.dump(..., default=encode)
+"""
+
+import re
+
+_SCORE_RE = re.compile(r'(\d+)\s*[-–]\s*(\d+)')
+_MATCH_URL_RE = re.compile(r'/match/(\d+)')
+
+
+class Record:
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.pop(field, None))
+        if values:
+            raise TypeError(f"{type(self).__name__}: camps desconeguts {sorted(values)}")
+
+    # --- Codecs ---
+
+    def to_dict(self):
+        out = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                out[field] = value
+        return out
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        record = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(record, field, data.get(field))
+        return record
+
+    # --- Accés tipus dict ---
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    # --- Comparació ---
+
+    def values(self):
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def changed_fields(self, other):
+        """Camps que canvien respecte d'un altre registre del mateix tipus"""
+        return [f for f, a, b in zip(self.FIELDS, self.values(), other.values()) if a != b]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class _MatchRecord(Record):
+    __slots__ = ()
+
+    @property
+    def match_id(self):
+        """Identificador estable del partit: l'ID de l'URL de l'ACTAWP o, si no n'hi ha, els equips"""
+        url_match = _MATCH_URL_RE.search(self.url or '')
+        if url_match:
+            return url_match.group(1)
+        return self._fallback_id()
+
+    def _fallback_id(self):
+        return f"{(self.team1 or '').upper()}|{(self.team2 or '').upper()}"
+
+
+class Match(_MatchRecord):
+    """Pròxim partit (upcoming_matches)"""
+    __slots__ = ('team1', 'team2', 'team1_logo', 'team2_logo', 'date_time', 'jornada', 'url', 'date', 'time', 'h2h')
+    FIELDS = __slots__
+
+
+class Result(_MatchRecord):
+    """Resultat d'un partit jugat (last_results)"""
+    __slots__ = ('team1', 'team2', 'team1_logo', 'team2_logo', 'score', 'date', 'jornada', 'url')
+    FIELDS = __slots__
+
+    def _fallback_id(self):
+        return f"{super()._fallback_id()}|{self.date or ''}"
+
+    def goals(self):
+        """(gols team1, gols team2) o None si el marcador no és vàlid"""
+        score_match = _SCORE_RE.search(self.score or '')
+        if not score_match:
+            return None
+        return int(score_match.group(1)), int(score_match.group(2))
+
+    @property
+    def score_team1(self):
+        goals = self.goals()
+        return goals[0] if goals else 0
+
+    @property
+    def score_team2(self):
+        goals = self.goals()
+        return goals[1] if goals else 0
+
+
+class PlayerLine(Record):
+    """Fila de la taula de jugadors, amb els camps curts que espera l'index.html"""
+    __slots__ = ('Nombre', 'PJ', 'GT', 'G', 'GP', 'G5P', 'TA', 'TR', 'EX', 'ED', 'EB', 'EN', 'EP',
+                 'P', 'PF', 'O', 'TM', 'JL', 'Vinculado', 'MVP', 'extra')
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, **values):
+        extra = {k: values.pop(k) for k in list(values) if k not in self.FIELDS}
+        super().__init__(**values)
+        self.extra = extra or None
+
+    def to_dict(self):
+        out = super().to_dict()
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def get(self, key, default=None):
+        if key not in self.FIELDS:
+            return (self.extra or {}).get(key, default)
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            return (self.extra or {})[key]
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return super().__contains__(key) or key in (self.extra or {})
+
+    def values(self):
+        return super().values() + (self.extra,)
+
+
+class RankingRow(Record):
+    """Fila de la classificació"""
+    __slots__ = ('posicio', 'equip', 'team_id', 'logo', 'punts', 'partits', 'guanyats', 'empatats',
+                 'perduts', 'gols_favor', 'gols_contra', 'diferencia')
+    FIELDS = __slots__
+
+
+class RivalForm(Record):
+    """Forma d'un rival (rivals_form[equip])"""
+    __slots__ = ('team_id', 'last_results', 'form', 'form_string', 'top_scorers', 'stats',
+                 'rating', 'rating_delta', 'stale')
+    FIELDS = __slots__
+
+    def to_dict(self):
+        out = super().to_dict()
+        if self.last_results is not None:
+            out['last_results'] = [r.to_dict() for r in self.last_results]
+        return out
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        record = super().from_dict(data)
+        record.last_results = as_records(record.last_results or [], Result)
+        return record
+
+
+def is_fallback_id(match_id):
+    """IDs de reserva de _MatchRecord, sense URL de partit ("EQUIP1|EQUIP2|dd/mm/aaaa")"""
+    return '|' in str(match_id)
+
+
+class GameIds:
+    """match_id amb què s'ha guardat cada partit, per (equip1, equip2, data)
+    
+    Un mateix partit pot arribar amb l'ID de l'URL (/match/123) o, si
+    l'enllaç no en té, amb l'ID de reserva. Quan un dels dos és de reserva,
+    els partits es comparen pels equips normalitzats i la data i es compten
+    una sola vegada (es queda l'ID de l'URL). Ho fan servir els motors
+    incrementals: classificació, rating i enfrontaments directes.
+    """
+
+    def __init__(self):
+        self.ids = {}  # "clau1|clau2|data" → match_id
+
+    @staticmethod
+    def key(key1, key2, date):
+        return f"{key1}|{key2}|{date}" if date else None
+
+    def find(self, key1, key2, date):
+        return self.ids.get(self.key(key1, key2, date))
+
+    def remember(self, match_id, key1, key2, date=None):
+        if date is None and is_fallback_id(match_id):
+            date = str(match_id).rsplit('|', 1)[-1]  # estat d'abans que es desés la data
+        game = self.key(key1, key2, date)
+        if game:
+            self.ids[game] = match_id
+
+    def claim(self, match_id, key1, key2, date, stored):
+        """match_id amb què s'ha de guardar el partit a `stored` (dict match_id → dades)
+
+        Si ja hi és amb l'ID de reserva i ara arriba amb el de l'URL, l'entrada
+        de `stored` passa a l'ID de l'URL; si ja hi és amb el de l'URL i ara
+        arriba el de reserva, es fa servir el de l'URL.
+        """
+        other = self.find(key1, key2, date)
+        if match_id in stored or other is None or other == match_id or other not in stored:
+            return match_id
+        if is_fallback_id(other):
+            stored[match_id] = stored.pop(other)
+            return match_id
+        if is_fallback_id(match_id):
+            return other
+        return match_id  # dos partits amb URL el mateix dia
+
+
+def canonical_team(name):
+    """Clau d'equip per comparar noms de fonts diferents ("C.N. Terrassa" → "TERRASSA")"""
+    if not name:
+        return ''
+    return name.upper().replace('C.N.', '').replace('C.E.', '').replace('U.E.', '').replace('CN ', '').replace('CE ', '').replace('UE ', '').strip()
+
+
+def as_records(items, cls):
+    """Converteix una llista de dicts (JSON antic, diari) al tipus de registre"""
+    return [cls.from_dict(item) for item in items]
+
+
+def encode(obj):
+    """`default` per json.dump: serialitza qualsevol registre"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} no és serialitzable a JSON")
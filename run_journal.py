@@ -0,0 +1,94 @@
+"""
+Diari (journal) d'una execució del parser per poder reprendre-la
+- Cada treball acabat (calendari, resultats, un rival...) s'afegeix com una
+  línia JSON al fitxer i es fa flush de seguida
+- Si el parser peta a mitges i es torna a executar dins la finestra
+  (--resume-window), els treballs del diari no es tornen a descarregar
+- Quan l'execució acaba bé, el diari s'esborra
+"""
+
+import json
+import os
+import time
+
+from records import encode
+
+JOURNAL_FILE = '.actawp_run_journal.jsonl'
+DEFAULT_RESUME_WINDOW = 60  # minuts
+
+
+class RunJournal:
+
+    def __init__(self, signature, path=JOURNAL_FILE, window_minutes=DEFAULT_RESUME_WINDOW):
+        self.path = path
+        self.signature = signature
+        self.window = window_minutes * 60
+        self.entries = {}
+        resumed = self._load()
+        if not resumed:
+            self._reset()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if not resumed:
+            self._write({'signature': signature, 'started_at': time.time()})
+
+    def _load(self):
+        """Recupera els treballs d'una execució anterior, si és prou recent i és la mateixa"""
+        if not self.window or not os.path.exists(self.path):
+            return False
+
+        age = time.time() - os.path.getmtime(self.path)
+        if age > self.window:
+            print(f"📓 Diari antic ({age / 60:.0f} min), es comença de nou")
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or '{}')
+                if header.get('signature') != self.signature:
+                    print("📓 El diari és d'una altra execució (seccions/equips diferents), es comença de nou")
+                    return False
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # línia a mig escriure per una caiguda
+                    if 'key' in entry:
+                        self.entries[entry['key']] = entry['value']
+        except Exception as e:
+            print(f"⚠️ No s'ha pogut llegir el diari: {e}")
+            self.entries = {}
+            return False
+
+        if self.entries:
+            print(f"📓 Reprenent execució: {len(self.entries)} treball(s) ja fets al diari")
+        return True
+
+    def _reset(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=encode) + '\n')
+        self._file.flush()
+
+    def has(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        return self.entries[key]
+
+    def record(self, key, value):
+        """Desa un treball acabat. Els buits no es desen (poden ser errors transitoris)
+        
+        Només va al fitxer: el valor ja és a scheduler.results i el treball no
+        es torna a agafar en aquesta execució (entries és per reprendre'n una altra).
+        """
+        if not value:
+            return
+        self._write({'key': key, 'value': value, 'at': time.time()})
+
+    def close(self, completed):
+        """Tanca el diari; si l'execució ha acabat bé ja no cal i s'esborra"""
+        self._file.close()
+        if completed:
+            self._reset()
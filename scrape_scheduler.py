@@ -0,0 +1,129 @@
+"""
+Planificador de descàrregues ACTAWP amb prioritats i pressupost de temps
+- Els treballs s'executen per ordre de prioritat (número petit = més important)
+- Cada treball té una part de xarxa (`fetch`) i una de CPU (`parse`), perquè
+  el FetchParsePipeline les pugui fer en paral·lel
+- Amb pressupost (--budget), quan s'acaba el temps els treballs pendents no
+  s'executen: queden a `missed` perquè el parser publiqui l'última dada bona
+  marcada com a "stale"
+- Un treball pot afegir-ne de nous quan acaba (p.ex. la classificació
+  planifica els rivals)
+- Amb un RunJournal, els treballs que ja són al diari no es tornen a fer
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+# Prioritats (com més petit, abans s'executa)
+PRIORITY_OWN = 0        # calendari, pròxims partits i resultats del nostre equip
+PRIORITY_RANKING = 1    # classificació
+PRIORITY_TEAM = 2       # jugadors i estadístiques del nostre equip
+PRIORITY_RIVALS = 10    # + ordre del pròxim partit contra cada rival
+
+
+class ScrapeJob:
+    __slots__ = ('key', 'fetch', 'parse', 'on_done', 'heavy')
+
+    def __init__(self, key, fetch, parse=None, on_done=None, heavy=False):
+        self.key = key
+        self.fetch = fetch
+        self.parse = parse
+        self.on_done = on_done
+        self.heavy = heavy  # parse apte per un pool de processos (pàgines grans)
+
+
+class ScrapeScheduler:
+
+    def __init__(self, budget=None, journal=None, pipeline=None):
+        self.budget = budget
+        self.journal = journal
+        self.pipeline = pipeline
+        self.deadline = time.monotonic() + budget if budget else None
+        self._queue = []
+        self._counter = itertools.count()  # desempat: ordre d'arribada
+        # RLock: un on_done pot fer submit() mentre es té el lock
+        self._cond = threading.Condition(threading.RLock())
+        self._active = 0  # treballs agafats que encara no han acabat
+        self.results = {}
+        self.failed = {}
+        self.missed = []
+
+    def submit(self, key, priority, fetch, parse=None, on_done=None, heavy=False):
+        """Afegeix un treball. `on_done(valor)` es crida quan acaba bé"""
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._counter), ScrapeJob(key, fetch, parse, on_done, heavy)))
+            self._cond.notify_all()
+
+    def remaining(self):
+        """Segons que queden del pressupost (None = sense límit)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def take(self):
+        """Següent treball a descarregar (None quan ja no en queden ni en poden aparèixer)"""
+        with self._cond:
+            while True:
+                if self._queue:
+                    _, _, job = heapq.heappop(self._queue)
+                    if self.journal and self.journal.has(job.key):
+                        print(f"  📓 {job.key}: recuperat del diari")
+                        self._active += 1
+                        self.complete(job, self.journal.get(job.key), record=False)
+                        continue
+                    if self.expired():
+                        self.missed.append(job.key)
+                        continue
+                    self._active += 1
+                    return job
+                if not self._active:
+                    return None
+                # Hi ha treballs en curs que en poden afegir de nous
+                self._cond.wait()
+
+    def complete(self, job, value, record=True):
+        with self._cond:
+            self.results[job.key] = value
+            if record and self.journal:
+                self.journal.record(job.key, value)
+            try:
+                if job.on_done:
+                    job.on_done(value)
+            finally:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def fail(self, job, error):
+        print(f"  ❌ {job.key}: {error}")
+        with self._cond:
+            self.failed[job.key] = str(error)
+            self._active -= 1
+            self._cond.notify_all()
+
+    def run(self):
+        """Executa la cua fins que es buida o s'acaba el temps"""
+        if self.pipeline:
+            self.pipeline.run(self)
+        else:
+            while True:
+                job = self.take()
+                if job is None:
+                    break
+                try:
+                    value = job.fetch()
+                    if job.parse:
+                        value = job.parse(value)
+                except Exception as e:
+                    self.fail(job, e)
+                    continue
+                self.complete(job, value)
+
+        if self.missed:
+            print(f"\n⏱️ Temps esgotat: {len(self.missed)} treball(s) sense executar (es reutilitza l'última dada)")
+
+        return self.results
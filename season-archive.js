@@ -0,0 +1,48 @@
+// Lectura dels arxius de temporada (season_archive.py) des del navegador
+// archive/index.json diu el bundle de cada temporada. Del bundle només es
+// baixen la capçalera i l'índex, i després el rang de bytes de cada entrada
+// que es demana (Range: bytes=...). Cada entrada és un gzip independent.
+const ARCHIVE_CATALOG = 'archive/index.json';
+const ARCHIVE_MAGIC = 'CNTARCH1';
+const ARCHIVE_HEADER_SIZE = 12;  // magic (8) + mida de l'índex (uint32 big-endian)
+
+async function fetchRange(url, start, end) {
+  const response = await fetch(url, { headers: { Range: `bytes=${start}-${end}` } });
+  if (!response.ok) throw new Error(`${response.status} ${url}`);
+  const buffer = await response.arrayBuffer();
+  // Si el servidor ignora el Range (200 amb el fitxer sencer), es retalla aquí
+  return response.status === 206 ? buffer : buffer.slice(start, end + 1);
+}
+
+async function gunzip(buffer) {
+  const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).text();
+}
+
+async function openSeasonArchive(season, base = '') {
+  const catalog = await (await fetch(base + ARCHIVE_CATALOG)).json();
+  if (!catalog[season]) throw new Error(`No hi ha arxiu de la temporada ${season}`);
+  const url = `${base}archive/${catalog[season].file}`;
+
+  const header = new DataView(await fetchRange(url, 0, ARCHIVE_HEADER_SIZE - 1));
+  const magic = String.fromCharCode(...new Uint8Array(header.buffer, 0, 8));
+  if (magic !== ARCHIVE_MAGIC) throw new Error(`${url}: no és un arxiu de temporada`);
+  const indexSize = header.getUint32(8);
+  const index = JSON.parse(await gunzip(await fetchRange(url, ARCHIVE_HEADER_SIZE, ARCHIVE_HEADER_SIZE + indexSize - 1)));
+  const dataStart = ARCHIVE_HEADER_SIZE + indexSize;
+  const cache = new Map();
+
+  return {
+    season: index.season,
+    names: (prefix = '') => Object.keys(index.entries).filter(name => name.startsWith(prefix)).sort(),
+    async get(name) {
+      if (!index.entries[name]) return null;
+      if (!cache.has(name)) {
+        const [offset, size] = index.entries[name];
+        cache.set(name, fetchRange(url, dataStart + offset, dataStart + offset + size - 1)
+          .then(gunzip).then(JSON.parse));
+      }
+      return cache.get(name);
+    },
+  };
+}
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Arxiu compacte i immutable d'una temporada acabada
+- Congela les dades d'una temporada en un sol fitxer:
+  archive/season-{temporada}-{hash}.bundle. El nom porta el hash del
+  contingut (no canvia mai; es pot cachejar per sempre)
+- Contingut: cada partit (matches/{team}/{fitxer}), cada jugador
+  (players/{team}/{id}), els totals de l'anuari (anuari/{team}) i les dades
+  de l'ACTAWP si encara hi són (actawp/{team})
+- Format: "CNTARCH1" + longitud de l'índex (uint32, big-endian) + índex
+  (JSON gzip: nom → [offset, mida, sha256]) + els blocs. Cada entrada és un
+  gzip independent: un client llegeix la capçalera i l'índex i després
+  només el rang d'una entrada (Range: bytes=...), sense baixar-ho tot
+- Les entrades amb el mateix contingut es guarden una sola vegada
+- archive/index.json diu quin fitxer correspon a cada temporada
+  (season-archive.js el llegeix des del navegador)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import struct
+
+from anuari_dataset import SeasonAggregate, match_files, summarize_match
+from entity_index import EntityResolver
+
+ARCHIVE_DIR = 'archive'
+CATALOG_FILE = f"{ARCHIVE_DIR}/index.json"
+MAGIC = b'CNTARCH1'
+HEADER = struct.Struct('>8sI')
+HASH_LENGTH = 12
+
+
+def compress(data):
+    # mtime=0: el mateix contingut dona sempre els mateixos bytes (i el mateix hash)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def encode_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+class ArchiveWriter:
+
+    def __init__(self, season):
+        self.season = season
+        self.entries = {}  # nom → bytes (sense comprimir)
+
+    def add(self, name, data):
+        self.entries[name] = data if isinstance(data, bytes) else encode_json(data)
+
+    def add_team(self, team, source):
+        """Partits, jugadors i totals d'un equip a partir del directori de partits"""
+        files = match_files(source)
+        aggregate = SeasonAggregate()
+        reduced = sorted(map(summarize_match, files), key=lambda r: r['summary']['data'] if 'summary' in r else '')
+        for match in reduced:
+            aggregate.add(match)
+        for path in files:
+            with open(path, 'rb') as f:
+                self.add(f"matches/{team}/{os.path.basename(path)}", f.read())
+
+        entities = EntityResolver.load()
+        dataset = aggregate.to_dict(team, self.season)
+        dataset['metadata'].pop('generated_at')  # l'arxiu només depèn de les dades
+        for player in dataset['players']:
+            self.add(f"players/{team}/{entities.player_id(team, player['nom'])}", player)
+        self.add(f"anuari/{team}", dataset)
+
+        actawp = f"actawp_{team}_data.json"
+        if os.path.exists(actawp):
+            with open(actawp, 'rb') as f:
+                self.add(f"actawp/{team}", f.read())
+        for error in aggregate.errors:
+            print(f"   ⚠️ {error}")
+        return len(files)
+
+    def build(self):
+        """Bytes del bundle: capçalera + índex + blocs (deduplicats pel hash)"""
+        blobs, offsets, index = [], {}, {}
+        position = 0
+        for name in sorted(self.entries):
+            raw = self.entries[name]
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest not in offsets:
+                blob = compress(raw)
+                offsets[digest] = (position, len(blob))
+                blobs.append(blob)
+                position += len(blob)
+            index[name] = [*offsets[digest], digest[:HASH_LENGTH]]
+
+        encoded_index = compress(encode_json({'season': self.season, 'entries': index}))
+        return HEADER.pack(MAGIC, len(encoded_index)) + encoded_index + b''.join(blobs)
+
+    def write(self):
+        content = self.build()
+        digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        path = f"{ARCHIVE_DIR}/season-{self.season}-{digest}.bundle"
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(content)
+
+        catalog = load_catalog()
+        previous = catalog.get(self.season)
+        if previous and previous['file'] != os.path.basename(path) and os.path.exists(f"{ARCHIVE_DIR}/{previous['file']}"):
+            os.remove(f"{ARCHIVE_DIR}/{previous['file']}")
+        catalog[self.season] = {'file': os.path.basename(path), 'size': len(content), 'entries': len(self.entries)}
+        with open(CATALOG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(catalog, f, ensure_ascii=False, indent=1, sort_keys=True)
+        return path, len(content)
+
+
+def load_catalog():
+    if os.path.exists(CATALOG_FILE):
+        with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+class SeasonArchive:
+    """Lectura d'un bundle: només es llegeix l'índex i les entrades que es demanen"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, index_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path}: no és un arxiu de temporada")
+            index = json.loads(gzip.decompress(f.read(index_size)))
+        self.season = index['season']
+        self.entries = index['entries']
+        self.data_start = HEADER.size + index_size
+
+    def names(self, prefix=''):
+        return sorted(name for name in self.entries if name.startswith(prefix))
+
+    def byte_range(self, name):
+        """(inici, final inclusiu) dins del fitxer, per a una petició Range"""
+        offset, size, _ = self.entries[name]
+        return self.data_start + offset, self.data_start + offset + size - 1
+
+    def read(self, name):
+        start, end = self.byte_range(name)
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return gzip.decompress(f.read(end - start + 1))
+
+    def read_json(self, name):
+        return json.loads(self.read(name))
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Arxiu compacte d'una temporada")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Congela una temporada en un bundle")
+    build.add_argument('season', help="Temporada (p. ex. 2025-26)")
+    build.add_argument('--team', action='append', required=True, metavar='EQUIP=DIRECTORI',
+                       help="Equip i directori amb els seus partits (es pot repetir)")
+
+    listing = commands.add_parser('list', help="Entrades d'un bundle")
+    listing.add_argument('bundle')
+    listing.add_argument('prefix', nargs='?', default='')
+
+    get = commands.add_parser('get', help="Mostra una entrada d'un bundle")
+    get.add_argument('bundle')
+    get.add_argument('name')
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'build':
+        writer = ArchiveWriter(args.season)
+        for spec in args.team:
+            team, _, source = spec.partition('=')
+            count = writer.add_team(team, source)
+            print(f"📚 {team}: {count} partits de {source}")
+        sources_size = sum(len(data) for data in writer.entries.values())
+        path, size = writer.write()
+        print(f"🗄️ {path}: {len(writer.entries)} entrades, {size / 1024:.1f} KB "
+              f"({sources_size / 1024:.1f} KB sense comprimir)")
+    elif args.command == 'list':
+        archive = SeasonArchive(args.bundle)
+        for name in archive.names(args.prefix):
+            start, end = archive.byte_range(name)
+            print(f"{name}\tbytes={start}-{end}")
+    else:
+        print(SeasonArchive(args.bundle).read(args.name).decode('utf-8'))
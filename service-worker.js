@@ -1,6 +1,9 @@
 // Service Worker per CN Terrassa - Versió sense caché de JSON externs
 const CACHE_NAME = 'cnt-v5';
 
+// Precache amb hash de contingut (precache-manifest.json)
+importScripts('./precache-sync.js');
+
 // Només recursos locals del repo CNT
 const urlsToCache = [
   './index.html',
@@ -20,6 +23,7 @@ self.addEventListener('install', event => {
         console.log('[SW] Guardant recursos bàsics');
         return cache.addAll(urlsToCache);
       })
+      .then(() => syncPrecache(CACHE_NAME))
       .catch(error => {
         console.warn('[SW] Alguns recursos no s\'han pogut cachear:', error);
       })
@@ -48,6 +52,7 @@ self.addEventListener('activate', event => {
 // Fetch - CLAU: No interceptar JSON d'altres repos
 self.addEventListener('fetch', event => {
   const url = new URL(event.request.url);
+  maybeSyncPrecache(event, CACHE_NAME);
   
   // NO interceptar si és:
   // 1. JSON d'altres repos de GitHub Pages
@@ -0,0 +1,179 @@
+"""
+Motor de classificació calculada a partir dels resultats
+- Cada resultat nou s'aplica en O(1): suma punts, PJ, V/E/D, GF, GC i el
+  registre d'enfrontaments directes de la parella
+- Els resultats ja aplicats es recorden per match_id: si un marcador es
+  corregeix, es desfà l'antic i s'aplica el nou. Un partit que arriba amb
+  l'ID de l'URL i amb el de reserva (equips + data) es compta una sola
+  vegada (records.GameIds)
+- L'ordenació (amb desempats) només es fa quan es demana la taula:
+  punts > punts entre els empatats > diferència entre els empatats >
+  diferència general > gols a favor > nom
+- L'estat es desa a actawp_{team}_standings.json per continuar a la
+  propera execució aplicant només els partits nous
+"""
+
+import json
+import os
+
+from records import GameIds, RankingRow, canonical_team
+
+POINTS_WIN = 3
+POINTS_DRAW = 1
+POINTS_LOSS = 0
+
+STAT_FIELDS = ('punts', 'partits', 'guanyats', 'empatats', 'perduts', 'gols_favor', 'gols_contra')
+
+
+def standings_file(team_key):
+    return f"actawp_{team_key}_standings.json"
+
+
+class StandingsEngine:
+
+    def __init__(self, normalize=None):
+        self.normalize = normalize or canonical_team
+        self.teams = {}    # clau normalitzada → {'equip': nom, 'punts': 0, ...}
+        self.h2h = {}      # "A|B" (ordenat) → {A: [punts, gols_favor, gols_contra], B: [...]}
+        self.applied = {}  # match_id → [clau1, clau2, gols1, gols2, data]
+        self.games = GameIds()
+
+    # --- Actualització ---
+
+    def add_team(self, name):
+        key = self.normalize(name)
+        if key not in self.teams:
+            self.teams[key] = dict({field: 0 for field in STAT_FIELDS}, equip=name)
+        return key
+
+    def add_result(self, match_id, team1, team2, goals1, goals2, date=None):
+        """Aplica un resultat. Retorna True si ha canviat la classificació"""
+        key1, key2 = self.add_team(team1), self.add_team(team2)
+        match_id = self.games.claim(match_id, key1, key2, date, self.applied)
+        previous = self.applied.get(match_id)
+        self.games.remember(match_id, key1, key2, date)
+        if previous and previous[:4] == [key1, key2, goals1, goals2]:
+            if date:
+                self.applied[match_id] = previous[:4] + [date]
+            return False
+        if previous:
+            # Marcador corregit: desfer el que s'havia aplicat
+            self._apply(*previous[:4], sign=-1)
+        self._apply(key1, key2, goals1, goals2, sign=1)
+        self.applied[match_id] = [key1, key2, goals1, goals2, date]
+        return True
+
+    def add_results(self, results):
+        """Aplica una llista de Result (els que no tenen marcador vàlid s'ignoren)"""
+        changed = 0
+        for result in results:
+            goals = result.goals()
+            if goals and self.add_result(result.match_id, result.team1, result.team2, *goals, date=result.date):
+                changed += 1
+        return changed
+
+    def _apply(self, key1, key2, goals1, goals2, sign):
+        for key, gf, gc in ((key1, goals1, goals2), (key2, goals2, goals1)):
+            row = self.teams[key]
+            points = POINTS_WIN if gf > gc else POINTS_DRAW if gf == gc else POINTS_LOSS
+            row['punts'] += sign * points
+            row['partits'] += sign
+            row['guanyats' if gf > gc else 'empatats' if gf == gc else 'perduts'] += sign
+            row['gols_favor'] += sign * gf
+            row['gols_contra'] += sign * gc
+
+            pair = self.h2h.setdefault('|'.join(sorted((key1, key2))), {})
+            record = pair.setdefault(key, [0, 0, 0])
+            record[0] += sign * points
+            record[1] += sign * gf
+            record[2] += sign * gc
+
+    # --- Lectura ---
+
+    def _h2h_among(self, keys):
+        """Punts i diferència de gols de cada equip només en els partits entre `keys`"""
+        totals = {key: [0, 0] for key in keys}
+        keys = sorted(keys)
+        for i, a in enumerate(keys):
+            for b in keys[i + 1:]:
+                pair = self.h2h.get(f"{a}|{b}", {})
+                for key in (a, b):
+                    points, gf, gc = pair.get(key, (0, 0, 0))
+                    totals[key][0] += points
+                    totals[key][1] += gf - gc
+        return totals
+
+    def ordered_keys(self):
+        by_points = {}
+        for key, row in self.teams.items():
+            by_points.setdefault(row['punts'], []).append(key)
+
+        ordered = []
+        for points in sorted(by_points, reverse=True):
+            group = by_points[points]
+            h2h = self._h2h_among(group) if len(group) > 1 else {group[0]: [0, 0]}
+
+            def tiebreak(key):
+                row = self.teams[key]
+                return (-h2h[key][0], -h2h[key][1],
+                        -(row['gols_favor'] - row['gols_contra']), -row['gols_favor'], row['equip'])
+
+            ordered.extend(sorted(group, key=tiebreak))
+        return ordered
+
+    def table(self, known_rows=()):
+        """Classificació com a RankingRow; team_id i logo surten de `known_rows` (última classificació)"""
+        known = {self.normalize(row.get('equip', '')): row for row in known_rows}
+        table = []
+        for position, key in enumerate(self.ordered_keys(), 1):
+            row = self.teams[key]
+            previous = known.get(key)
+            table.append(RankingRow(
+                posicio=str(position),
+                equip=previous.get('equip') if previous else row['equip'],
+                team_id=previous.get('team_id', '') if previous else '',
+                logo=previous.get('logo', '') if previous else '',
+                diferencia=row['gols_favor'] - row['gols_contra'],
+                **{field: row[field] for field in STAT_FIELDS}
+            ))
+        return table
+
+    def compare(self, scraped):
+        """Diferències entre la taula calculada i la de la web (per validar)"""
+        computed = {self.normalize(row.equip): row for row in self.table()}
+        differences = []
+        for row in scraped:
+            mine = computed.get(self.normalize(row.get('equip', '')))
+            if mine is None:
+                differences.append(f"{row.get('equip')}: no surt als resultats")
+                continue
+            for field in ('posicio',) + STAT_FIELDS:
+                if str(mine.get(field)) != str(row.get(field)):
+                    differences.append(f"{row.get('equip')}: {field} {mine.get(field)} ≠ {row.get(field)}")
+        return differences
+
+    # --- Persistència ---
+
+    def to_dict(self):
+        return {'teams': self.teams, 'h2h': self.h2h, 'applied': self.applied}
+
+    @classmethod
+    def load(cls, path, normalize=None):
+        engine = cls(normalize)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                engine.teams = state.get('teams', {})
+                engine.h2h = state.get('h2h', {})
+                engine.applied = state.get('applied', {})
+                for match_id, applied in engine.applied.items():
+                    engine.games.remember(match_id, applied[0], applied[1], applied[4] if len(applied) > 4 else None)
+            except Exception as e:
+                print(f"⚠️ No s'ha pogut llegir {path}: {e} (es recalcula)")
+                engine = cls(normalize)
+        return engine
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Torneig sintètic amb la forma de l'ACTAWP (per proves d'escala)
+- Genera N equips i M jornades (lliga tots contra tots, anada i tornada si
+  hi ha prou jornades) amb resultats deterministes per la llavor: les
+  mateixes opcions donen sempre el mateix HTML
+- Produeix les pàgines que llegeix ultra_robust_parser.py: classificació,
+  calendari, pàgina d'equip (csrf_token) i les pestanyes players, stats,
+  upcoming-matches i last-results de change-tab
+- Amb el servidor local el parser s'hi connecta com si fos la web real:
+  ACTAWP_BASE=http://localhost:8790 python ultra_robust_parser.py
+  (les URL de la classificació i el calendari de TEAMS ja hi apunten)
+- Les jornades jugades són les primeres `played`; `postponed` mou una
+  fracció dels partits pendents una setmana més tard (canvis de calendari
+  per a notify_changes.py)
+- La classificació es calcula amb standings.StandingsEngine (els mateixos
+  desempats que el parser) i cada equip té el seu escut PNG a
+  /media/team/{id}/logo.png (per logos.LogoStore)
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import struct
+import threading
+import zlib
+from datetime import date, timedelta
+from functools import cached_property
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from records import Match, Result
+from standings import StandingsEngine
+
+DEFAULT_PORT = 8790
+SEASON_START = date(2025, 9, 27)  # primer dissabte de la temporada
+TIME_SLOTS = ('09:30', '11:00', '12:50', '16:15', '18:00', '19:30')
+TEAM_ID_BASE = 15600000
+MATCH_ID_BASE = 20000000
+PLAYERS_PER_TEAM = 14
+OWN_TEAM_NAME = 'CN TERRASSA'
+LOGO_SIZE = 32
+
+PREFIXES = ('CN', 'CE', 'UE', 'CW', 'CNAB', 'AE', 'CD')
+TOWNS = ('SABADELL', 'MATARÓ', 'MONTJUÏC', 'BARCELONETA', 'RUBÍ', 'MANRESA', 'GIRONA', 'REUS', 'LLEIDA',
+         'TARRAGONA', 'GRANOLLERS', 'MOLINS', 'CATALUNYA', 'MEDITERRANI', 'SANT ANDREU', 'SANT FELIU',
+         'HORTA', 'POBLE NOU', 'BADALONA', 'VILADECANS', 'CERDANYOLA', 'MOLLET', 'VIC', 'IGUALADA',
+         'BLANES', 'PREMIÀ', 'SITGES', 'CASTELLDEFELS', 'MARTORELL', 'TORTOSA', 'FIGUERES', 'OLOT',
+         'VILANOVA', 'EL PRAT', 'CORNELLÀ', 'SANT CUGAT', 'BANYOLES', 'PALAFRUGELL', 'CALELLA', 'VALLS',
+         'SALOU', 'CAMBRILS', 'AMPOSTA', 'SOLSONA', 'BERGA', 'RIPOLL', 'PUIGCERDÀ', 'TÀRREGA', 'BALAGUER', 'ARENYS')
+SUFFIXES = ('', ' B', ' 2', ' C', ' 3', ' D', ' 4', ' E')
+FIRST_NAMES = ('MARC', 'POL', 'JAN', 'ARNAU', 'BIEL', 'ORIOL', 'PAU', 'ÀLEX', 'DAVID', 'ERIC', 'HUGO',
+               'IU', 'JOEL', 'LEO', 'MARTÍ', 'NIL', 'ROGER', 'SERGI', 'TEO', 'XAVI')
+SURNAMES = ('GARCIA', 'MARTÍNEZ', 'PUIG', 'SOLER', 'VIDAL', 'FERRER', 'ROCA', 'SERRA', 'CASAS', 'FONT',
+            'PONS', 'RIBAS', 'MAS', 'COLL', 'VILA', 'BOSCH', 'SALA', 'CAMPS', 'GIL', 'PRAT')
+WEEKDAYS = ('Dil', 'Dim', 'Dmc', 'Dij', 'Div', 'Dis', 'Diu')
+
+# Capçaleres de la pestanya de jugadors: (abreviatura, títol en català, títol en castellà)
+PLAYER_COLUMNS = (
+    ('PJ', 'Partits jugats', 'Partidos jugados'),
+    ('GT', 'Total goals', 'Goles totales'),
+    ('G', 'Gols', 'Goles'),
+    ('GP', 'Gols penal', 'Goles de penalti'),
+    ('TA', 'Targetes grogues', 'Tarjetas amarillas'),
+    ('EX', 'Expulsions per 20 segons', 'Expulsiones por 20 segundos'),
+    ('ED', 'Expulsions definitives, amb substitució disciplinària',
+     'Expulsiones definitivas, con sustitución disciplinaria'),
+    ('P', 'Faltes per penal', 'Faltas por penalti'),
+    ('PF', 'Penals fallats', 'Penaltis fallados'),
+    ('MVP', 'MVP', 'MVP'),
+)
+
+
+def team_names(count):
+    """Noms d'equip únics; el primer és el nostre
+    
+    Un club per població i filials amb lletra o número (canonical_team treu
+    el prefix CN/CE/UE: "CN SABADELL" i "CE SABADELL" serien el mateix equip).
+    """
+    names = [OWN_TEAM_NAME]
+    for s, suffix in enumerate(SUFFIXES):
+        for t, town in enumerate(TOWNS):
+            if len(names) == count:
+                return names
+            names.append(f"{PREFIXES[(s + t) % len(PREFIXES)]} {town}{suffix}")
+    if len(names) < count:
+        raise ValueError(f"Com a molt {len(names)} equips")
+    return names
+
+
+def png(size, rgb):
+    """PNG d'un sol color (sense Pillow)"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    raw = (b'\x00' + bytes(rgb) * size) * size
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+
+def round_robin(count):
+    """Jornades d'una volta (mètode del cercle): [[(local, visitant), ...], ...] amb índexs d'equip"""
+    slots = list(range(count)) + ([None] if count % 2 else [])
+    rounds = []
+    for r in range(len(slots) - 1):
+        pairs = []
+        for i in range(len(slots) // 2):
+            home, away = slots[i], slots[-1 - i]
+            if home is None or away is None:
+                continue  # descansa
+            pairs.append((home, away) if (r + i) % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        slots.insert(1, slots.pop())
+    return rounds
+
+
+class SyntheticTournament:
+
+    def __init__(self, teams=10, rounds=None, played=None, postponed=0.0, seed=0, own_ids=()):
+        if teams < 2:
+            raise ValueError("Calen com a mínim 2 equips")
+        self.names = team_names(teams)
+        self.team_ids = [str(TEAM_ID_BASE + i) for i in range(teams)]
+        base = round_robin(teams)
+        self.rounds = rounds or 2 * len(base)
+        self.played = min(self.rounds, self.rounds * 2 // 3 if played is None else played)
+
+        rng = random.Random(seed)
+        strength = [rng.uniform(0.6, 1.6) for _ in range(teams)]
+        self.matches = []  # (jornada, id, local, visitant, data, hora, marcador o None)
+        for r in range(self.rounds):
+            leg = r // len(base)
+            for home, away in base[r % len(base)]:
+                if leg % 2:
+                    home, away = away, home
+                day = SEASON_START + timedelta(weeks=r, days=rng.choice((0, 0, 0, 1)))
+                goals = (self._goals(rng, strength[home], strength[away]),
+                         self._goals(rng, strength[away], strength[home]))
+                self.matches.append([r + 1, str(MATCH_ID_BASE + len(self.matches)), home, away,
+                                     day, rng.choice(TIME_SLOTS), goals if r < self.played else None])
+
+        # Ajornaments: un generador a part, perquè els resultats no depenguin de `postponed`
+        moves = random.Random(f"{seed}-postponed")
+        for match in self.matches:
+            if match[6] is None and moves.random() < postponed:
+                match[4] += timedelta(weeks=1)
+
+        self.by_team = [[] for _ in range(teams)]
+        for match in self.matches:
+            self.by_team[match[2]].append(match)
+            self.by_team[match[3]].append(match)
+        self.index = {team_id: i for i, team_id in enumerate(self.team_ids)}
+        self.index.update((team_id, 0) for team_id in own_ids)  # IDs de TEAMS: les pestanyes del nostre equip
+        self.rosters = [self._roster(random.Random(f"{seed}-{i}"), len([m for m in self.by_team[i] if m[6]]))
+                        for i in range(teams)]
+
+    @staticmethod
+    def _goals(rng, attack, defence):
+        return max(0, round(rng.gauss(8 * attack / defence, 2.5)))
+
+    @staticmethod
+    def _roster(rng, games):
+        players = []
+        for number in range(PLAYERS_PER_TEAM):
+            goals = rng.randint(0, 3 * games) if number else 0  # el porter no marca
+            penalties = rng.randint(0, goals // 4)
+            players.append({
+                'name': f"{rng.choice(SURNAMES)} {rng.choice(SURNAMES)}, {rng.choice(FIRST_NAMES)}",
+                'PJ': max(0, games - rng.randint(0, 2)), 'GT': goals, 'G': goals - penalties, 'GP': penalties,
+                'TA': rng.randint(0, 2), 'EX': rng.randint(0, games), 'ED': rng.randint(0, 1),
+                'P': rng.randint(0, 3), 'PF': rng.randint(0, 1), 'MVP': rng.randint(0, 2),
+            })
+        return players
+
+    # ─────────── Dades ───────────
+
+    def logo(self, team):
+        return f"/media/team/{self.team_ids[team]}/logo.png"
+
+    def match_url(self, match_id, language='ca'):
+        return f"/{language}/match/{match_id}"
+
+    def when(self, match, with_time=True):
+        day = match[4]
+        text = f"{WEEKDAYS[day.weekday()]}, {day.strftime('%d/%m/%Y')}"
+        return f"{text} {match[5]}" if with_time else text
+
+    def logo_png(self, team):
+        """Escut d'un sol color, diferent per cada equip (el contingut no es repeteix)"""
+        return png(LOGO_SIZE, (team >> 8, team & 0xFF, 0x80))
+
+    def standings(self):
+        """Files de la classificació a partir dels partits jugats, ordenades com StandingsEngine"""
+        engine = StandingsEngine()
+        teams = {engine.add_team(name): i for i, name in enumerate(self.names)}
+        for _, match_id, home, away, _, _, goals in self.matches:
+            if goals is not None:
+                engine.add_result(match_id, self.names[home], self.names[away], *goals)
+        rows = []
+        for key in engine.ordered_keys():
+            row = engine.teams[key]
+            rows.append({'team': teams[key], 'pts': row['punts'], 'pj': row['partits'], 'g': row['guanyats'],
+                         'e': row['empatats'], 'p': row['perduts'], 'gf': row['gols_favor'],
+                         'gc': row['gols_contra']})
+        return rows
+
+    def actawp_data(self):
+        """Seccions del JSON del parser (tota la fase: resultats i pròxims partits de tots els equips)"""
+        results, upcoming = [], []
+        for match in self.matches:
+            jornada, match_id, home, away, day, hour, goals = match
+            common = dict(team1=self.names[home], team2=self.names[away], team1_logo=self.logo(home),
+                          team2_logo=self.logo(away), jornada=jornada, url=self.match_url(match_id))
+            if goals is None:
+                upcoming.append(Match(date_time=self.when(match), date=day.strftime('%d/%m/%Y'), time=hour,
+                                      **common).to_dict())
+            else:
+                results.append(Result(score=f"{goals[0]}-{goals[1]}", date=day.strftime('%d/%m/%Y'),
+                                      **common).to_dict())
+        return {'last_results': results, 'upcoming_matches': upcoming}
+
+    # ─────────── HTML ───────────
+
+    def team_link(self, team, language, logo_first=True):
+        name = html.escape(self.names[team])
+        img = f'<img src="{self.logo(team)}" alt="">'
+        return (f'<a href="/{language}/team/{self.team_ids[team]}" title="{name}">'
+                f'{img if logo_first else ""}<span class="d-none d-md-inline">Ver</span>'
+                f'<span>{name}</span>{"" if logo_first else img}</a>')
+
+    def match_team(self, match, team, language):
+        """Cel·la d'equip d'un partit: link al partit amb "Ver" davant del nom"""
+        return (f'<a href="{self.match_url(match[1], language)}"><img src="{self.logo(team)}" alt="">'
+                f'Ver{html.escape(self.names[team])}</a>')
+
+    @cached_property
+    def ranking_html(self):
+        rows = []
+        for position, row in enumerate(self.standings(), 1):
+            stats = (row['pts'], row['pj'], row['g'], row['e'], row['p'], row['gf'], row['gc'], row['gf'] - row['gc'])
+            rows.append(f'<tr><td class="position">{position}</td><td class="team">{self.team_link(row["team"], "ca")}</td>'
+                        + ''.join(f'<td>{value}</td>' for value in stats) + '</tr>')
+        head = ''.join(f'<th>{h}</th>' for h in ('#', 'Equip', 'Pts', 'PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DIF'))
+        return (f'<html><body><div class="ranking"><table class="table"><thead><tr>{head}</tr></thead>'
+                f'<tbody>{"".join(rows)}</tbody></table></div></body></html>')
+
+    @cached_property
+    def calendar_html(self):
+        rounds = [[] for _ in range(self.rounds)]
+        for match in self.matches:
+            goals = match[6]
+            score = f'{goals[0]} - {goals[1]}' if goals else ''
+            rounds[match[0] - 1].append(f'<tr><td class="date">{self.when(match)}</td>'
+                                        f'<td class="home">{self.match_team(match, match[2], "ca")}</td>'
+                                        f'<td class="score">{score}</td>'
+                                        f'<td class="away">{self.match_team(match, match[3], "ca")}</td></tr>')
+        blocks = [f'<h3>Jornada {r}</h3><table class="table"><tbody>{"".join(rows)}</tbody></table>'
+                  for r, rows in enumerate(rounds, 1)]
+        return f'<html><body><div class="calendar">{"".join(blocks)}</div></body></html>'
+
+    def team_page(self, team_id, language):
+        team = self.index[team_id]
+        token = f"{int(team_id):x}{len(self.matches):x}"
+        return (f'<html><head><script>var csrf_token = "{token}";</script></head><body>'
+                f'<h1>{html.escape(self.names[team])}</h1>'
+                f'<input type="hidden" name="csrf_token" value="{token}"></body></html>')
+
+    def tab(self, team_id, tab, language):
+        """Contingut d'una pestanya de change-tab (o None si la pestanya no existeix)"""
+        team = self.index[team_id]
+        matches = self.by_team[team]
+        if tab == 'last-results':
+            rows = [f'<tr><td>{self.match_team(m, m[2], language)}</td><td class="score">{m[6][0]} - {m[6][1]}</td>'
+                    f'<td class="date">{self.when(m, with_time=False)}</td><td>{self.match_team(m, m[3], language)}</td></tr>'
+                    for m in reversed(matches) if m[6]]
+            return f'<table class="table"><tbody>{"".join(rows)}</tbody></table>'
+        if tab == 'upcoming-matches':
+            rows = [f'<tr><td>{self.match_team(m, m[2], language)}</td><td class="date">{self.when(m)}</td>'
+                    f'<td>{self.match_team(m, m[3], language)}</td></tr>'
+                    for m in sorted((m for m in matches if not m[6]), key=lambda m: (m[4], m[5]))]
+            return f'<table class="table"><tbody>{"".join(rows)}</tbody></table>'
+        if tab == 'players':
+            title = 1 if language == 'ca' else 2
+            head = f'<th title="{"Nom" if language == "ca" else "Nombre"}">Nom</th>' + ''.join(
+                f'<th><span title="{html.escape(column[title])}">{column[0]}</span></th>' for column in PLAYER_COLUMNS)
+            rows = [f'<tr><td><a href="/{language}/player/{team_id}{n:02d}">Ver</a>{html.escape(p["name"])}</td>'
+                    + ''.join(f'<td>{p[column[0]] or "-"}</td>' for column in PLAYER_COLUMNS) + '</tr>'
+                    for n, p in enumerate(self.rosters[team])]
+            return f'<table class="table"><thead><tr>{head}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+        if tab == 'stats':
+            played = [m for m in matches if m[6]]
+            scored = sum(m[6][0] if m[2] == team else m[6][1] for m in played)
+            conceded = sum(m[6][1] if m[2] == team else m[6][0] for m in played)
+            average = f"{scored / len(played):.2f}".replace('.', ',') if played else '0,00'
+            stats = (('Partits jugats', len(played)), ('Gols a favor', scored), ('Gols en contra', conceded),
+                     ('Mitjana de gols', average), ('Jugadors', PLAYERS_PER_TEAM))
+            rows = ''.join(f'<tr><td>{key}</td><td>{value}</td></tr>' for key, value in stats)
+            return f'<table class="table"><tbody>{rows}</tbody></table>'
+        return None
+
+
+# ─────────── Servidor local ───────────
+
+ROUTES = (
+    ('GET', re.compile(r'^/(?:ca|es)/tournament/\d+/ranking/'), 'ranking'),
+    ('GET', re.compile(r'^/(?:ca|es)/tournament/\d+/calendar/'), 'calendar'),
+    ('GET', re.compile(r'^/(?P<language>ca|es)/team/(?P<team_id>\d+)$'), 'team'),
+    ('POST', re.compile(r'^/(?P<language>ca|es)/ajax/team/(?P<team_id>\d+)/change-tab$'), 'tab'),
+    ('GET', re.compile(r'^/media/team/(?P<team_id>\d+)/logo\.png$'), 'logo'),
+    ('GET', re.compile(r'^/health$'), 'health'),
+)
+
+
+class ActawpStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, com la web real
+    disable_nagle_algorithm = True  # capçaleres i cos van en escriptures separades
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def route(self, method):
+        path = self.path.split('?', 1)[0]
+        for route_method, pattern, kind in ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                return self.handle_route(kind, match.groupdict())
+        self.reply(404, 'text/plain', 'Not found')
+
+    def handle_route(self, kind, params):
+        tournament = self.server.tournament
+        if kind == 'health':
+            return self.reply(200, 'application/json', json.dumps({'ok': True, 'teams': len(tournament.names)}))
+        if kind == 'ranking':
+            return self.reply(200, 'text/html', tournament.ranking_html)
+        if kind == 'calendar':
+            return self.reply(200, 'text/html', tournament.calendar_html)
+        if params['team_id'] not in tournament.index:
+            return self.reply(404, 'text/plain', 'Unknown team')
+        if kind == 'logo':
+            return self.reply(200, 'image/png', tournament.logo_png(tournament.index[params['team_id']]))
+        if kind == 'team':
+            return self.reply(200, 'text/html', tournament.team_page(params['team_id'], params['language']))
+
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        content = tournament.tab(params['team_id'], (form.get('tab') or [''])[0], params['language'])
+        if not form.get('csrf_token') or content is None:
+            return self.reply(200, 'application/json', json.dumps({'code': 1, 'content': ''}))
+        self.reply(200, 'application/json', json.dumps({'code': 0, 'content': content}))
+
+    def reply(self, status, content_type, body):
+        data = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type if isinstance(body, bytes) else f"{content_type}; charset=utf-8")
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(tournament, host='127.0.0.1', port=DEFAULT_PORT, verbose=False, background=False):
+    """Servidor de l'ACTAWP de mentida. Amb background=True corre en un fil i es retorna el servidor"""
+    server = ThreadingHTTPServer((host, port), ActawpStandIn)
+    server.daemon_threads = True
+    server.tournament = tournament
+    server.verbose = verbose
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Torneig sintètic amb la forma de l'ACTAWP")
+    arg_parser.add_argument('--teams', type=int, default=10, help="Nombre d'equips (per defecte 10)")
+    arg_parser.add_argument('--rounds', type=int, help="Nombre de jornades (per defecte, anada i tornada)")
+    arg_parser.add_argument('--played', type=int, help="Jornades jugades (per defecte, dos terços)")
+    arg_parser.add_argument('--postponed', type=float, default=0.0,
+                            help="Fracció de partits pendents ajornats una setmana")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (per defecte {DEFAULT_PORT})")
+    arg_parser.add_argument('--verbose', action='store_true', help="Mostra cada petició")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    from ultra_robust_parser import TEAMS
+    tournament = SyntheticTournament(args.teams, args.rounds, args.played, args.postponed, args.seed,
+                                     own_ids=[team['id'] for team in TEAMS.values()])
+    print(f"🏟️ {len(tournament.names)} equips, {tournament.rounds} jornades ({tournament.played} jugades), "
+          f"{len(tournament.matches)} partits")
+    print(f"🌐 http://{args.host}:{args.port} (ACTAWP_BASE=http://{args.host}:{args.port})", flush=True)
+    serve(tournament, args.host, args.port, args.verbose)
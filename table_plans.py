@@ -0,0 +1,69 @@
+"""
+Plans d'extracció de taules HTML
+- La disposició de columnes es resol UNA vegada per taula (capçalera o
+  primera fila) i queda com una llista índex → camp → conversor
+- Cada fila s'extreu amb una sola passada per les cel·les del pla, sense
+  tornar a normalitzar capçaleres ni buscar links/imatges a cada columna
+- El mateix TablePlan serveix per jugadors, estadístiques i classificació
+"""
+
+
+class TablePlan:
+    __slots__ = ('columns', 'min_cells', 'tail_start', 'tail_fields', 'tail_convert')
+
+    def __init__(self, columns, min_cells=0, tail_start=None, tail_fields=(), tail_convert=None):
+        # (índex, camp, conversor) ordenats per índex; el conversor retorna None si no hi ha valor
+        self.columns = tuple(sorted(columns, key=lambda c: c[0]))
+        self.min_cells = min_cells
+        # "Cua": a partir de tail_start, els valors vàlids s'assignen en ordre a tail_fields
+        self.tail_start = tail_start
+        self.tail_fields = tuple(tail_fields)
+        self.tail_convert = tail_convert
+
+    @property
+    def fields(self):
+        return tuple(field for _, field, _ in self.columns)
+
+    def covers(self, row):
+        """True si totes les columnes del pla han donat valor (la fila encaixa amb el pla)"""
+        return row is not None and all(field in row for _, field, _ in self.columns)
+
+    def extract(self, cells):
+        """Fila → dict de camps (None si la fila no té prou cel·les)"""
+        n = len(cells)
+        if n < self.min_cells:
+            return None
+
+        row = {}
+        for index, field, convert in self.columns:
+            if index >= n:
+                break
+            value = convert(cells[index])
+            if value is not None:
+                row[field] = value
+
+        if self.tail_fields:
+            fields = iter(self.tail_fields)
+            for cell in cells[self.tail_start:]:
+                value = self.tail_convert(cell)
+                if value is None:
+                    continue
+                field = next(fields, None)
+                if field is None:
+                    break
+                row[field] = value
+
+        return row
+
+
+class PlanCache:
+    """Plans ja compilats, per clau de disposició (p.ex. la tupla de capçaleres)"""
+
+    def __init__(self):
+        self._plans = {}
+
+    def get(self, key, compile_plan):
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = compile_plan()
+        return plan
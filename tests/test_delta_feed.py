@@ -0,0 +1,38 @@
+"""DeltaFeed (user-038): només hi ha versió nova quan canvien les dades"""
+
+import json
+
+import pytest
+
+from delta_feed import DeltaFeed, apply_patch
+
+
+def data(downloaded_at, score='9-7'):
+    return {
+        'metadata': {'team_key': 'cadet', 'downloaded_at': downloaded_at, 'parser_version': '6.3_calendar_dates'},
+        'last_results': [{'team1': 'CN TERRASSA', 'team2': 'CN SABADELL', 'score': score}],
+        'last_update': f"{downloaded_at}+01:00",
+    }
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_same_data_in_a_later_run_is_not_a_new_version():
+    assert DeltaFeed('cadet').publish(data('2026-05-30T08:00:00')) == 1
+    assert DeltaFeed('cadet').publish(data('2026-05-31T08:00:00')) is None
+    assert DeltaFeed('cadet').manifest['version'] == 1
+
+
+def test_changed_data_publishes_a_patch_from_the_previous_snapshot():
+    DeltaFeed('cadet').publish(data('2026-05-30T08:00:00'))
+    first = json.loads(open('feeds/cadet/snapshot-1.json', encoding='utf-8').read())
+    assert 'last_update' not in first and 'downloaded_at' not in first['metadata']
+
+    feed = DeltaFeed('cadet')
+    assert feed.publish(data('2026-05-31T08:00:00', score='9-8')) == 2
+    patch = json.loads(open('feeds/cadet/patch-2.json', encoding='utf-8').read())
+    assert patch == [{'op': 'replace', 'path': '/last_results/0/score', 'value': '9-8'}]
+    assert apply_patch(first, patch) == json.loads(open('feeds/cadet/snapshot-2.json', encoding='utf-8').read())
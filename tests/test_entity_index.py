@@ -0,0 +1,45 @@
+"""Índex d'entitats (user-044): el calendari parsejat en un altre fil o procés fa servir els IDs del parser principal"""
+
+import pytest
+
+import ultra_robust_parser
+from entity_index import EntityResolver
+from records import Result
+
+ROW = ('<tr><td class="date">Dis, {date} 12:50</td>'
+       '<td><a href="/ca/match/{id}">Ver{home}</a></td><td class="score">{score}</td>'
+       '<td><a href="/ca/match/{id}">Ver{away}</a></td></tr>')
+CALENDAR = ('<html><body><table><tbody>'
+            + ROW.format(date='04/10/2025', id=1, home='C.N. Sabadell Astral Pool', score='7 - 9', away='CN Terrassa')
+            + '</tbody></table></body></html>')
+
+
+@pytest.fixture
+def parsers(monkeypatch):
+    main = ultra_robust_parser.ActawpParserV58()
+    main.entities = EntityResolver()
+    worker = ultra_robust_parser.ActawpParserV58()
+    worker.entities = EntityResolver()
+    monkeypatch.setattr(ultra_robust_parser, '_worker_parser', worker)
+    return main, worker
+
+
+def test_similar_spellings_resolve_to_the_first_one_seen():
+    entities = EntityResolver()
+    first = entities.team_id('CN SABADELL ASTRALPOOL')
+    assert entities.team_id('C.N. Sabadell Astral Pool') == first
+    assert entities.team_id('CN SABADELL B') != first
+
+
+def test_calendar_dates_use_the_main_parser_ids(parsers):
+    main, worker = parsers
+    # Cada índex es queda l'ID del primer nom que veu: aquí són diferents
+    assert (main.normalize_team_for_calendar('CN SABADELL ASTRALPOOL')
+            != worker.normalize_team_for_calendar('C.N. Sabadell Astral Pool'))
+
+    calendar = ultra_robust_parser.parse_page('calendar', CALENDAR)
+    dates = main.calendar_dates_index(calendar['dates'])
+    results = main.add_dates_to_results([Result(team1='CN SABADELL ASTRALPOOL', team2='CN TERRASSA', score='7-9')],
+                                        dates)
+    assert results[0].date == '04/10/2025'
+    assert list(worker.entities.teams.aliases) == ['|C.N. Sabadell Astral Pool']  # el worker no resol noms
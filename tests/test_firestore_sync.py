@@ -0,0 +1,95 @@
+"""
+firestore_sync.py contra l'emulador local de Firestore
+(només s'executa amb FIRESTORE_EMULATOR_HOST, p. ex. amb
+firebase emulators:exec --only firestore "python -m pytest tests/test_firestore_sync.py")
+"""
+
+import os
+import uuid
+
+import pytest
+
+if not os.environ.get('FIRESTORE_EMULATOR_HOST'):
+    pytest.skip("Cal FIRESTORE_EMULATOR_HOST (emulador de Firestore)", allow_module_level=True)
+pytest.importorskip('google.cloud.firestore')
+
+import firestore_sync
+from entity_index import EntityResolver
+
+TEAM = 'cadet'
+UPCOMING = {'team1': 'CN TERRASSA', 'team2': 'CE MATARÓ', 'date': '08/11/2025', 'time': '12:00',
+            'jornada': '6', 'url': 'https://actawp.natacio.cat/ca/match/20000010'}
+RESULT = {'team1': 'CN SABADELL', 'team2': 'CN TERRASSA', 'score': '7 - 9', 'date': '04/10/2025',
+          'jornada': '2', 'url': 'https://actawp.natacio.cat/ca/match/20000001'}
+UPCOMING_PATH = f"matches/{TEAM}_2025-11-08_ce_mataro"
+RESULT_PATH = f"matches/{TEAM}_2025-10-04_cn_sabadell"
+
+
+def team_data(upcoming=(UPCOMING,), results=(RESULT,)):
+    return {
+        'metadata': {'coach': 'ENTRENADOR', 'team_id': '15600000'},
+        'ranking': [{'posicio': 1, 'equip': 'CN TERRASSA', 'punts': 3}],
+        'team_stats': {'Partits jugats': 1},
+        'players': [{'Nombre': 'PUIG SOLER, MARC', 'PJ': '1', 'GT': '3'}],
+        'upcoming_matches': list(upcoming),
+        'last_results': list(results),
+    }
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # l'estat sincronitzat (actawp_cadet_firestore.json) va al directori actual
+    return firestore_sync.client(project=f"demo-cnt-{uuid.uuid4().hex[:8]}")
+
+
+@pytest.fixture
+def entities():
+    return EntityResolver()
+
+
+def sync(db, entities, data):
+    return firestore_sync.FirestoreSync(TEAM, db).sync(firestore_sync.team_documents(TEAM, data, entities))
+
+
+def test_sync_writes_expected_paths(db, entities):
+    documents = firestore_sync.team_documents(TEAM, team_data(), entities)
+    player = f"teams/{TEAM}/players/{entities.player_id(TEAM, 'PUIG SOLER, MARC')}"
+    assert set(documents) == {f"teams/{TEAM}", player, UPCOMING_PATH, RESULT_PATH}
+
+    assert firestore_sync.FirestoreSync(TEAM, db).sync(documents) == (4, 0)
+    for path in documents:
+        assert db.document(path).get().exists, path
+    result = db.document(RESULT_PATH).get().to_dict()
+    assert (result['estat'], result['scoreCNT'], result['scoreRival']) == ('finished', 9, 7)
+
+
+def test_unchanged_sync_writes_nothing(db, entities):
+    sync(db, entities, team_data())
+    before = db.document(f"teams/{TEAM}").get().update_time
+
+    assert sync(db, entities, team_data()) == (0, 0)
+    assert db.document(f"teams/{TEAM}").get().update_time == before
+
+
+def test_finished_match_is_kept_when_it_disappears(db, entities):
+    sync(db, entities, team_data())
+    sync(db, entities, team_data(results=()))
+    assert db.document(RESULT_PATH).get().exists
+
+
+def test_postponed_match_is_deleted(db, entities):
+    sync(db, entities, team_data())
+    sync(db, entities, team_data(upcoming=()))
+    assert not db.document(UPCOMING_PATH).get().exists
+
+
+def test_match_in_entry_app_is_not_deleted(db, entities):
+    sync(db, entities, team_data())
+    # L'app d'entrada obre el partit amb el mateix id (newMatch) i hi penja accions
+    ref = db.document(UPCOMING_PATH)
+    ref.update({'estat': 'live'})
+    ref.collection('actions').document('a1').set({'type': 'goal'})
+
+    sync(db, entities, team_data(upcoming=()))
+    assert ref.get().exists
+    assert ref.collection('actions').document('a1').get().exists
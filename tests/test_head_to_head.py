@@ -0,0 +1,38 @@
+"""HeadToHeadIndex (user-035): cada partit es compta una sola vegada"""
+
+import pytest
+
+from head_to_head import HeadToHeadIndex
+from records import Result
+
+WITH_URL = Result(team1='CN TERRASSA', team2='CN SABADELL', score='9 - 7', date='04/10/2025',
+                  url='https://actawp.natacio.cat/ca/match/20000001')
+# El mateix partit des d'una pestanya on l'enllaç no és /match/: ID de reserva (equips + data)
+WITHOUT_URL = Result(team1='CN Terrassa', team2='CN Sabadell', score='9 - 7', date='04/10/2025',
+                     url='https://actawp.natacio.cat/ca/team/15600000')
+LATER = Result(team1='CN SABADELL', team2='CN TERRASSA', score='10 - 6', date='11/01/2026',
+               url='https://actawp.natacio.cat/ca/match/20000050')
+
+
+@pytest.mark.parametrize('batches', [
+    [[WITH_URL, WITHOUT_URL]],   # tots dos en la mateixa llista
+    [[WITH_URL], [WITHOUT_URL]],  # primer amb URL
+    [[WITHOUT_URL], [WITH_URL]],  # primer sense URL
+])
+def test_url_and_fallback_ids_are_the_same_game(batches, tmp_path):
+    path = tmp_path / 'h2h.json'
+    for batch in batches:
+        index = HeadToHeadIndex.load(path)
+        index.add_results(batch)
+        index.save(path)
+    summary = HeadToHeadIndex.load(path).summary('CN TERRASSA', 'CN SABADELL')
+    assert (summary['played'], summary['wins'], summary['goals_for'], summary['goals_against']) == (1, 1, 9, 7)
+    assert summary['matches'][0]['url'] == WITH_URL.url
+
+
+def test_different_games_between_the_same_teams_both_count():
+    index = HeadToHeadIndex()
+    assert index.add_results([WITH_URL, LATER, WITHOUT_URL]) == 2
+    summary = index.summary('CN Terrassa', 'CN Sabadell')
+    assert (summary['played'], summary['wins'], summary['losses']) == (2, 1, 1)
+    assert [m['date'] for m in summary['matches']] == ['11/01/2026', '04/10/2025']
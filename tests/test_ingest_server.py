@@ -0,0 +1,51 @@
+"""Webhook d'entrada de resultats (user-043): un rival sense partit programat no crea equips fantasma"""
+
+import json
+
+import pytest
+
+import ingest_server
+from entity_index import EntityResolver
+from records import Result
+from standings import StandingsEngine, standings_file
+
+PLAYED = Result(team1='CN TERRASSA', team2='CN SABADELL', score='9 - 7', date='04/10/2025',
+                url='https://actawp.natacio.cat/ca/match/20000001')
+# El partit que arriba pel webhook, tal com el baixarà després el parser del calendari
+LLEIDA = Result(team1='CE LLEIDA', team2='CN TERRASSA', score='8 - 10', date='31/05/2026',
+                url='https://actawp.natacio.cat/ca/match/20000090')
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ingest_server, 'regenerate', lambda: None)
+    ranking = [{'posicio': str(i), 'equip': name, 'punts': 0, 'partits': 0}
+               for i, name in enumerate(('CN TERRASSA', 'CN SABADELL', 'CE LLEIDA'), 1)]
+    data = {'metadata': {'team_name': 'CN Terrassa Cadet'}, 'ranking': ranking,
+            'last_results': [PLAYED.to_dict()], 'upcoming_matches': [], 'rivals_form': {}}
+    with open(ingest_server.data_file('cadet'), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    engine = StandingsEngine()
+    engine.add_results([PLAYED])
+    engine.save(standings_file('cadet'))
+    return tmp_path
+
+
+def test_rival_without_a_scheduled_match(workdir):
+    entry = ingest_server.validate({'team': 'cadet', 'rival': 'C.E. Lleida', 'date': '2026-05-31',
+                                    'our_score': 10, 'rival_score': 8, 'location': 'away'})
+    summary, previous = ingest_server.ingest(entry)
+    assert summary['status'] == 'updated' and previous is not None
+
+    with open(ingest_server.data_file('cadet'), encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['last_results'][0]['team2'] == 'CN TERRASSA'
+    rows = {row['equip']: row for row in data['ranking']}
+    assert sorted(rows) == ['CE LLEIDA', 'CN SABADELL', 'CN TERRASSA']
+    assert (rows['CN TERRASSA']['partits'], rows['CN TERRASSA']['punts']) == (2, 6)
+
+    # La propera execució del parser baixa el mateix partit del calendari, amb l'URL
+    engine = StandingsEngine.load(standings_file('cadet'), EntityResolver.load().team_id)
+    assert engine.add_results([PLAYED, LLEIDA]) == 0
+    assert len(engine.applied) == 2
@@ -0,0 +1,77 @@
+"""EloRatings (user-034): cada partit es compta una sola vegada"""
+
+import pytest
+
+from ratings import INITIAL_RATING, EloRatings
+from records import Result
+
+WITH_URL = Result(team1='CN TERRASSA', team2='CN SABADELL', score='9 - 7', date='04/10/2025',
+                  url='https://actawp.natacio.cat/ca/match/20000001')
+# El mateix partit des d'una pestanya on l'enllaç no és /match/: ID de reserva (equips + data)
+WITHOUT_URL = Result(team1='CN Terrassa', team2='CN Sabadell', score='9 - 7', date='04/10/2025',
+                     url='https://actawp.natacio.cat/ca/team/15600000')
+LATER = Result(team1='CN SABADELL', team2='CN TERRASSA', score='10 - 6', date='11/01/2026',
+               url='https://actawp.natacio.cat/ca/match/20000050')
+
+
+def applied_once():
+    engine = EloRatings()
+    engine.add_results([WITH_URL])
+    return engine.ratings.copy()
+
+
+def test_new_result_moves_both_teams_by_the_same_amount():
+    engine = EloRatings()
+    assert engine.add_results([WITH_URL]) == 1
+    gain = engine.ratings['TERRASSA'] - INITIAL_RATING
+    assert gain > 0
+    assert engine.ratings['SABADELL'] == pytest.approx(INITIAL_RATING - gain)
+
+
+def test_same_result_twice_is_applied_once():
+    engine = EloRatings()
+    engine.add_results([WITH_URL, WITH_URL])
+    assert engine.add_results([WITH_URL]) == 0
+    assert engine.ratings == applied_once()
+
+
+@pytest.mark.parametrize('batches', [
+    [[WITH_URL, WITHOUT_URL]],   # tots dos en la mateixa llista
+    [[WITH_URL], [WITHOUT_URL]],  # primer amb URL
+    [[WITHOUT_URL], [WITH_URL]],  # primer sense URL
+])
+def test_url_and_fallback_ids_are_the_same_game(batches):
+    engine = EloRatings()
+    for batch in batches:
+        engine.add_results(batch)
+    assert engine.ratings == applied_once()
+    assert len(engine.applied) == 1
+    assert engine.form_delta('CN TERRASSA', [WITHOUT_URL]) == engine.form_delta('CN TERRASSA', [WITH_URL]) > 0
+
+
+def test_fallback_duplicate_is_ignored_after_reloading(tmp_path):
+    path = tmp_path / 'ratings.json'
+    engine = EloRatings()
+    engine.add_results([WITHOUT_URL])
+    engine.save(path)
+
+    engine = EloRatings.load(path)
+    assert engine.add_results([WITH_URL, WITHOUT_URL]) == 0
+    assert engine.ratings == applied_once()
+
+
+def test_different_games_between_the_same_teams_both_count():
+    engine = EloRatings()
+    assert engine.add_results([WITH_URL, LATER]) == 2
+    assert len(engine.applied) == 2
+
+
+def test_corrected_score_replaces_the_previous_change():
+    engine = EloRatings()
+    engine.add_results([WITH_URL])
+    corrected = Result.from_dict(dict(WITH_URL.to_dict(), score='7 - 9'))
+    assert engine.add_results([corrected]) == 1
+
+    fresh = EloRatings()
+    fresh.add_results([corrected])
+    assert engine.ratings == pytest.approx(fresh.ratings)
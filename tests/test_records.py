@@ -0,0 +1,64 @@
+"""match_id dels registres i detecció de resultats nous de notify_changes (user-030)"""
+
+import json
+
+import pytest
+
+import notify_changes
+from records import Match, Result
+
+SABADELL = {'team1': 'CN SABADELL', 'team2': 'CN TERRASSA', 'score': '7 - 9', 'date': '04/10/2025',
+            'jornada': '2', 'url': 'https://actawp.natacio.cat/ca/match/20000001'}
+MATARO = {'team1': 'CN TERRASSA', 'team2': 'CE MATARÓ', 'score': '8 - 8', 'date': '11/10/2025',
+          'jornada': '3', 'url': 'https://actawp.natacio.cat/ca/match/20000002'}
+RUBI = {'team1': 'CNAB RUBÍ', 'team2': 'CN TERRASSA', 'score': '5 - 11', 'date': '18/10/2025',
+        'jornada': '4', 'url': None}
+
+
+def test_match_id_comes_from_the_match_url():
+    assert Result.from_dict(SABADELL).match_id == '20000001'
+    assert Match.from_dict(dict(SABADELL, url='https://actawp.natacio.cat/es/match/42?tab=1')).match_id == '42'
+
+
+def test_result_without_match_url_falls_back_to_teams_and_date():
+    result = Result.from_dict(dict(RUBI, team1='Cnab Rubí'))
+    assert result.match_id == 'CNAB RUBÍ|CN TERRASSA|18/10/2025'
+    # El mateix partit un altre dia és un altre partit
+    assert Result.from_dict(dict(RUBI, date='25/10/2025')).match_id != result.match_id
+
+
+def test_match_without_url_falls_back_to_teams():
+    assert Match.from_dict({'team1': 'CN TERRASSA', 'team2': 'CE MATARÓ'}).match_id == 'CN TERRASSA|CE MATARÓ'
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+    monkeypatch.setattr(notify_changes, 'send_notification',
+                        lambda title, message, url=None: messages.append((title, message)) or True)
+    return messages
+
+
+def check(tmp_path, old_results, new_results):
+    paths = []
+    for name, results in (('old', old_results), ('new', new_results)):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps({'upcoming_matches': [], 'last_results': results}), encoding='utf-8')
+        paths.append(str(path))
+    notify_changes.check_team_changes('CADET', *paths)
+
+
+def test_new_result_is_notified_once(tmp_path, sent):
+    check(tmp_path, [SABADELL], [MATARO, SABADELL])
+    assert sent == [('CN Terrassa CADET - Empat', '🤝 J3: CN TERRASSA 8 - 8 CE MATARÓ')]
+
+
+def test_new_result_is_found_when_the_list_keeps_its_length(tmp_path, sent):
+    # La web només ensenya els últims N: entra un resultat i en surt un altre
+    check(tmp_path, [MATARO, SABADELL], [RUBI, MATARO])
+    assert sent == [('CN Terrassa CADET - Victòria!', '🎉 J4: CNAB RUBÍ 5 - 11 CN TERRASSA')]
+
+
+def test_reordered_results_are_not_new(tmp_path, sent):
+    check(tmp_path, [SABADELL, MATARO, RUBI], [RUBI, SABADELL, MATARO])
+    assert sent == []
@@ -0,0 +1,106 @@
+"""
+StandingsEngine (user-032)
+- Ordenació: els desempats entre els empatats van abans que la diferència general
+- Un partit que arriba amb l'ID de l'URL i amb el de reserva es compta una vegada
+- El calendari només llegeix el marcador fora dels noms dels equips
+"""
+
+import pytest
+
+import ultra_robust_parser
+from records import Result
+from standings import StandingsEngine
+
+WITH_URL = Result(team1='CN TERRASSA', team2='CN SABADELL', score='9 - 7', date='04/10/2025',
+                  url='https://actawp.natacio.cat/ca/match/20000001')
+# El mateix partit des d'una pestanya on l'enllaç no és /match/: ID de reserva (equips + data)
+WITHOUT_URL = Result(team1='CN Terrassa', team2='CN Sabadell', score='9 - 7', date='04/10/2025',
+                     url='https://actawp.natacio.cat/ca/team/15600000')
+
+
+def order(engine):
+    return [row.equip for row in engine.table()]
+
+
+def engine_with(*games):
+    engine = StandingsEngine()
+    for match_id, (team1, team2, goals1, goals2) in enumerate(games):
+        engine.add_result(str(match_id), team1, team2, goals1, goals2)
+    return engine
+
+
+def test_two_way_tie_goes_to_the_head_to_head_winner():
+    engine = engine_with(
+        ('CN A', 'CN C', 20, 0),
+        ('CN B', 'CN A', 5, 4),
+        ('CN B', 'CN D', 0, 1),
+        ('CN C', 'CN D', 0, 2),
+    )
+    # A i B a 3 punts; A té molta més diferència general, però B va guanyar el directe
+    assert order(engine) == ['CN D', 'CN B', 'CN A', 'CN C']
+
+
+def test_three_way_tie_uses_goal_difference_among_the_tied_teams():
+    engine = engine_with(
+        ('CN A', 'CN B', 3, 2),
+        ('CN B', 'CN C', 10, 2),
+        ('CN C', 'CN A', 4, 3),
+        ('CN A', 'CN D', 30, 0),
+        ('CN B', 'CN D', 1, 0),
+        ('CN C', 'CN D', 1, 0),
+    )
+    # A, B i C a 6 punts i 3 punts cadascun entre ells: mana la diferència entre ells (B +7, A 0, C -7)
+    assert order(engine) == ['CN B', 'CN A', 'CN C', 'CN D']
+
+
+def test_level_teams_fall_back_to_overall_goals():
+    engine = engine_with(
+        ('CN A', 'CN B', 5, 5),
+        ('CN A', 'CN C', 9, 1),
+        ('CN B', 'CN C', 3, 1),
+    )
+    assert order(engine) == ['CN A', 'CN B', 'CN C']
+
+
+def test_corrected_score_is_undone_before_reapplying():
+    engine = engine_with(('CN A', 'CN B', 5, 4))
+    assert engine.add_result('0', 'CN A', 'CN B', 4, 5)
+    assert not engine.add_result('0', 'CN A', 'CN B', 4, 5)
+    rows = {row.equip: row for row in engine.table()}
+    assert order(engine) == ['CN B', 'CN A']
+    assert (rows['CN A'].punts, rows['CN A'].partits, rows['CN A'].guanyats) == (0, 1, 0)
+    assert (rows['CN B'].punts, rows['CN B'].gols_favor, rows['CN B'].gols_contra) == (3, 5, 4)
+
+
+@pytest.mark.parametrize('batches', [
+    [[WITH_URL, WITHOUT_URL]],   # tots dos en la mateixa llista
+    [[WITH_URL], [WITHOUT_URL]],  # primer amb URL
+    [[WITHOUT_URL], [WITH_URL]],  # primer sense URL
+])
+def test_url_and_fallback_ids_are_the_same_game(batches, tmp_path):
+    path = tmp_path / 'standings.json'
+    for batch in batches:
+        engine = StandingsEngine.load(path)
+        engine.add_results(batch)
+        engine.save(path)
+    rows = {row.equip.upper(): row for row in StandingsEngine.load(path).table()}
+    assert (rows['CN TERRASSA'].partits, rows['CN TERRASSA'].punts) == (1, 3)
+    assert (rows['CN SABADELL'].partits, rows['CN SABADELL'].gols_favor) == (1, 7)
+    assert list(engine.applied) == ['20000001']
+
+
+CALENDAR_ROW = (
+    '<tr><td class="date">Dis, {date} 12:50</td>'
+    '<td><a href="/ca/match/{id}"><img src="/media/team/1/logo.png" alt="">Ver{home}</a></td>'
+    '<td class="score">{score}</td>'
+    '<td><a href="/ca/match/{id}"><img src="/media/team/2/logo.png" alt="">Ver{away}</a></td></tr>'
+)
+
+
+def test_calendar_reads_the_score_outside_the_team_names():
+    rows = (CALENDAR_ROW.format(date='04/10/2025', id=1, home='CN TERRASSA', score='9 - 7', away='CN SABADELL 20-21')
+            + CALENDAR_ROW.format(date='11/10/2025', id=2, home='CN SABADELL 20-21', score='', away='CE MATARÓ'))
+    calendar = ultra_robust_parser.ActawpParserV58().parse_calendar_page(
+        f'<html><body><table><tbody>{rows}</tbody></table></body></html>')
+    assert [(r.team2, r.score) for r in calendar['results']] == [('CN SABADELL 20-21', '9-7')]
+    assert [(m.team1, m.team2) for m in calendar['fixtures']] == [('CN SABADELL 20-21', 'CE MATARÓ')]
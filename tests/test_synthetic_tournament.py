@@ -0,0 +1,37 @@
+"""Torneig sintètic (user-046): la classificació i els logos que serveix són els que el parser ha de reproduir"""
+
+import os
+
+import pytest
+
+import ultra_robust_parser
+from logos import LogoStore
+from records import Result, as_records
+from standings import StandingsEngine
+from synthetic_tournament import SyntheticTournament, serve
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_ranking_uses_the_standings_engine_tiebreaks(seed):
+    tournament = SyntheticTournament(10, seed=seed)
+    engine = StandingsEngine()
+    engine.add_results(as_records(tournament.actawp_data()['last_results'], Result))
+    ranking = ultra_robust_parser.ActawpParserV58().parse_ranking_html(tournament.ranking_html)
+    assert len(ranking) == 10
+    assert engine.compare(ranking) == []
+
+
+def test_logos_are_served_and_mirrored(tmp_path, monkeypatch):
+    pytest.importorskip('requests')
+    monkeypatch.chdir(tmp_path)
+    tournament = SyntheticTournament(4)
+    server = serve(tournament, port=0, background=True)
+    try:
+        store = LogoStore(base_url=f"http://127.0.0.1:{server.server_address[1]}/ca/tournament/1/ranking/1")
+        assert store.fetch([tournament.logo(team) for team in range(4)]) == 4
+        assert not store.failed
+        files = {store.local(tournament.logo(team)) for team in range(4)}
+        assert len(files) == 4 and all(os.path.exists(path) for path in files)
+    finally:
+        server.shutdown()
+        server.server_close()
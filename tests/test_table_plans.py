@@ -0,0 +1,47 @@
+"""
+Els TablePlan (user-031) donen el mateix que l'extracció fila a fila d'abans
+- tests/fixtures/*.html: pestanyes de jugadors (ca, es i amb menys
+  columnes), estadístiques i classificació (amb i sense enllaços/logos),
+  generades amb synthetic_tournament.py
+- table_plans_expected.json: el que en treia el parser anterior als plans
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import ultra_robust_parser
+from records import encode
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+EXPECTED = json.loads((FIXTURES / 'table_plans_expected.json').read_text(encoding='utf-8'))
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text(encoding='utf-8')
+
+
+def plain(value):
+    return json.loads(json.dumps(value, default=encode))
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return ultra_robust_parser.ActawpParserV58()
+
+
+@pytest.mark.parametrize('name', ['players_ca', 'players_es', 'players_short'])
+def test_players_match_previous_extraction(parser, name):
+    assert plain(parser.parse_players(fixture(f"{name}.html"))) == EXPECTED[name]
+
+
+@pytest.mark.parametrize('name', ['ranking', 'ranking_plain'])
+def test_ranking_matches_previous_extraction(parser, name):
+    assert plain(parser.parse_ranking_html(fixture(f"{name}.html"))) == EXPECTED[name]
+
+
+def test_team_stats_match_previous_extraction(parser):
+    stats = parser.team_stats_from_tab({'code': 0, 'content': fixture('stats.html')})
+    assert plain(stats) == EXPECTED['stats']
+
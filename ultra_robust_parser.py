@@ -10,19 +10,233 @@ Parser ACTAWP v6.3 - DATES DEL CALENDARI
 - NOVITAT v6.1: 5 jugadors amb exclusions, penals i mitjana gols/partit
 """
 
-import requests
+import argparse
 import json
 import os
-from bs4 import BeautifulSoup
 import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial, wraps
+
+from run_journal import RunJournal, DEFAULT_RESUME_WINDOW
+from delta_feed import DeltaFeed
+from entity_index import EntityResolver
+from fetch_pipeline import FetchParsePipeline
+from records import Match, Result, PlayerLine, RankingRow, RivalForm, as_records, encode, canonical_team
+from logos import LogoStore, LOGOS_DIR
+from memory_budget import RivalSpool, StageProfiler, write_json
+from head_to_head import HeadToHeadIndex, OWN_TEAM, h2h_file, shard_path
+from ratings import EloRatings, ratings_file
+from standings import StandingsEngine, standings_file
+from scrape_scheduler import ScrapeScheduler, PRIORITY_OWN, PRIORITY_RANKING, PRIORITY_TEAM, PRIORITY_RIVALS
+from table_plans import TablePlan, PlanCache
+
+# Seccions que es poden refrescar per separat (--only)
+SECTIONS = ('calendar', 'players', 'stats', 'fixtures', 'results', 'ranking', 'rivals')
+
+# Seccions que necessiten el calendari (dates dels resultats, resultats de la fase per la classificació)
+SECTION_DEPENDENCIES = {
+    'results': ('calendar',),
+    'ranking': ('calendar',),
+    'rivals': ('calendar',),
+}
+
+# Cada quantes hores es descarrega la classificació de la web per validar la calculada
+RANKING_VALIDATION_HOURS = 24
+
+# Capçaleres de l'ACTAWP (ca/es) → camps curts que espera l'index.html
+FIELD_MAPPING = {
+    'Nom': 'Nombre',
+    'Partits jugats': 'PJ',
+    'Total goals': 'GT',
+    'Gols': 'G',
+    'Gols penal': 'GP',
+    'Gols en tanda de penals': 'G5P',
+    'Targetes grogues': 'TA',
+    'Targetes vermelles': 'TR',
+    'Expulsions per 20 segons': 'EX',
+    'Expulsions definitives, amb substitució disciplinària': 'ED',
+    'Expulsions definitives per brutalitat, amb substitució als 4 minuts': 'EB',
+    'Expulsions definitives, amb substitució no disciplinària': 'EN',
+    'Expulsions i penal': 'EP',
+    'Faltes per penal': 'P',
+    'Penals fallats': 'PF',
+    'Altres': 'O',
+    'Temps morts': 'TM',
+    'Joc net': 'JL',
+    'Vinculat': 'Vinculado',
+    'Nombre': 'Nombre',
+    'Partidos jugados': 'PJ',
+    'Goles totales': 'GT',
+    'Goles': 'G',
+    'Goles de penalti': 'GP',
+    'Goles en tanda de penaltis': 'G5P',
+    'Tarjetas amarillas': 'TA',
+    'Tarjetas rojas': 'TR',
+    'Expulsiones por 20 segundos': 'EX',
+    'Expulsiones definitivas, con sustitución disciplinaria': 'ED',
+    'Expulsiones definitivas por brutalidad, con sustitución a los 4 minutos': 'EB',
+    'Expulsiones definitivas, con sustitución no disciplinaria': 'EN',
+    'Expulsiones y penalti': 'EP',
+    'Faltas por penalti': 'P',
+    'Penaltis fallados': 'PF',
+    'Otros': 'O',
+    'Tiempos muertos': 'TM',
+    'Juego limpio': 'JL',
+    'Vinculado': 'Vinculado',
+    'MVP': 'MVP'
+}
+
+
+# Valors de cel·la que vol dir "sense dada"
+EMPTY_VALUES = ('', '-', '—', 'N/A')
+
+# Ordre de les columnes numèriques de la classificació: PTS | PJ | V | E | D | GF | GC | DIF
+RANKING_STAT_FIELDS = ('punts', 'partits', 'guanyats', 'empatats', 'perduts', 'gols_favor', 'gols_contra', 'diferencia')
+
+# Tipus de registre de cada secció (records.py)
+SECTION_RECORDS = {
+    'players': PlayerLine,
+    'fixtures': Match,
+    'results': Result,
+    'ranking': RankingRow,
+}
+
+# Temps màxim d'una petició HTTP (segons)
+REQUEST_TIMEOUT = 30
+
+# Web de l'ACTAWP (ACTAWP_BASE la canvia, p. ex. pel servidor de synthetic_tournament.py)
+ACTAWP_BASE = os.environ.get('ACTAWP_BASE', 'https://actawp.natacio.cat').rstrip('/')
+
+# Clau del JSON on es guarda cada secció
+SECTION_KEYS = {
+    'players': 'players',
+    'stats': 'team_stats',
+    'fixtures': 'upcoming_matches',
+    'results': 'last_results',
+    'ranking': 'ranking',
+    'rivals': 'rivals_form',
+}
+
+TEAMS = {
+    'juvenil': {
+        'id': '15621223',
+        'name': 'CN Terrassa Juvenil',
+        'coach': 'Jordi Busquets',
+        'language': 'es',
+        'ranking_url': f'{ACTAWP_BASE}/ca/tournament/1317471/ranking/3669887',
+        'calendar_url': f'{ACTAWP_BASE}/ca/tournament/1317471/calendar/3669887/all'
+    },
+    'cadet': {
+        'id': '15621224',
+        'name': 'CN Terrassa Cadet',
+        'coach': 'Didac Cobacho',
+        'language': 'ca',
+        'ranking_url': f'{ACTAWP_BASE}/ca/tournament/1317474/ranking/3669890',
+        'calendar_url': f'{ACTAWP_BASE}/ca/tournament/1317474/calendar/3669890/all'
+    }
+}
+
+
+# Mode de memòria acotada (--memory-bounded): els arbres de BeautifulSoup es
+# buiden en acabar cada parseig i la forma dels rivals va a disc (RivalSpool).
+# És de mòdul perquè parse_page (pool de processos) també l'ha de veure
+MEMORY_BOUNDED = False
+
+# BeautifulSoup creats dins del parseig en curs, per fil (None = fora de releasing_soups)
+_soup_scope = threading.local()
+
+
+def make_soup(html):
+    """Crea el BeautifulSoup. bs4 s'importa aquí perquè només el paguin les seccions que parsegen HTML"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    created = getattr(_soup_scope, 'created', None)
+    if created is not None:
+        created.append(soup)
+    return soup
+
+
+@contextmanager
+def releasing_soups():
+    """Amb MEMORY_BOUNDED, buida (decompose) els soups creats dins del bloc en sortir
+    
+    Un arbre de BeautifulSoup té referències circulars (pare ↔ fills): sense
+    decompose() no s'allibera fins que passa el recol·lector de cicles. Els
+    valors extrets són str i int, no en depenen.
+    """
+    if not MEMORY_BOUNDED or getattr(_soup_scope, 'created', None) is not None:
+        yield  # mode normal, o ja dins d'un altre parseig (l'exterior allibera)
+        return
+    _soup_scope.created = []
+    try:
+        yield
+    finally:
+        for soup in _soup_scope.created:
+            # decompose() de l'arrel no recorre l'arbre (bs4 4.13+): es buida fill a fill
+            for child in list(soup.contents):
+                child.decompose()
+            soup.decompose()
+        _soup_scope.created = None
+
+
+def releases_soups(method):
+    """Decorador: el parseig allibera els seus soups en acabar (releasing_soups)"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with releasing_soups():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def resolve_sections(requested):
+    """Afegeix les dependències de les seccions demanades i les retorna en ordre d'execució"""
+    wanted = set(requested)
+    for section in requested:
+        wanted.update(SECTION_DEPENDENCIES.get(section, ()))
+    return [s for s in SECTIONS if s in wanted]
+
+
+def load_team_data(team_key):
+    """Carrega l'últim actawp_{team}_data.json (o {} si no existeix)"""
+    filename = f"actawp_{team_key}_data.json"
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️ No s'ha pogut llegir {filename}: {e}")
+        return {}
+
 
 class ActawpParserV58:
     
     def __init__(self):
-        self.session = requests.Session()
+        self._local = threading.local()  # una sessió HTTP per fil del pipeline
+        self.deadline = None  # time.monotonic() límit de l'execució (--budget)
+        self.validate_ranking = False  # forçar la descàrrega de la classificació (--validate-ranking)
+        self.plans = PlanCache()  # plans d'extracció de taules ja compilats
         self.jornada_corrections = self.load_jornada_corrections()
         self.calendar_dates = {}  # 🆕 v6.3 - Dates del calendari
+        self.entities = EntityResolver.load()  # noms d'equip → ID estable
+    
+    @property
+    def session(self):
+        """Sessió HTTP del fil actual, creada a la primera petició (requests no es carrega si no cal)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+        return session
+    
+    def request_timeout(self):
+        """Timeout de cada petició, retallat al temps que queda del pressupost"""
+        if self.deadline is None:
+            return REQUEST_TIMEOUT
+        return max(1, min(REQUEST_TIMEOUT, self.deadline - time.monotonic()))
     
     def load_jornada_corrections(self):
         """Carrega correccions manuals de jornades"""
@@ -49,23 +263,64 @@ class ActawpParserV58:
         return name.strip()
     
     def normalize_team_for_calendar(self, name):
-        """🆕 v6.3 - Normalitza nom d'equip per comparar amb calendari"""
-        if not name:
-            return ''
-        return name.upper().replace('C.N.', '').replace('C.E.', '').replace('U.E.', '').replace('CN ', '').replace('CE ', '').replace('UE ', '').strip()
+        """🆕 v6.3 - Normalitza nom d'equip per comparar amb calendari (ID de l'índex d'entitats)"""
+        return self.entities.team_id(name)
+    
+    def fetch_page(self, url):
+        """GET d'una pàgina sencera (calendari, classificació). Retorna l'HTML o None"""
+        response = self.session.get(url, timeout=self.request_timeout())
+        
+        if response.status_code != 200:
+            print(f"  ❌ Error HTTP: {response.status_code}")
+            return None
+        
+        return response.text
     
     def parse_calendar(self, calendar_url):
         """🆕 v6.3 - Parseja el calendari per obtenir dates de tots els partits de la 3a fase"""
         try:
             print(f"  📅 Obtenint calendari de: {calendar_url}")
-            response = self.session.get(calendar_url)
-            
-            if response.status_code != 200:
-                print(f"  ❌ Error HTTP: {response.status_code}")
+            html = self.fetch_page(calendar_url)
+            if html is None:
                 return {}
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            matches_dates = {}
+            return self.parse_calendar_html(html)
+        except Exception as e:
+            print(f"  ⚠️ Error parsejant calendari: {e}")
+            return {}
+    
+    def parse_calendar_html(self, html):
+        """Dates dels partits a partir de l'HTML del calendari"""
+        return self.calendar_dates_index(self.parse_calendar_page(html)['dates'])
+    
+    def calendar_dates_index(self, dates):
+        """{"ID1|ID2": data} (en les dues direccions) a partir dels noms tal com surten al calendari
+        
+        Els noms es resolen aquí, amb l'índex d'entitats del parser principal:
+        parse_calendar_page pot córrer en un altre fil o procés.
+        """
+        matches_dates = {}
+        for team1, team2, date in dates:
+            n1 = self.normalize_team_for_calendar(team1)
+            n2 = self.normalize_team_for_calendar(team2)
+            matches_dates[f"{n1}|{n2}"] = date
+            matches_dates[f"{n2}|{n1}"] = date
+        return matches_dates
+    
+    @releases_soups
+    def parse_calendar_page(self, html):
+        """Calendari sencer: dates de tots els partits i resultats dels ja jugats
+        
+        Els resultats (tota la fase, no només els nostres) alimenten el motor
+        de classificació (standings.py) i els partits pendents la projecció
+        de final de fase (projection.py). Les dates es retornen amb els noms
+        tal com surten, [equip1, equip2, data]: calendar_dates_index les
+        indexa amb els IDs d'equip.
+        """
+        try:
+            soup = make_soup(html)
+            matches_dates = []
+            played = []
+            pending = []
             
             # Buscar totes les taules de partits
             tables = soup.find_all('table')
@@ -77,15 +332,19 @@ class ActawpParserV58:
                         # Buscar els noms dels equips (estan en links amb /match/)
                         links = row.find_all('a', href=True)
                         teams_found = []
+                        team_links = []
+                        match_url = ''
                         
                         for link in links:
                             href = link.get('href', '')
                             if '/match/' in href:
+                                match_url = match_url or (href if href.startswith('http') else ACTAWP_BASE + href)
                                 # Buscar el text de l'equip
                                 text = link.get_text(strip=True)
                                 text = self.clean_team_name(text)
                                 if text and len(text) > 3:
                                     teams_found.append(text)
+                                    team_links.append(link)
                         
                         if len(teams_found) >= 2:
                             team1 = teams_found[0]
@@ -96,31 +355,54 @@ class ActawpParserV58:
                             date_match = re.search(r'(\d{2}/\d{2}/\d{4})', row_text)
                             
                             if date_match:
-                                date = date_match.group(1)
-                                
-                                # Normalitzar noms per crear clau
-                                n1 = self.normalize_team_for_calendar(team1)
-                                n2 = self.normalize_team_for_calendar(team2)
-                                
-                                # Guardar amb ambdues direccions
-                                key1 = f"{n1}|{n2}"
-                                key2 = f"{n2}|{n1}"
-                                matches_dates[key1] = date
-                                matches_dates[key2] = date
+                                matches_dates.append([team1, team2, date_match.group(1)])
+                            
+                            # Partit jugat: marcador entre els dos equips
+                            score_match = self.calendar_score(row, team_links)
+                            if score_match:
+                                played.append(Result(
+                                    team1=team1,
+                                    team2=team2,
+                                    team1_logo='',
+                                    team2_logo='',
+                                    score=f"{score_match.group(1)}-{score_match.group(2)}",
+                                    date=date_match.group(1) if date_match else '',
+                                    url=match_url
+                                ))
+                            else:
+                                pending.append(Match(
+                                    team1=team1,
+                                    team2=team2,
+                                    date=date_match.group(1) if date_match else '',
+                                    url=match_url
+                                ))
                                 
                     except Exception as e:
                         continue
             
-            print(f"  ✅ {len(matches_dates)//2} partits amb dates trobats")
-            return matches_dates
+            print(f"  ✅ {len(matches_dates)} partits amb dates trobats, {len(played)} jugats")
+            return {'dates': matches_dates, 'results': played, 'fixtures': pending}
             
         except Exception as e:
             print(f"  ⚠️ Error parsejant calendari: {e}")
-            return {}
+            return {'dates': [], 'results': [], 'fixtures': []}
+    
+    def calendar_score(self, row, team_links):
+        """Marcador d'una fila del calendari, buscat només fora dels enllaços dels equips
+        
+        Un nom d'equip amb xifres ("CN Sabadell 20-21") no s'ha de llegir com
+        a marcador d'un partit pendent.
+        """
+        text = row.get_text(' ')
+        for link in team_links:
+            text = text.replace(link.get_text(' '), ' ', 1)
+        return re.search(r'(\d+)\s*[-–]\s*(\d+)', text)
     
-    def add_dates_to_results(self, results):
+    def add_dates_to_results(self, results, calendar_dates=None):
         """🆕 v6.3 - Afegeix dates del calendari als resultats"""
-        if not self.calendar_dates or not results:
+        if calendar_dates is None:
+            calendar_dates = self.calendar_dates
+        if not calendar_dates or not results:
             return results
         
         for r in results:
@@ -128,21 +410,22 @@ class ActawpParserV58:
             t2 = self.normalize_team_for_calendar(r.get('team2', ''))
             key = f"{t1}|{t2}"
             
-            if key in self.calendar_dates:
-                r['date'] = self.calendar_dates[key]
+            if key in calendar_dates:
+                r['date'] = calendar_dates[key]
         
         return results
     
+    @releases_soups
     def get_csrf_token(self, team_id, language='es'):
         """Obté el token CSRF"""
-        url = f"https://actawp.natacio.cat/{language}/team/{team_id}"
-        response = self.session.get(url)
+        url = f"{ACTAWP_BASE}/{language}/team/{team_id}"
+        response = self.session.get(url, timeout=self.request_timeout())
         
         match = re.search(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']', response.text)
         if match:
             return match.group(1)
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         csrf_input = soup.find('input', {'name': 'csrf_token'})
         if csrf_input:
             return csrf_input.get('value')
@@ -156,7 +439,7 @@ class ActawpParserV58:
         if not csrf_token:
             return None
         
-        url = f"https://actawp.natacio.cat/{language}/ajax/team/{team_id}/change-tab"
+        url = f"{ACTAWP_BASE}/{language}/ajax/team/{team_id}/change-tab"
         
         data = {
             'csrf_token': csrf_token,
@@ -167,10 +450,10 @@ class ActawpParserV58:
             'accept': '*/*',
             'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
             'x-requested-with': 'XMLHttpRequest',
-            'referer': f'https://actawp.natacio.cat/{language}/team/{team_id}'
+            'referer': f'{ACTAWP_BASE}/{language}/team/{team_id}'
         }
         
-        response = self.session.post(url, data=data, headers=headers)
+        response = self.session.post(url, data=data, headers=headers, timeout=self.request_timeout())
         
         if response.status_code == 200:
             return response.json()
@@ -178,42 +461,26 @@ class ActawpParserV58:
             return None
     
     def extract_header_text(self, th):
-        """Extreu el text del header"""
-        candidates = []
-        
+        """Extreu el text del header (title > span title > data-original-title > span > text)"""
         title = th.get('title', '').strip()
         if title:
-            candidates.append(('title', title))
+            return title
         
         span = th.find('span')
-        if span:
-            span_title = span.get('title', '').strip()
-            if span_title:
-                candidates.append(('span_title', span_title))
-            
-            span_text = span.get_text(strip=True)
-            if span_text:
-                candidates.append(('span_text', span_text))
-        
-        th_text = th.get_text(strip=True)
-        if th_text:
-            candidates.append(('th_text', th_text))
+        span_title = span.get('title', '').strip() if span else ''
+        if span_title:
+            return span_title
         
         data_title = th.get('data-original-title', '').strip()
         if data_title:
-            candidates.append(('data_title', data_title))
-        
-        priority = ['title', 'span_title', 'data_title', 'span_text', 'th_text']
-        
-        for method in priority:
-            for candidate_method, candidate_text in candidates:
-                if candidate_method == method and candidate_text:
-                    return candidate_text
+            return data_title
         
-        if candidates:
-            return candidates[0][1]
+        if span:
+            span_text = span.get_text(strip=True)
+            if span_text:
+                return span_text
         
-        return ''
+        return th.get_text(strip=True)
     
     def clean_player_name(self, name):
         """Neteja el nom del jugador eliminant Ver/Veure"""
@@ -227,53 +494,36 @@ class ActawpParserV58:
     
     def normalize_field_name(self, field_name):
         """Normalitza nom de camp al format curt esperat per l'index.html"""
-        field_mapping = {
-            'Nom': 'Nombre',
-            'Partits jugats': 'PJ',
-            'Total goals': 'GT',
-            'Gols': 'G',
-            'Gols penal': 'GP',
-            'Gols en tanda de penals': 'G5P',
-            'Targetes grogues': 'TA',
-            'Targetes vermelles': 'TR',
-            'Expulsions per 20 segons': 'EX',
-            'Expulsions definitives, amb substitució disciplinària': 'ED',
-            'Expulsions definitives per brutalitat, amb substitució als 4 minuts': 'EB',
-            'Expulsions definitives, amb substitució no disciplinària': 'EN',
-            'Expulsions i penal': 'EP',
-            'Faltes per penal': 'P',
-            'Penals fallats': 'PF',
-            'Altres': 'O',
-            'Temps morts': 'TM',
-            'Joc net': 'JL',
-            'Vinculat': 'Vinculado',
-            'Nombre': 'Nombre',
-            'Partidos jugados': 'PJ',
-            'Goles totales': 'GT',
-            'Goles': 'G',
-            'Goles de penalti': 'GP',
-            'Goles en tanda de penaltis': 'G5P',
-            'Tarjetas amarillas': 'TA',
-            'Tarjetas rojas': 'TR',
-            'Expulsiones por 20 segundos': 'EX',
-            'Expulsiones definitivas, con sustitución disciplinaria': 'ED',
-            'Expulsiones definitivas por brutalidad, con sustitución a los 4 minutos': 'EB',
-            'Expulsiones definitivas, con sustitución no disciplinaria': 'EN',
-            'Expulsiones y penalti': 'EP',
-            'Faltas por penalti': 'P',
-            'Penaltis fallados': 'PF',
-            'Otros': 'O',
-            'Tiempos muertos': 'TM',
-            'Juego limpio': 'JL',
-            'Vinculado': 'Vinculado',
-            'MVP': 'MVP'
-        }
-        
-        return field_mapping.get(field_name, field_name)
+        return FIELD_MAPPING.get(field_name, field_name)
     
+    def player_cell(self, cell):
+        """Valor d'una cel·la de jugador: text net, enter si és numèric, None si és buida"""
+        value = re.sub(r'\s+', ' ', cell.get_text(strip=True))
+        if value in EMPTY_VALUES:
+            return None
+        return int(value) if value.isdigit() else value
+    
+    def player_name_cell(self, cell):
+        value = re.sub(r'\s+', ' ', cell.get_text(strip=True))
+        if value:
+            value = self.clean_player_name(value)
+        return None if value in EMPTY_VALUES else value
+    
+    def compile_players_plan(self, headers):
+        """Pla de la taula de jugadors: índex de columna → camp normalitzat"""
+        columns = []
+        for i, header in enumerate(headers):
+            if not header:
+                continue
+            field = self.normalize_field_name(header)
+            convert = self.player_name_cell if field == 'Nombre' else self.player_cell
+            columns.append((i, field, convert))
+        return TablePlan(columns, min_cells=2)
+    
+    @releases_soups
     def parse_players(self, html_content):
         """Parser de jugadors amb normalització automàtica"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         players = []
         
         table = soup.find('table')
@@ -294,47 +544,20 @@ class ActawpParserV58:
         if not tbody:
             return players
         
-        rows = tbody.find_all('tr')
+        # La disposició es resol una vegada (i es reutilitza per tots els rivals amb les mateixes capçaleres)
+        plan = self.plans.get(('players', tuple(headers)), lambda: self.compile_players_plan(headers))
         
-        for row in rows:
-            cells = row.find_all('td')
-            
-            if len(cells) < 2:
-                continue
-            
-            player_data = {}
-            
-            for i, cell in enumerate(cells):
-                if i >= len(headers):
-                    break
-                
-                header = headers[i]
-                if not header:
-                    continue
-                
-                normalized_field = self.normalize_field_name(header)
-                value = cell.get_text(strip=True)
-                value = re.sub(r'\s+', ' ', value)
-                
-                if normalized_field == 'Nombre' and value:
-                    value = self.clean_player_name(value)
-                
-                if value and value not in ['', '-', '—', 'N/A']:
-                    try:
-                        if value.isdigit():
-                            value = int(value)
-                    except:
-                        pass
-                    player_data[normalized_field] = value
-            
+        for row in tbody.find_all('tr'):
+            player_data = plan.extract(row.find_all('td'))
             if player_data:
-                players.append(player_data)
+                players.append(PlayerLine.from_dict(player_data))
         
         return players
     
+    @releases_soups
     def parse_upcoming_matches(self, html_content):
         """Parser de pròxims partits amb jornada - AMB NETEJA DE NOMS I URLs"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         matches = []
         
         rows = soup.find_all('tr')
@@ -363,7 +586,7 @@ class ActawpParserV58:
                 link = cols[0].find('a', href=True)
                 if link:
                     href = link['href']
-                    match_url = href if href.startswith('http') else 'https://actawp.natacio.cat' + href
+                    match_url = href if href.startswith('http') else ACTAWP_BASE + href
                 
                 # 🔧 Netejar noms d'equips
                 team1 = self.clean_team_name(cols[0].get_text(strip=True))
@@ -379,19 +602,19 @@ class ActawpParserV58:
                 date_match = re.search(r'(\d{2}/\d{2}/\d{4})\s+(\d{2}:\d{2})', middle_text)
                 
                 if team1 and team2:
-                    match_data = {
-                        'team1': team1,
-                        'team2': team2,
-                        'team1_logo': team1_logo,
-                        'team2_logo': team2_logo,
-                        'date_time': middle_text,
-                        'jornada': jornada_counter,
-                        'url': match_url  # 🆕 v6.2
-                    }
+                    match_data = Match(
+                        team1=team1,
+                        team2=team2,
+                        team1_logo=team1_logo,
+                        team2_logo=team2_logo,
+                        date_time=middle_text,
+                        jornada=jornada_counter,
+                        url=match_url  # 🆕 v6.2
+                    )
                     
                     if date_match:
-                        match_data['date'] = date_match.group(1)
-                        match_data['time'] = date_match.group(2)
+                        match_data.date = date_match.group(1)
+                        match_data.time = date_match.group(2)
                     
                     matches.append(match_data)
                     jornada_counter += 1
@@ -401,9 +624,10 @@ class ActawpParserV58:
         
         return matches
     
+    @releases_soups
     def parse_last_results(self, html_content):
         """Parser d'últims resultats amb jornada - AMB NETEJA DE NOMS I URLs"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         results = []
         
         rows = soup.find_all('tr')
@@ -432,7 +656,7 @@ class ActawpParserV58:
                 link = cols[0].find('a', href=True)
                 if link:
                     href = link['href']
-                    match_url = href if href.startswith('http') else 'https://actawp.natacio.cat' + href
+                    match_url = href if href.startswith('http') else ACTAWP_BASE + href
                 
                 # 🔧 Netejar noms d'equips
                 team1 = self.clean_team_name(cols[0].get_text(strip=True))
@@ -453,16 +677,16 @@ class ActawpParserV58:
                         date = date_match.group(1)
                 
                 if team1 and team2 and score:
-                    results.append({
-                        'team1': team1,
-                        'team2': team2,
-                        'team1_logo': team1_logo,
-                        'team2_logo': team2_logo,
-                        'score': score,
-                        'date': date,
-                        'jornada': jornada_counter,
-                        'url': match_url  # 🆕 v6.2
-                    })
+                    results.append(Result(
+                        team1=team1,
+                        team2=team2,
+                        team1_logo=team1_logo,
+                        team2_logo=team2_logo,
+                        score=score,
+                        date=date,
+                        jornada=jornada_counter,
+                        url=match_url  # 🆕 v6.2
+                    ))
                     jornada_counter += 1
                     
             except Exception as e:
@@ -474,13 +698,124 @@ class ActawpParserV58:
         """Parser de classificació - CORREGIT per extreure noms correctament"""
         try:
             print(f"  📊 Obtenint classificació de: {ranking_url}")
-            response = self.session.get(ranking_url)
-            
-            if response.status_code != 200:
-                print(f"  ❌ Error HTTP: {response.status_code}")
+            html = self.fetch_page(ranking_url)
+            if html is None:
                 return []
+            return self.parse_ranking_html(html)
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            return []
+    
+    def ranking_link_name(self, link):
+        """Nom de l'equip dins del link de la classificació (None si només hi ha "Ver/Veure")"""
+        # 🔧 CORRECCIÓ: Buscar el nom dins del link
+        # Pot ser en un span, strong, o directament
+        link_text = ''
+        
+        # Intentar trobar el nom en elements específics
+        name_elem = link.find(['span', 'strong', 'b'])
+        if name_elem:
+            link_text = name_elem.get_text(strip=True)
+        
+        # Si no, agafar tot el text del link
+        if not link_text or link_text.lower() in ['ver', 'veure', 'see']:
+            # Buscar tots els textos dins del link
+            all_texts = link.find_all(string=True, recursive=True)
+            for t in all_texts:
+                t = t.strip()
+                # Ignorar textos curts o que siguin "Ver/Veure"
+                if len(t) > 4 and t.lower() not in ['ver', 'veure', 'see', 'view']:
+                    link_text = t
+                    break
+        
+        # Si encara no tenim text, mirar el title del link
+        if not link_text or link_text.lower() in ['ver', 'veure']:
+            link_text = link.get('title', '')
+        
+        if link_text and link_text.lower() not in ['ver', 'veure', 'see', 'view']:
+            return self.clean_team_name(link_text)
+        return None
+    
+    def ranking_team_link(self, cell):
+        link = cell.find('a', href=True)
+        if link and '/team/' in link.get('href', ''):
+            return link
+        return None
+    
+    def ranking_name_from_link(self, cell):
+        link = self.ranking_team_link(cell)
+        return self.ranking_link_name(link) if link else None
+    
+    def ranking_name_from_text(self, cell):
+        cell_text = self.clean_team_name(cell.get_text(strip=True))
+        # Només si és un nom vàlid (no és número ni text curt)
+        if len(cell_text) > 5 and not cell_text.isdigit() and cell_text.lower() not in ['ver', 'veure']:
+            return cell_text
+        return None
+    
+    def ranking_team_id(self, cell):
+        link = self.ranking_team_link(cell)
+        if link:
+            id_match = re.search(r'/team/(\d+)', link['href'])
+            if id_match:
+                return id_match.group(1)
+        return None
+    
+    def ranking_logo(self, cell):
+        img = cell.find('img')
+        if img and img.get('src'):
+            return img['src']
+        return None
+    
+    def ranking_number(self, cell):
+        value_text = cell.get_text(strip=True)
+        # Acceptar números positius i negatius
+        if value_text.lstrip('-').isdigit():
+            return int(value_text)
+        return None
+    
+    def compile_ranking_plan(self, cols):
+        """Resol la disposició de la classificació a partir d'una fila
+        
+        Busca a totes les columnes (com abans es feia a cada fila) on són el nom,
+        l'ID, el logo i les estadístiques. Retorna None si la fila no té equip.
+        """
+        name_col = id_col = logo_col = None
+        name_from_link = False
+        
+        for i, col in enumerate(cols):
+            link = self.ranking_team_link(col)
+            if link:
+                if re.search(r'/team/(\d+)', link['href']):
+                    id_col = i
+                if self.ranking_link_name(link):
+                    name_col, name_from_link = i, True
+            
+            if self.ranking_logo(col):
+                logo_col = i
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Si no hem trobat nom al link, provar amb el text de la cel·la
+            if name_col is None and self.ranking_name_from_text(col):
+                name_col = i
+        
+        if name_col is None:
+            return None
+        
+        columns = [(name_col, 'equip', self.ranking_name_from_link if name_from_link else self.ranking_name_from_text)]
+        if id_col is not None:
+            columns.append((id_col, 'team_id', self.ranking_team_id))
+        if logo_col is not None:
+            columns.append((logo_col, 'logo', self.ranking_logo))
+        
+        # Estadístiques: TOTS els números de les columnes DESPRÉS de la de l'equip
+        return TablePlan(columns, min_cells=3, tail_start=name_col + 1,
+                         tail_fields=RANKING_STAT_FIELDS, tail_convert=self.ranking_number)
+    
+    @releases_soups
+    def parse_ranking_html(self, html):
+        """Files de la classificació a partir de l'HTML de la pàgina"""
+        try:
+            soup = make_soup(html)
             table = soup.find('table')
             
             if not table:
@@ -494,6 +829,7 @@ class ActawpParserV58:
             
             rows = tbody.find_all('tr')
             ranking = []
+            plan = None
             
             for idx, row in enumerate(rows, 1):
                 try:
@@ -501,116 +837,45 @@ class ActawpParserV58:
                     if len(cols) < 3:
                         continue
                     
-                    equip_text = ''
-                    logo_url = ''
-                    team_id = ''
-                    equip_idx = -1
-                    
-                    # Buscar en totes les columnes
-                    for i, col in enumerate(cols):
-                        # Buscar link amb ID de l'equip
-                        link = col.find('a', href=True)
-                        if link and '/team/' in link.get('href', ''):
-                            href = link['href']
-                            # Extreure ID
-                            id_match = re.search(r'/team/(\d+)', href)
-                            if id_match:
-                                team_id = id_match.group(1)
-                            
-                            # 🔧 CORRECCIÓ: Buscar el nom dins del link
-                            # Pot ser en un span, strong, o directament
-                            link_text = ''
-                            
-                            # Intentar trobar el nom en elements específics
-                            name_elem = link.find(['span', 'strong', 'b'])
-                            if name_elem:
-                                link_text = name_elem.get_text(strip=True)
-                            
-                            # Si no, agafar tot el text del link
-                            if not link_text or link_text.lower() in ['ver', 'veure', 'see']:
-                                # Buscar tots els textos dins del link
-                                all_texts = link.find_all(string=True, recursive=True)
-                                for t in all_texts:
-                                    t = t.strip()
-                                    # Ignorar textos curts o que siguin "Ver/Veure"
-                                    if len(t) > 4 and t.lower() not in ['ver', 'veure', 'see', 'view']:
-                                        link_text = t
-                                        break
-                            
-                            # Si encara no tenim text, mirar el title del link
-                            if not link_text or link_text.lower() in ['ver', 'veure']:
-                                link_text = link.get('title', '')
-                            
-                            if link_text and link_text.lower() not in ['ver', 'veure', 'see', 'view']:
-                                equip_text = self.clean_team_name(link_text)
-                                equip_idx = i
-                        
-                        # Buscar logo
-                        img = col.find('img')
-                        if img and img.get('src'):
-                            logo_url = img.get('src', '')
-                        
-                        # Si no hem trobat nom al link, provar amb el text de la cel·la
-                        if not equip_text:
-                            cell_text = col.get_text(strip=True)
-                            cell_text = self.clean_team_name(cell_text)
-                            # Només si és un nom vàlid (no és número ni text curt)
-                            if len(cell_text) > 5 and not cell_text.isdigit() and cell_text.lower() not in ['ver', 'veure']:
-                                equip_text = cell_text
-                                equip_idx = i
+                    # El pla es resol amb la primera fila i només es recalcula
+                    # si una fila no encaixa (p.ex. equip sense link o sense logo)
+                    row_data = plan.extract(cols) if plan else None
+                    if not plan or not plan.covers(row_data):
+                        row_plan = self.compile_ranking_plan(cols)
+                        row_data = row_plan.extract(cols) if row_plan else None
+                        # Només es reutilitza un pla que ha trobat nom, ID i logo
+                        if row_plan and set(row_plan.fields) >= {'equip', 'team_id', 'logo'}:
+                            plan = row_plan
                     
                     # Si no hem trobat nom, saltar aquesta fila
-                    if not equip_text or equip_text.lower() in ['ver', 'veure', 'see', 'view']:
+                    if not row_data or not row_data.get('equip'):
                         print(f"    ⚠️ Fila {idx}: No s'ha trobat nom d'equip")
                         continue
                     
-                    posicio_text = str(idx)
-                    stats_start = equip_idx + 1 if equip_idx >= 0 else 2
-                    
-                    team_data = {
-                        'posicio': posicio_text,
-                        'equip': equip_text,
-                        'team_id': team_id,
-                        'logo': logo_url,
-                        'punts': 0,
-                        'partits': 0,
-                        'guanyats': 0,
-                        'empatats': 0,
-                        'perduts': 0,
-                        'gols_favor': 0,
-                        'gols_contra': 0,
-                        'diferencia': 0
-                    }
-                    
-                    # Extreure estadístiques numèriques de les columnes DESPRÉS del nom
-                    # Ordre típic: PTS | PJ | V | E | D | GF | GC | DIF
-                    stat_fields = ['punts', 'partits', 'guanyats', 'empatats', 'perduts', 'gols_favor', 'gols_contra', 'diferencia']
-                    stat_values = []
-                    
-                    # Recollir TOTS els números de les columnes DESPRÉS de la columna de l'equip
-                    for i, col in enumerate(cols):
-                        # Només mirar columnes després de la de l'equip
-                        if i <= equip_idx:
-                            continue
-                        
-                        value_text = col.get_text(strip=True)
-                        # Acceptar números positius i negatius
-                        if value_text.lstrip('-').isdigit():
-                            try:
-                                stat_values.append(int(value_text))
-                            except:
-                                pass
-                    
-                    # Assignar els valors als camps
-                    for i, value in enumerate(stat_values):
-                        if i < len(stat_fields):
-                            team_data[stat_fields[i]] = value
+                    team_data = RankingRow(
+                        posicio=str(idx),
+                        equip=row_data['equip'],
+                        team_id=row_data.get('team_id', ''),
+                        logo=row_data.get('logo', ''),
+                        punts=0,
+                        partits=0,
+                        guanyats=0,
+                        empatats=0,
+                        perduts=0,
+                        gols_favor=0,
+                        gols_contra=0,
+                        diferencia=0
+                    )
+                    stat_values = [row_data[f] for f in RANKING_STAT_FIELDS if f in row_data]
+                    for field in RANKING_STAT_FIELDS:
+                        if field in row_data:
+                            team_data[field] = row_data[field]
                     
                     print(f"    📊 Stats: {stat_values[:3]}..." if stat_values else "    ⚠️ No stats")
                     
                     if team_data['equip'] and len(team_data['equip']) > 1:
                         ranking.append(team_data)
-                        print(f"    ✅ {idx}. {team_data['equip']} (ID: {team_id})")
+                        print(f"    ✅ {idx}. {team_data['equip']} (ID: {team_data.team_id})")
                     
                 except Exception as e:
                     print(f"    ⚠️ Error fila {idx}: {e}")
@@ -622,14 +887,26 @@ class ActawpParserV58:
             print(f"  ❌ Error: {e}")
             return []
     
-    def get_rival_last_results(self, team_id, team_name, language='es'):
+    def fetch_tab_safe(self, team_id, tab_name, team_name, language='es'):
+        """get_tab_content que no peta: un rival amb error es queda sense aquesta pestanya"""
+        try:
+            return self.get_tab_content(team_id, tab_name, language)
+        except Exception as e:
+            print(f"    ⚠️ Error obtenint {tab_name} de {team_name}: {e}")
+            return None
+    
+    def get_rival_last_results(self, team_id, team_name, language='es', calendar_dates=None):
         """Obté els últims resultats d'un equip rival"""
+        results_data = self.fetch_tab_safe(team_id, 'last-results', team_name, language)
+        results = self.rival_results_from_tab(results_data, team_name)
+        # 🆕 v6.3 - Afegir dates del calendari
+        return self.add_dates_to_results(results, calendar_dates)
+    
+    def rival_results_from_tab(self, results_data, team_name):
+        """Últims 5 resultats d'un rival a partir de la pestanya 'last-results'"""
         try:
-            results_data = self.get_tab_content(team_id, 'last-results', language)
             if results_data and results_data.get('code') == 0:
                 results = self.parse_last_results(results_data.get('content', ''))
-                # 🆕 v6.3 - Afegir dates del calendari
-                results = self.add_dates_to_results(results)
                 return results[:5]  # Només últims 5
             return []
         except Exception as e:
@@ -638,8 +915,12 @@ class ActawpParserV58:
     
     def get_rival_top_scorers(self, team_id, team_name, language='es'):
         """🆕 v6.1 - Obté els 5 màxims golejadors d'un equip rival amb dades ampliades"""
+        players_data = self.fetch_tab_safe(team_id, 'players', team_name, language)
+        return self.top_scorers_from_tab(players_data, team_name)
+    
+    def top_scorers_from_tab(self, players_data, team_name):
+        """Top 5 golejadors d'un rival a partir de la pestanya 'players'"""
         try:
-            players_data = self.get_tab_content(team_id, 'players', language)
             if players_data and players_data.get('code') == 0:
                 players = self.parse_players(players_data.get('content', ''))
                 
@@ -673,12 +954,9 @@ class ActawpParserV58:
             print(f"    ⚠️ Error obtenint jugadors de {team_name}: {e}")
             return []
     
-    def get_all_rivals_form(self, ranking, language='es'):
-        """Obté la forma de tots els rivals de la classificació"""
-        rivals_form = {}
-        
-        print("\n7️⃣ FORMA DELS RIVALS:")
-        
+    def get_rival_teams(self, ranking):
+        """Equips rivals de la classificació (sense el nostre i amb ID)"""
+        rivals = []
         for team in ranking:
             team_name = team.get('equip', '')
             team_id = team.get('team_id', '')
@@ -691,99 +969,248 @@ class ActawpParserV58:
                 print(f"    ⚠️ {team_name}: sense ID")
                 continue
             
-            print(f"    📊 {team_name}...", end=' ')
+            rivals.append(team)
+        return rivals
+    
+    def rivals_by_next_match(self, rivals, upcoming_matches):
+        """Ordena els rivals segons quan hi juguem (els que no surten als pròxims partits, al final)"""
+        next_match = {}
+        for order, match in enumerate(upcoming_matches):
+            for side in ('team1', 'team2'):
+                name = self.normalize_team_for_calendar(match.get(side, ''))
+                next_match.setdefault(name, order)
+        
+        def match_order(team):
+            return next_match.get(self.normalize_team_for_calendar(team.get('equip', '')), len(upcoming_matches))
+        
+        return sorted(rivals, key=match_order)
+    
+    def get_all_rivals_form(self, ranking, language='es'):
+        """Obté la forma de tots els rivals de la classificació"""
+        rivals_form = {}
+        
+        print("\n7️⃣ FORMA DELS RIVALS:")
+        
+        for team in self.get_rival_teams(ranking):
+            form = self.get_rival_form(team['equip'], team['team_id'], language)
+            if form:
+                rivals_form[team['equip']] = form
+        
+        return rivals_form
+    
+    def get_rival_form(self, team_name, team_id, language='es', calendar_dates=None):
+        """Forma d'un rival: últims resultats, golejadors i estadístiques (None si no té resultats)"""
+        tabs = self.fetch_rival_tabs(team_id, team_name, language)
+        rival_form = self.rival_form_from_tabs(team_name, team_id, tabs)
+        if rival_form:
+            self.add_dates_to_results(rival_form['last_results'], calendar_dates)
+        return rival_form
+    
+    def fetch_rival_tabs(self, team_id, team_name, language='es'):
+        """Part de xarxa de la forma d'un rival: pestanyes de resultats i jugadors"""
+        return (
+            self.fetch_tab_safe(team_id, 'last-results', team_name, language),
+            self.fetch_tab_safe(team_id, 'players', team_name, language),
+        )
+    
+    def rival_form_from_tabs(self, team_name, team_id, tabs):
+        """Part de CPU de la forma d'un rival (sense dates: les posa qui munta el JSON)"""
+        results_data, players_data = tabs
+        results = self.rival_results_from_tab(results_data, team_name)
+        top_scorers = self.top_scorers_from_tab(players_data, team_name)
+        
+        if results:
+            # Calcular forma (V/E/D)
+            form = []
+            total_gf = 0  # Gols a favor
+            total_gc = 0  # Gols en contra
+            
+            for r in results:
+                score = r.get('score', '0-0')
+                score_parts = score.split('-')
+                if len(score_parts) == 2:
+                    try:
+                        g1, g2 = int(score_parts[0]), int(score_parts[1])
+                    except:
+                        g1, g2 = 0, 0
+                    # Determinar si l'equip és team1 o team2
+                    is_team1 = canonical_team(team_name) == canonical_team(r.get('team1', ''))
+                    if is_team1:
+                        total_gf += g1
+                        total_gc += g2
+                        if g1 > g2: form.append('W')
+                        elif g1 < g2: form.append('L')
+                        else: form.append('D')
+                    else:
+                        total_gf += g2
+                        total_gc += g1
+                        if g2 > g1: form.append('W')
+                        elif g2 < g1: form.append('L')
+                        else: form.append('D')
             
-            results = self.get_rival_last_results(team_id, team_name, language)
-            top_scorers = self.get_rival_top_scorers(team_id, team_name, language)
+            # Calcular mitjanes
+            num_matches = len(results)
+            avg_gf = round(total_gf / num_matches, 1) if num_matches > 0 else 0
+            avg_gc = round(total_gc / num_matches, 1) if num_matches > 0 else 0
             
-            if results:
-                # Calcular forma (V/E/D)
-                form = []
-                total_gf = 0  # Gols a favor
-                total_gc = 0  # Gols en contra
-                
-                for r in results:
-                    score = r.get('score', '0-0')
-                    score_parts = score.split('-')
-                    if len(score_parts) == 2:
-                        try:
-                            g1, g2 = int(score_parts[0]), int(score_parts[1])
-                        except:
-                            g1, g2 = 0, 0
-                        # Determinar si l'equip és team1 o team2
-                        is_team1 = team_name.upper() in r.get('team1', '').upper()
-                        if is_team1:
-                            total_gf += g1
-                            total_gc += g2
-                            if g1 > g2: form.append('W')
-                            elif g1 < g2: form.append('L')
-                            else: form.append('D')
-                        else:
-                            total_gf += g2
-                            total_gc += g1
-                            if g2 > g1: form.append('W')
-                            elif g2 < g1: form.append('L')
-                            else: form.append('D')
-                
-                # Calcular mitjanes
-                num_matches = len(results)
-                avg_gf = round(total_gf / num_matches, 1) if num_matches > 0 else 0
-                avg_gc = round(total_gc / num_matches, 1) if num_matches > 0 else 0
-                
-                # Determinar tendència
-                recent_form = form[:3]  # Últims 3 partits
-                wins_recent = recent_form.count('W')
-                losses_recent = recent_form.count('L')
-                
-                if wins_recent >= 2:
-                    trend = 'hot'  # 🔥 En ratxa
-                elif losses_recent >= 2:
-                    trend = 'cold'  # 📉 En baixa
-                elif wins_recent > losses_recent:
-                    trend = 'up'  # 📈 Pujant
-                elif losses_recent > wins_recent:
-                    trend = 'down'  # 📉 Baixant
-                else:
-                    trend = 'stable'  # ➡️ Estable
-                
-                # Calcular total exclusions de l'equip
-                total_exclusions = sum(p.get('exclusions', 0) for p in top_scorers)
-                
-                rivals_form[team_name] = {
-                    'team_id': team_id,
-                    'last_results': results,
-                    'form': form,
-                    'form_string': ''.join(form),
-                    'top_scorers': top_scorers,
-                    # 🆕 v6.1 - Estadístiques ampliades
-                    'stats': {
-                        'total_gf': total_gf,
-                        'total_gc': total_gc,
-                        'avg_gf': avg_gf,
-                        'avg_gc': avg_gc,
-                        'matches_played': num_matches,
-                        'wins': form.count('W'),
-                        'draws': form.count('D'),
-                        'losses': form.count('L'),
-                        'trend': trend,
-                        'total_exclusions': total_exclusions
-                    }
-                }
-                
-                # Mostrar info
-                scorers_info = f", Top: {top_scorers[0]['name']} ({top_scorers[0]['goals']}g)" if top_scorers else ""
-                print(f"✅ {len(results)} resultats ({'-'.join(form)}){scorers_info}")
+            # Determinar tendència
+            recent_form = form[:3]  # Últims 3 partits
+            wins_recent = recent_form.count('W')
+            losses_recent = recent_form.count('L')
+            
+            if wins_recent >= 2:
+                trend = 'hot'  # 🔥 En ratxa
+            elif losses_recent >= 2:
+                trend = 'cold'  # 📉 En baixa
+            elif wins_recent > losses_recent:
+                trend = 'up'  # 📈 Pujant
+            elif losses_recent > wins_recent:
+                trend = 'down'  # 📉 Baixant
             else:
-                print(f"❌ sense resultats")
+                trend = 'stable'  # ➡️ Estable
+            
+            # Calcular total exclusions de l'equip
+            total_exclusions = sum(p.get('exclusions', 0) for p in top_scorers)
+            
+            rival_form = RivalForm(
+                team_id=team_id,
+                last_results=results,
+                form=form,
+                form_string=''.join(form),
+                top_scorers=top_scorers,
+                # 🆕 v6.1 - Estadístiques ampliades
+                stats={
+                    'total_gf': total_gf,
+                    'total_gc': total_gc,
+                    'avg_gf': avg_gf,
+                    'avg_gc': avg_gc,
+                    'matches_played': num_matches,
+                    'wins': form.count('W'),
+                    'draws': form.count('D'),
+                    'losses': form.count('L'),
+                    'trend': trend,
+                    'total_exclusions': total_exclusions
+                }
+            )
+            
+            # Mostrar info
+            scorers_info = f", Top: {top_scorers[0]['name']} ({top_scorers[0]['goals']}g)" if top_scorers else ""
+            print(f"    📊 {team_name}... ✅ {len(results)} resultats ({'-'.join(form)}){scorers_info}")
+            return rival_form
         
-        return rivals_form
+        print(f"    📊 {team_name}... ❌ sense resultats")
+        return None
     
-    def generate_json(self, team_id, team_key, team_name, coach, language='es', ranking_url=None, calendar_url=None):
-        """Genera JSON amb normalització automàtica"""
-        self.current_team_key = team_key
+    def fetch_players(self, team_id, language='es'):
+        """Secció 'players' - plantilla amb estadístiques normalitzades"""
+        return self.players_from_tab(self.get_tab_content(team_id, 'players', language))
+    
+    def players_from_tab(self, players_data):
+        if players_data and players_data.get('code') == 0:
+            players = self.parse_players(players_data.get('content', ''))
+            print(f"  ✅ {len(players)} jugadors")
+            
+            if players:
+                first = players[0]
+                print(f"  📊 Primer: {first.get('Nombre', '?')} - PJ:{first.get('PJ', 0)} GT:{first.get('GT', 0)}")
+            return players
+        return []
+    
+    def fetch_team_stats(self, team_id, language='es'):
+        """Secció 'stats' - estadístiques globals de l'equip"""
+        return self.team_stats_from_tab(self.get_tab_content(team_id, 'stats', language))
+    
+    def stat_value_cell(self, cell):
+        """Valor d'una estadística d'equip: enter, decimal amb coma o text"""
+        value = cell.get_text(strip=True)
+        try:
+            if value.isdigit():
+                return int(value)
+            elif ',' in value:
+                return float(value.replace(',', '.'))
+        except ValueError:
+            pass
+        return value
+    
+    @releases_soups
+    def team_stats_from_tab(self, stats_data):
+        team_stats = {}
+        if stats_data and stats_data.get('code') == 0:
+            soup = make_soup(stats_data.get('content', ''))
+            table = soup.find('table')
+            if table:
+                plan = self.plans.get('stats', lambda: TablePlan([
+                    (0, 'key', lambda cell: cell.get_text(strip=True)),
+                    (1, 'value', self.stat_value_cell),
+                ], min_cells=2))
+                for row in table.find_all('tr'):
+                    stat = plan.extract(row.find_all('td'))
+                    if stat:
+                        team_stats[stat['key']] = stat['value']
+        print(f"  ✅ {len(team_stats)} estadístiques")
+        return team_stats
+    
+    def fetch_upcoming_matches(self, team_id, language='es'):
+        """Secció 'fixtures' - pròxims partits"""
+        return self.upcoming_from_tab(self.get_tab_content(team_id, 'upcoming-matches', language))
+    
+    def upcoming_from_tab(self, upcoming_data):
+        if upcoming_data and upcoming_data.get('code') == 0:
+            matches = self.parse_upcoming_matches(upcoming_data.get('content', ''))
+            print(f"  ✅ {len(matches)} partits")
+            if matches:
+                first = matches[0]
+                print(f"  📅 Pròxim: J{first.get('jornada', '?')} - {first.get('team1', '?')} vs {first.get('team2', '?')} - {first.get('date', '?')}")
+                print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
+            return matches
+        return []
+    
+    def fetch_last_results(self, team_id, language='es', calendar_dates=None):
+        """Secció 'results' - últims resultats amb dates del calendari"""
+        results = self.results_from_tab(self.get_tab_content(team_id, 'last-results', language))
+        # 🆕 v6.3 - Afegir dates del calendari
+        return self.add_dates_to_results(results, calendar_dates)
+    
+    def results_from_tab(self, results_data):
+        if results_data and results_data.get('code') == 0:
+            results = self.parse_last_results(results_data.get('content', ''))
+            print(f"  ✅ {len(results)} resultats")
+            if results:
+                first = results[0]
+                score = first.get('score', '?')
+                print(f"  📊 Últim: J{first.get('jornada', '?')} - {first.get('team1', '?')} {score} {first.get('team2', '?')}")
+                print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
+            return results
+        return []
+    
+    def fetch_ranking(self, ranking_url):
+        """Secció 'ranking' - classificació de la fase"""
+        return self.ranking_summary(self.parse_ranking(ranking_url))
+    
+    def ranking_summary(self, ranking):
+        print(f"  ✅ {len(ranking)} equips")
+        for team in ranking:
+            if 'TERRASSA' in team['equip'].upper():
+                print(f"  🏆 CN Terrassa: Posició {team['posicio']} - {team['punts']} punts")
+                break
+        return ranking
+    
+    def plan_json(self, scheduler, team_id, team_key, team_name, coach, language='es', ranking_url=None,
+                  calendar_url=None, sections=None, previous=None):
+        """Planifica al scheduler les descàrregues d'un equip i retorna l'estat de l'execució
+        
+        Amb `sections` només es tornen a descarregar aquestes seccions; la resta
+        es copien tal qual de `previous` (l'últim JSON guardat). El JSON es munta
+        amb `finish_json` un cop executat el scheduler.
+        """
+        previous = previous or {}
+        is_partial = sections is not None
+        sections = resolve_sections(sections) if is_partial else list(SECTIONS)
         
         print(f"\n{'='*70}")
         print(f"🔥 {team_name} - Parser v6.3 (DATES CALENDARI)")
+        if is_partial:
+            print(f"🎯 Refresc parcial: {', '.join(sections)}")
         print(f"{'='*70}")
         
         result = {
@@ -797,106 +1224,370 @@ class ActawpParserV58:
                 "parser_version": "6.3_calendar_dates"
             }
         }
+        if is_partial:
+            result['metadata']['refreshed_sections'] = sections
         
-        # 🆕 v6.3 - Parsejar calendari primer per tenir les dates
-        if calendar_url:
-            print("\n1️⃣ CALENDARI (dates partits 3a fase):")
-            self.calendar_dates = self.parse_calendar(calendar_url)
-        else:
-            self.calendar_dates = {}
+        run = {
+            'team_key': team_key,
+            'result': result,
+            'previous': previous,
+            'sections': sections,
+            'calendar_dates': {},
+            'calendar_results': [],  # resultats de tota la fase (motor de classificació)
+            'calendar_fixtures': None,  # partits pendents de tota la fase (projecció)
+            'ranking_scraped': False,
+            'rivals': None,  # equips rivals planificats (None = no s'han pogut planificar)
+            'rival_spool': RivalSpool() if MEMORY_BOUNDED and 'rivals' in sections else None,  # forma dels rivals ja feta, a disc
+        }
         
-        print("\n2️⃣ JUGADORS:")
-        players_data = self.get_tab_content(team_id, 'players', language)
-        if players_data and players_data.get('code') == 0:
-            result['players'] = self.parse_players(players_data.get('content', ''))
-            print(f"  ✅ {len(result['players'])} jugadors")
-            
-            if result['players']:
-                first = result['players'][0]
-                print(f"  📊 Primer: {first.get('Nombre', '?')} - PJ:{first.get('PJ', 0)} GT:{first.get('GT', 0)}")
-        else:
-            result['players'] = []
+        def tab(title, tab_name):
+            """Part de xarxa d'una secció: la pestanya en JSON"""
+            def fetch():
+                print(f"\n{title} [{team_name}]:")
+                return self.get_tab_content(team_id, tab_name, language)
+            return fetch
         
-        print("\n3️⃣ ESTADÍSTIQUES:")
-        stats_data = self.get_tab_content(team_id, 'stats', language)
-        team_stats = {}
-        if stats_data and stats_data.get('code') == 0:
-            soup = BeautifulSoup(stats_data.get('content', ''), 'html.parser')
-            table = soup.find('table')
-            if table:
-                for row in table.find_all('tr'):
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        key = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        try:
-                            if value.isdigit():
-                                value = int(value)
-                            elif ',' in value:
-                                value = float(value.replace(',', '.'))
-                        except:
-                            pass
-                        team_stats[key] = value
-        result['team_stats'] = team_stats
-        print(f"  ✅ {len(team_stats)} estadístiques")
+        def page(title, url):
+            """Part de xarxa d'una secció que és una pàgina sencera"""
+            def fetch():
+                print(f"\n{title} [{team_name}]:")
+                print(f"  🌐 {url}")
+                return self.fetch_page(url)
+            return fetch
         
-        print("\n4️⃣ PRÒXIMS PARTITS:")
-        upcoming_data = self.get_tab_content(team_id, 'upcoming-matches', language)
-        if upcoming_data and upcoming_data.get('code') == 0:
-            result['upcoming_matches'] = self.parse_upcoming_matches(upcoming_data.get('content', ''))
-            print(f"  ✅ {len(result['upcoming_matches'])} partits")
-            if result['upcoming_matches']:
-                first = result['upcoming_matches'][0]
-                print(f"  📅 Pròxim: J{first.get('jornada', '?')} - {first.get('team1', '?')} vs {first.get('team2', '?')} - {first.get('date', '?')}")
-                print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
-        else:
-            result['upcoming_matches'] = []
+        def spool_rival(unit_key, team_name, form):
+            """Mode de memòria acotada: la forma va a disc i al scheduler només hi queda si n'hi ha"""
+            if form:
+                run['rival_spool'][team_name] = form
+            scheduler.results[unit_key] = bool(form)
         
-        print("\n5️⃣ ÚLTIMS RESULTATS:")
-        results_data = self.get_tab_content(team_id, 'last-results', language)
-        if results_data and results_data.get('code') == 0:
-            result['last_results'] = self.parse_last_results(results_data.get('content', ''))
-            # 🆕 v6.3 - Afegir dates del calendari
-            result['last_results'] = self.add_dates_to_results(result['last_results'])
-            print(f"  ✅ {len(result['last_results'])} resultats")
-            if result['last_results']:
-                first = result['last_results'][0]
-                score = first.get('score', '?')
-                date = first.get('date', 'SENSE DATA')
-                print(f"  📊 Últim: J{first.get('jornada', '?')} - {first.get('team1', '?')} {score} {first.get('team2', '?')}")
-                print(f"  📅 Data: {date}")
-                print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
-        else:
-            result['last_results'] = []
+        def plan_rivals(ranking):
+            rivals = self.get_rival_teams(ranking)
+            upcoming = scheduler.results.get(f"{team_key}:fixtures", previous.get('upcoming_matches', []))
+            run['rivals'] = rivals
+            print(f"\n7️⃣ FORMA DELS RIVALS [{team_name}]: {len(rivals)} rivals a la cua")
+            for order, team in enumerate(self.rivals_by_next_match(rivals, upcoming)):
+                scheduler.submit(
+                    f"{team_key}:rival:{team['team_id']}",
+                    PRIORITY_RIVALS + order,
+                    fetch=lambda team=team: self.fetch_rival_tabs(team['team_id'], team['equip'], language),
+                    parse=lambda tabs, team=team: self.rival_form_from_tabs(team['equip'], team['team_id'], tabs),
+                    on_done=(partial(spool_rival, f"{team_key}:rival:{team['team_id']}", team['equip'])
+                             if run['rival_spool'] is not None else None)
+                )
+        
+        def calendar_done(calendar):
+            run['calendar_dates'].update(self.calendar_dates_index(calendar.get('dates', [])))
+            run['calendar_results'] = as_records(calendar.get('results', []), Result)
+            run['calendar_fixtures'] = as_records(calendar.get('fixtures', []), Match)
+        
+        # 🆕 v6.3 - Calendari per tenir les dates (s'apliquen a finish_json)
+        if 'calendar' in sections and calendar_url:
+            scheduler.submit(f"{team_key}:calendar", PRIORITY_OWN,
+                             fetch=page("1️⃣ CALENDARI (dates partits 3a fase)", calendar_url),
+                             parse=partial(parse_page, 'calendar'), heavy=True,
+                             on_done=calendar_done)
+        if 'fixtures' in sections:
+            scheduler.submit(f"{team_key}:fixtures", PRIORITY_OWN,
+                             fetch=tab("4️⃣ PRÒXIMS PARTITS", 'upcoming-matches'),
+                             parse=self.upcoming_from_tab)
+        if 'results' in sections:
+            scheduler.submit(f"{team_key}:results", PRIORITY_OWN,
+                             fetch=tab("5️⃣ ÚLTIMS RESULTATS", 'last-results'),
+                             parse=self.results_from_tab)
+        if 'players' in sections:
+            scheduler.submit(f"{team_key}:players", PRIORITY_TEAM,
+                             fetch=tab("2️⃣ JUGADORS", 'players'),
+                             parse=self.players_from_tab)
+        if 'stats' in sections:
+            scheduler.submit(f"{team_key}:stats", PRIORITY_TEAM,
+                             fetch=tab("3️⃣ ESTADÍSTIQUES", 'stats'),
+                             parse=self.team_stats_from_tab)
         
         if ranking_url:
-            print("\n6️⃣ CLASSIFICACIÓ:")
-            result['ranking'] = self.parse_ranking(ranking_url)
-            print(f"  ✅ {len(result['ranking'])} equips")
-            if result['ranking']:
-                cnt_position = None
-                for team in result['ranking']:
-                    if 'TERRASSA' in team['equip'].upper():
-                        cnt_position = team
-                        break
-                if cnt_position:
-                    print(f"  🏆 CN Terrassa: Posició {cnt_position['posicio']} - {cnt_position['punts']} punts")
-            
-            # Obtenir forma dels rivals
-            result['rivals_form'] = self.get_all_rivals_form(result['ranking'], language)
+            # Els rivals s'ordenen pel pròxim partit quan tenim la classificació
+            wants_rivals = 'rivals' in sections
+            # La classificació es calcula dels resultats; la web només es baixa per validar-la
+            run['ranking_scraped'] = 'ranking' in sections and self.ranking_validation_due(previous)
+            if run['ranking_scraped']:
+                scheduler.submit(f"{team_key}:ranking", PRIORITY_RANKING,
+                                 fetch=page("6️⃣ CLASSIFICACIÓ", ranking_url),
+                                 parse=partial(parse_page, 'ranking'), heavy=True,
+                                 on_done=plan_rivals if wants_rivals else None)
+            elif wants_rivals:
+                plan_rivals(previous.get('ranking', []))
+        
+        return run
+    
+    def ranking_validation_due(self, previous):
+        """Cal baixar la classificació de la web? (forçat, sense dades o validació antiga)"""
+        if self.validate_ranking or not previous.get('ranking'):
+            return True
+        validated_at = previous.get('metadata', {}).get('ranking_validated_at')
+        if not validated_at:
+            return True
+        try:
+            age = datetime.now() - datetime.fromisoformat(validated_at)
+        except ValueError:
+            return True
+        return age.total_seconds() > RANKING_VALIDATION_HOURS * 3600
+    
+    def update_standings(self, scheduler, run):
+        """Aplica els resultats de la fase al motor de classificació i munta/valida el ranking"""
+        result = run['result']
+        previous = run['previous']
+        engine = StandingsEngine.load(standings_file(run['team_key']), self.normalize_team_for_calendar)
+        for row in result['ranking']:
+            engine.add_team(row.get('equip', ''))
+        changed = engine.add_results(run['calendar_results'])
+        run['standings'] = engine
+        
+        validated_at = previous.get('metadata', {}).get('ranking_validated_at')
+        if run['ranking_scraped'] and f"{run['team_key']}:ranking" in scheduler.results:
+            validated_at = datetime.now().isoformat()
+            if engine.applied:
+                differences = engine.compare(result['ranking'])
+                if differences:
+                    print(f"  ⚠️ Classificació calculada ≠ web ({len(differences)} diferències):")
+                    for difference in differences[:10]:
+                        print(f"     - {difference}")
+                else:
+                    print("  ✅ Classificació calculada validada amb la web")
+        elif 'ranking' in run['sections'] and engine.applied:
+            # team_id i logo de l'última classificació descarregada
+            result['ranking'] = engine.table(result['ranking'])
+            result['metadata']['ranking_source'] = 'computed'
+            print(f"  🧮 Classificació calculada: {len(engine.applied)} partits ({changed} nous)")
+        
+        if validated_at:
+            result['metadata']['ranking_validated_at'] = validated_at
+    
+    def seen_results(self, run):
+        """Tots els resultats d'aquesta execució: calendari de la fase, els nostres i els dels rivals"""
+        result = run['result']
+        history = list(run['calendar_results']) + list(result['last_results'])
+        for form in result['rivals_form'].values():
+            history.extend(form.last_results or [])
+        return history
+    
+    def update_head_to_head(self, run):
+        """Afegeix els resultats a l'índex d'enfrontaments i enllaça cada pròxim partit amb el seu fitxer"""
+        index = HeadToHeadIndex.load(h2h_file(run['team_key']), self.normalize_team_for_calendar)
+        index.add_results(self.seen_results(run))
+        run['h2h'] = index
+        
+        for match in run['result']['upcoming_matches']:
+            own, opponent = (match.team1, match.team2) if OWN_TEAM in (match.team1 or '').upper() else (match.team2, match.team1)
+            if index.summary(own or '', opponent or '')['played']:
+                match.h2h = shard_path(run['team_key'], opponent)
+    
+    def update_ratings(self, run):
+        """Aplica els partits nous al rating Elo i l'afegeix a la forma dels rivals"""
+        result = run['result']
+        ratings = EloRatings.load(ratings_file(run['team_key']), self.normalize_team_for_calendar)
+        changed = ratings.add_results(self.seen_results(run))
+        run['ratings'] = ratings
+        
+        for team_name, form in result['rivals_form'].items():
+            form.rating = ratings.rating(team_name)
+            form.rating_delta = ratings.form_delta(team_name, form.last_results or [])
+            result['rivals_form'][team_name] = form  # amb RivalSpool, la forma es torna a desar
+        if changed:
+            print(f"  📈 Rating: {changed} partits nous aplicats ({len(ratings.ratings)} equips)")
+    
+    def finish_json(self, scheduler, run):
+        """Munta el JSON d'un equip amb el que ha executat el scheduler
+        
+        Les seccions que han fallat o no s'han pogut fer dins del pressupost es
+        queden amb el valor anterior i es marquen a metadata.stale_sections.
+        """
+        team_key = run['team_key']
+        result = run['result']
+        previous = run['previous']
+        sections = run['sections']
+        stale = []
+        
+        for section, key in SECTION_KEYS.items():
+            empty = {} if key in ('team_stats', 'rivals_form') else []
+            if section not in sections:
+                result[key] = previous.get(key, empty)
+            elif section == 'rivals':
+                continue
+            elif f"{team_key}:{section}" in scheduler.results:
+                result[key] = scheduler.results[f"{team_key}:{section}"]
+                if section == 'results':
+                    # 🆕 v6.3 - Afegir dates del calendari
+                    self.add_dates_to_results(result[key], run['calendar_dates'])
+            else:
+                result[key] = previous.get(key, empty)
+                if f"{team_key}:{section}" in scheduler.failed or f"{team_key}:{section}" in scheduler.missed:
+                    stale.append(key)
+        
+        if 'rivals' in sections:
+            spool = run['rival_spool']
+            rivals_form = RivalSpool() if spool is not None else {}
+            old_rivals = previous.get('rivals_form', {})
+            if run['rivals'] is None:
+                # Sense classificació no hi ha rivals a refrescar
+                rivals_form = old_rivals
+                if old_rivals:
+                    stale.append('rivals_form')
+            else:
+                for team in run['rivals']:
+                    team_name = team['equip']
+                    unit_key = f"{team_key}:rival:{team['team_id']}"
+                    if unit_key in scheduler.results:
+                        form = scheduler.results[unit_key]
+                        if form and spool is not None:
+                            form = spool[team_name]
+                        if form:
+                            self.add_dates_to_results(form['last_results'], run['calendar_dates'])
+                            rivals_form[team_name] = form
+                    elif team_name in old_rivals:
+                        form = RivalForm.from_dict(old_rivals[team_name])
+                        form.stale = True
+                        rivals_form[team_name] = form
+                        stale.append(f"rivals_form:{team_name}")
+            if spool is not None:
+                # El spool nou té els rivals en l'ordre de la classificació i amb dates
+                spool.close()
+                run['rival_spool'] = None
+            result['rivals_form'] = rivals_form
+        
+        # Tot (nou, de l'execució anterior o del diari) amb el mateix model
+        for section, cls in SECTION_RECORDS.items():
+            result[SECTION_KEYS[section]] = as_records(result[SECTION_KEYS[section]], cls)
+        if not isinstance(result['rivals_form'], RivalSpool):
+            result['rivals_form'] = {name: RivalForm.from_dict(form) for name, form in result['rivals_form'].items()}
+        
+        # Partits pendents de tota la fase (per projection.py)
+        if run['calendar_fixtures'] is not None:
+            result['phase_fixtures'] = run['calendar_fixtures']
         else:
-            result['ranking'] = []
-            result['rivals_form'] = {}
+            result['phase_fixtures'] = as_records(previous.get('phase_fixtures', []), Match)
+        
+        self.update_standings(scheduler, run)
+        self.update_ratings(run)
+        self.update_head_to_head(run)
+        
+        if stale:
+            result['metadata']['stale_sections'] = stale
+            print(f"\n⏱️ {result['metadata']['team_name']}: dades anteriors per {', '.join(stale)}")
         
         from datetime import timezone, timedelta
         tz_madrid = timezone(timedelta(hours=1))
         result['last_update'] = datetime.now(tz_madrid).isoformat()
         
         return result
+    
+    def release_run(self, scheduler, run):
+        """Mode de memòria acotada: allibera el que queda d'un equip ja escrit"""
+        rivals_form = run['result'].get('rivals_form')
+        if isinstance(rivals_form, RivalSpool):
+            rivals_form.close()
+        prefix = f"{run['team_key']}:"
+        for key in [key for key in scheduler.results if key.startswith(prefix)]:
+            del scheduler.results[key]
+        run.clear()
+    
+    def generate_json(self, team_id, team_key, team_name, coach, language='es', ranking_url=None, calendar_url=None,
+                      sections=None, previous=None, budget=None, pipeline=None):
+        """Genera JSON amb normalització automàtica"""
+        scheduler = ScrapeScheduler(budget, pipeline=pipeline)
+        self.deadline = scheduler.deadline
+        run = self.plan_json(scheduler, team_id, team_key, team_name, coach, language, ranking_url,
+                             calendar_url, sections, previous)
+        scheduler.run()
+        return self.finish_json(scheduler, run)
+
+
+_worker_parser = None
+
+
+def parse_page(kind, html):
+    """Parseja una pàgina sencera (calendari o classificació)
+    
+    És una funció de mòdul perquè es pugui enviar a un pool de processos
+    (--process-parse): cada procés fa servir el seu propi parser sense xarxa.
+    Retorna els noms d'equip tal com surten: només el parser principal els
+    resol amb l'índex d'entitats (el que es desa).
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ActawpParserV58()
+    
+    if kind == 'calendar':
+        return _worker_parser.parse_calendar_page(html) if html else {}
+    return _worker_parser.ranking_summary(_worker_parser.parse_ranking_html(html) if html else [])
+
+
+def parse_args(argv=None):
+    """Arguments de línia de comandes"""
+    arg_parser = argparse.ArgumentParser(description="Parser ACTAWP - CN Terrassa")
+    arg_parser.add_argument(
+        '--only',
+        help=f"Seccions a refrescar separades per comes ({', '.join(SECTIONS)}). "
+             "La resta es conserven del JSON existent."
+    )
+    arg_parser.add_argument(
+        '--team', action='append', choices=sorted(TEAMS),
+        help="Equip a processar (es pot repetir). Per defecte, tots."
+    )
+    arg_parser.add_argument(
+        '--budget', type=float,
+        help="Temps màxim de l'execució en segons. El que no s'hagi pogut "
+             "descarregar es queda amb l'última dada (marcada stale)."
+    )
+    arg_parser.add_argument(
+        '--validate-ranking', action='store_true',
+        help="Descarrega la classificació de la web encara que la calculada sigui recent"
+    )
+    arg_parser.add_argument(
+        '--fetch-workers', type=int, default=4,
+        help="Fils que descarreguen en paral·lel (0 = tot seqüencial, com abans)"
+    )
+    arg_parser.add_argument(
+        '--parse-workers', type=int, default=2,
+        help="Fils (o processos amb --process-parse) que parsegen l'HTML"
+    )
+    arg_parser.add_argument(
+        '--process-parse', action='store_true',
+        help="Parseja classificació i calendari en un pool de processos"
+    )
+    arg_parser.add_argument(
+        '--logo-sprite', action='store_true',
+        help="A més de les miniatures, genera logos/sprite.webp amb tots els escuts"
+    )
+    arg_parser.add_argument(
+        '--memory-bounded', action='store_true',
+        help="Memòria acotada: allibera cada pàgina en acabar de parsejar-la i "
+             "guarda la forma dels rivals a disc fins que s'escriu el JSON"
+    )
+    arg_parser.add_argument(
+        '--trace-memory', type=int, default=0, metavar='N',
+        help="Instantània de tracemalloc per etapa amb els N punts del codi que més memòria reserven"
+    )
+    arg_parser.add_argument(
+        '--resume-window', type=float, default=DEFAULT_RESUME_WINDOW,
+        help="Minuts durant els quals una execució interrompuda es pot reprendre "
+             f"des del diari (per defecte {DEFAULT_RESUME_WINDOW}, 0 = no reprendre)"
+    )
+    args = arg_parser.parse_args(argv)
+    
+    if args.only:
+        args.only = [s.strip() for s in args.only.split(',') if s.strip()]
+        unknown = [s for s in args.only if s not in SECTIONS]
+        if unknown:
+            arg_parser.error(f"Seccions desconegudes: {', '.join(unknown)}")
+    return args
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    MEMORY_BOUNDED = args.memory_bounded
+    profiler = StageProfiler(args.trace_memory)
     parser = ActawpParserV58()
+    parser.validate_ranking = args.validate_ranking
     
     print("""
 ╔══════════════════════════════════════════════════════════════╗
@@ -914,42 +1605,80 @@ if __name__ == "__main__":
 ╚══════════════════════════════════════════════════════════════╝
 """)
     
-    teams = {
-        'juvenil': {
-            'id': '15621223',
-            'name': 'CN Terrassa Juvenil',
-            'coach': 'Jordi Busquets',
-            'language': 'es',
-            'ranking_url': 'https://actawp.natacio.cat/ca/tournament/1317471/ranking/3669887',
-            'calendar_url': 'https://actawp.natacio.cat/ca/tournament/1317471/calendar/3669887/all'
-        },
-        'cadet': {
-            'id': '15621224',
-            'name': 'CN Terrassa Cadet',
-            'coach': 'Didac Cobacho',
-            'language': 'ca',
-            'ranking_url': 'https://actawp.natacio.cat/ca/tournament/1317474/ranking/3669890',
-            'calendar_url': 'https://actawp.natacio.cat/ca/tournament/1317474/calendar/3669890/all'
-        }
-    }
+    teams = {key: TEAMS[key] for key in (args.team or TEAMS)}
     
+    # Una sola cua per tots els equips: primer les dades pròpies de tots,
+    # després classificacions i finalment rivals
+    journal = RunJournal(
+        {'teams': sorted(teams), 'sections': args.only or list(SECTIONS)},
+        window_minutes=args.resume_window
+    )
+    pipeline = None
+    if args.fetch_workers > 0:
+        pipeline = FetchParsePipeline(args.fetch_workers, args.parse_workers, process_parse=args.process_parse)
+    scheduler = ScrapeScheduler(args.budget, journal, pipeline)
+    parser.deadline = scheduler.deadline
+    runs = {}
     for team_key, team_info in teams.items():
+        runs[team_key] = parser.plan_json(
+            scheduler,
+            team_info['id'],
+            team_key,
+            team_info['name'],
+            team_info['coach'],
+            team_info['language'],
+            team_info.get('ranking_url'),
+            team_info.get('calendar_url'),
+            sections=args.only,
+            # L'última dada bona serveix pel refresc parcial i per si s'acaba el temps
+            previous=load_team_data(team_key)
+        )
+    with profiler.stage("descàrrega i parseig"):
+        scheduler.run()
+    
+    # Escuts: es baixen una sola vegada i el JSON apunta a la còpia local
+    logos = LogoStore(session_factory=lambda: parser.session, base_url=f"{ACTAWP_BASE}/")
+    
+    written = 0
+    for team_key, run in runs.items():
         try:
-            data = parser.generate_json(
-                team_info['id'],
-                team_key,
-                team_info['name'],
-                team_info['coach'],
-                team_info['language'],
-                team_info.get('ranking_url'),
-                team_info.get('calendar_url')
-            )
+            with profiler.stage(f"{team_key}: muntatge"):
+                data = parser.finish_json(scheduler, run)
+                downloaded = logos.localize(data)
+            if downloaded:
+                print(f"\n🖼️ Logos: {downloaded} nous a {LOGOS_DIR}/")
             
             filename = f"actawp_{team_key}_data.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with profiler.stage(f"{team_key}: escriptura"):
+                # Els rivals (RivalSpool amb --memory-bounded) s'escriuen un a un
+                write_json(filename, data)
+                
+                print(f"\n💾 Guardat: {filename}")
+                run['standings'].save(standings_file(team_key))
+                run['ratings'].save(ratings_file(team_key))
+                run['h2h'].save(h2h_file(team_key))
+                shards = run['h2h'].write_shards(team_key)
+                if shards:
+                    print(f"🤝 Enfrontaments directes: {shards} fitxers actualitzats a h2h/{team_key}/")
+            
+            # Versió nova + JSON Patch des de l'anterior per als clients que ja tenen dades
+            with profiler.stage(f"{team_key}: feed"):
+                feed = DeltaFeed(team_key)
+                if MEMORY_BOUNDED:
+                    with open(filename, 'r', encoding='utf-8') as f:
+                        document = json.load(f)
+                else:
+                    document = json.loads(json.dumps(data, default=encode))
+                version = feed.publish(document)
+                del document
+            if version:
+                print(f"🔀 Feed de canvis: versió {version} ({len(feed.manifest['patches'])} patches disponibles)")
+            written += 1
             
-            print(f"\n💾 Guardat: {filename}")
+            if MEMORY_BOUNDED:
+                # L'equip ja és a disc: fora les seves dades abans de muntar el següent
+                parser.release_run(scheduler, run)
+                del data
             
         except Exception as e:
             print(f"\n❌ Error: {e}")
@@ -958,6 +1687,17 @@ if __name__ == "__main__":
         
         print("\n" + "="*70)
     
+    if args.logo_sprite:
+        logos.build_sprite()
+    logos.save()
+    parser.entities.save()
+    if logos.failed:
+        print(f"⚠️ Logos: {len(logos.failed)} no s'han pogut baixar (es manté la URL remota)")
+    profiler.report()
+    
+    # Si algun equip no s'ha pogut guardar, el diari es queda per reprendre
+    journal.close(completed=written == len(runs))
+    
     print("""
 ✅ JSON GENERATS CORRECTAMENT!
 
@@ -966,6 +1706,10 @@ if __name__ == "__main__":
    - Els resultats dels rivals ara tenen el camp "date" amb la data real
    - Pots filtrar per fase (partits del 2026 = 3a fase)
 
+⚡ Refresc parcial després d'un partit:
+   python ultra_robust_parser.py --only results
+   python ultra_robust_parser.py --only results,fixtures --team cadet
+
 📤 Puja'ls a GitHub:
    git add actawp_*.json ultra_robust_parser.py
    git commit -m "📅 Parser v6.3 - Dates del calendari 3a fase"